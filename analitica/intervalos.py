@@ -0,0 +1,206 @@
+"""
+Tiempo en estado y tiempo de ciclo a partir de HistoricalSolicitud.
+
+Recorre solo las filas de historial nuevas, en orden (history_date, history_id),
+desde la marca de agua. Cada cambio de estado cierra el tramo abierto de la
+solicitud (IntervaloEstado) y abre uno nuevo; al cerrarse, su duración se suma
+a AgregadoTiempo (conteo, suma e histograma por día, estado y área). Los
+tableros leen los agregados y los tramos abiertos; nunca se reprocesa el
+historial completo.
+
+Ejecuciones solapadas (cron + manual) se serializan por lote con un bloqueo
+sobre la fila de MarcaAgregado; la restricción única de AgregadoTiempo es la
+red de seguridad.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from solicitudes.models import Solicitud
+from usuarios.models import PerfilUsuario
+from .models import AgregadoTiempo, IntervaloEstado, MarcaAgregado
+from .resumen import config_analitica, en_lotes
+
+MARCA = "intervalos_estado"
+
+# Límites superiores (segundos) de los cubos del histograma; el último cubo es abierto
+LIMITES = [
+    15 * 60, 3600, 4 * 3600, 8 * 3600,
+    86400, 2 * 86400, 3 * 86400, 5 * 86400, 7 * 86400, 14 * 86400, 30 * 86400,
+]
+
+ESTADOS_FINALES = {"CERRADO"}
+
+
+# ----------------------------
+# Histograma / percentiles
+# ----------------------------
+def cubo(segundos):
+    return bisect_left(LIMITES, segundos)
+
+
+def sumar_histogramas(a, b):
+    largo = len(LIMITES) + 1
+    a, b = (list(a) + [0] * largo)[:largo], (list(b) + [0] * largo)[:largo]
+    return [x + y for x, y in zip(a, b)]
+
+
+def percentil(histograma, p):
+    """Estimación (segundos) por interpolación lineal dentro del cubo; None si no hay datos."""
+    total = sum(histograma)
+    if not total:
+        return None
+    objetivo = total * p / 100
+    acumulado = 0
+    for i, cantidad in enumerate(histograma):
+        if cantidad and acumulado + cantidad >= objetivo:
+            inferior = LIMITES[i - 1] if i > 0 else 0
+            superior = LIMITES[i] if i < len(LIMITES) else LIMITES[-1] * 2
+            return inferior + (superior - inferior) * (objetivo - acumulado) / cantidad
+        acumulado += cantidad
+    return LIMITES[-1]
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+class _Lote:
+    """Cambios de un lote de historial; se guardan juntos con la marca de agua."""
+
+    def __init__(self, zona):
+        self.zona = zona
+        self.nuevos = []
+        self.cerrados = []
+        self.agregados = defaultdict(lambda: [0, 0, [0] * (len(LIMITES) + 1)])
+
+    def acumular(self, metrica, momento, estado, area_id, segundos):
+        clave = (metrica, timezone.localtime(momento, self.zona).date(), estado, area_id)
+        agregado = self.agregados[clave]
+        agregado[0] += 1
+        agregado[1] += segundos
+        agregado[2][cubo(segundos)] += 1
+
+    def cerrar(self, intervalo, momento):
+        intervalo.salida = momento
+        intervalo.duracion_segundos = max(int((momento - intervalo.entrada).total_seconds()), 0)
+        if intervalo.pk:
+            self.cerrados.append(intervalo)
+        self.acumular("estado", momento, intervalo.estado, intervalo.area_id, intervalo.duracion_segundos)
+
+    def guardar(self):
+        IntervaloEstado.objects.bulk_create(self.nuevos)
+        IntervaloEstado.objects.bulk_update(self.cerrados, ["salida", "duracion_segundos"])
+        if not self.agregados:
+            return
+        existentes = {
+            (fila.metrica, fila.dia, fila.estado, fila.area_id): fila
+            for fila in AgregadoTiempo.objects.filter(dia__in={clave[1] for clave in self.agregados})
+        }
+        nuevas, cambiadas = [], []
+        for clave, (cantidad, suma, histograma) in self.agregados.items():
+            fila = existentes.get(clave)
+            if fila is None:
+                metrica, dia, estado, area_id = clave
+                fila = AgregadoTiempo(metrica=metrica, dia=dia, estado=estado, area_id=area_id)
+                nuevas.append(fila)
+            else:
+                cambiadas.append(fila)
+            fila.cantidad += cantidad
+            fila.suma_segundos += suma
+            fila.histograma = sumar_histogramas(fila.histograma, histograma)
+        AgregadoTiempo.objects.bulk_create(nuevas)
+        AgregadoTiempo.objects.bulk_update(cambiadas, ["cantidad", "suma_segundos", "histograma"])
+
+
+def _procesar(filas, zona):
+    lote = _Lote(zona)
+    solicitudes = {fila.id for fila in filas}
+    abiertos = {
+        intervalo.solicitud_id: intervalo
+        for intervalo in IntervaloEstado.objects.filter(solicitud_id__in=solicitudes, salida__isnull=True)
+    }
+    # Área actual del asignado (el historial no guarda el perfil)
+    areas = dict(
+        PerfilUsuario.objects.filter(user_id__in={fila.usuario_asignado_id for fila in filas})
+        .values_list("user_id", "area_id")
+    )
+
+    for fila in filas:
+        abierto = abiertos.get(fila.id)
+        if fila.history_type == "-":
+            if abierto:
+                lote.cerrar(abierto, fila.history_date)
+                del abiertos[fila.id]
+            continue
+        if abierto and abierto.estado == fila.estado:
+            continue
+        if abierto:
+            lote.cerrar(abierto, fila.history_date)
+            del abiertos[fila.id]
+
+        area_id = areas.get(fila.usuario_asignado_id)
+        if fila.estado in ESTADOS_FINALES:
+            # Fin del ciclo: no se abre tramo (no es trabajo pendiente)
+            segundos = max(int((fila.history_date - fila.fecha_creacion).total_seconds()), 0)
+            lote.acumular("ciclo", fila.history_date, fila.estado, area_id, segundos)
+            continue
+        nuevo = IntervaloEstado(
+            solicitud_id=fila.id,
+            estado=fila.estado,
+            entrada=fila.history_date,
+            usuario_id=fila.history_user_id,
+            area_id=area_id,
+        )
+        lote.nuevos.append(nuevo)
+        abiertos[fila.id] = nuevo
+    return lote
+
+
+def _aplicar_lote(filas, zona):
+    """
+    Procesa un lote y avanza la marca en la misma transacción. La marca se
+    bloquea y se relee: si otra ejecución ya procesó parte del lote, esas
+    filas se saltan (no se abren tramos ni se suman duraciones dos veces).
+    """
+    with transaction.atomic():
+        marca = MarcaAgregado.objects.select_for_update().get(nombre=MARCA)
+        if marca.fecha:
+            posicion = (marca.fecha, marca.ultimo_id)
+            filas = [fila for fila in filas if (fila.history_date, fila.history_id) > posicion]
+        if not filas:
+            return 0
+        _procesar(filas, zona).guardar()
+        marca.fecha, marca.ultimo_id = filas[-1].history_date, filas[-1].history_id
+        marca.save(update_fields=["fecha", "ultimo_id", "fecha_ejecucion"])
+    return len(filas)
+
+
+def actualizar_intervalos(ahora=None):
+    """Procesa el historial nuevo desde la marca de agua. Devuelve cuántas filas se procesaron."""
+    config = config_analitica()
+    zona = ZoneInfo(config["zona_horaria"])
+    hasta = (ahora or timezone.now()) - timedelta(seconds=config["margen_segundos"])
+    marca, _ = MarcaAgregado.objects.get_or_create(nombre=MARCA)
+
+    HistoricalSolicitud = Solicitud.history.model
+    siguiente = (
+        Q(history_date__gt=marca.fecha) | Q(history_date=marca.fecha, history_id__gt=marca.ultimo_id)
+        if marca.fecha else Q()
+    )
+    nuevas = (
+        HistoricalSolicitud.objects.filter(siguiente, history_date__lte=hasta)
+        .only(
+            "id", "estado", "usuario_asignado_id", "fecha_creacion",
+            "history_id", "history_date", "history_type", "history_user_id",
+        )
+    )
+    total = 0
+    # En orden de historial; la marca avanza con cada lote confirmado
+    for filas in en_lotes(nuevas, config["lote"], ("history_date", "history_id")):
+        total += _aplicar_lote(filas, zona)
+    return total
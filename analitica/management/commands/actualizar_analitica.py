@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analitica.intervalos import actualizar_intervalos
+from analitica.resumen import actualizar_resumen
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza los rollups de analítica de forma incremental: solo procesa lo que "
+        "cambió desde la última marca de agua. Pensado para correr periódicamente (cron)."
+    )
+
+    def handle(self, *args, **options):
+        procesadas = actualizar_resumen()
+        self.stdout.write(self.style.SUCCESS(f"Resumen diario: {procesadas} solicitudes reprocesadas."))
+        leidas = actualizar_intervalos()
+        self.stdout.write(self.style.SUCCESS(f"Tiempo en estado: {leidas} filas de historial nuevas."))
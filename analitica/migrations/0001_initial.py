@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('usuarios', '0002_usoalmacenamiento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AporteSolicitud',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solicitud_id', models.BigIntegerField(unique=True)),
+                ('estado', models.CharField(max_length=20)),
+                ('area_id', models.BigIntegerField(blank=True, null=True)),
+                ('tipo_documento', models.CharField(max_length=50)),
+                ('dia_creacion', models.DateField()),
+                ('dia_cierre', models.DateField(blank=True, null=True)),
+                ('segundos_cierre', models.BigIntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarcaAgregado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('fecha', models.DateTimeField(blank=True, null=True)),
+                ('fecha_ejecucion', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('estado', models.CharField(max_length=20)),
+                ('tipo_documento', models.CharField(max_length=50)),
+                ('ingresadas', models.PositiveIntegerField(default=0)),
+                ('cerradas', models.PositiveIntegerField(default=0)),
+                ('segundos_cierre', models.BigIntegerField(default=0)),
+                ('area', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='usuarios.area')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dia', 'estado'], name='analitica_r_dia_9e1397_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitica', '0001_initial'),
+        ('usuarios', '0002_usoalmacenamiento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marcaagregado',
+            name='ultimo_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AgregadoTiempo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metrica', models.CharField(choices=[('estado', 'Tiempo en estado'), ('ciclo', 'Tiempo de ciclo')], max_length=10)),
+                ('dia', models.DateField()),
+                ('estado', models.CharField(max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('suma_segundos', models.BigIntegerField(default=0)),
+                ('histograma', models.JSONField(default=list)),
+                ('area', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='usuarios.area')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metrica', 'dia'], name='analitica_a_metrica_5575c7_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IntervaloEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solicitud_id', models.BigIntegerField()),
+                ('estado', models.CharField(max_length=20)),
+                ('entrada', models.DateTimeField()),
+                ('salida', models.DateTimeField(blank=True, null=True)),
+                ('duracion_segundos', models.BigIntegerField(blank=True, null=True)),
+                ('area', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='usuarios.area')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['solicitud_id', 'entrada'], name='analitica_i_solicit_acbe30_idx'), models.Index(condition=models.Q(('salida__isnull', True)), fields=['estado', 'entrada'], name='intervalo_abierto_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:18
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+CONTADORES = ("ingresadas", "cerradas", "segundos_cierre")
+
+
+def fusionar_duplicados(apps, schema_editor):
+    """Ejecuciones solapadas pudieron crear dos filas del mismo grupo: se suman en una."""
+    ResumenDiario = apps.get_model("analitica", "ResumenDiario")
+    grupos = {}
+    for fila in ResumenDiario.objects.order_by("id"):
+        clave = (fila.dia, fila.estado, fila.area_id, fila.tipo_documento)
+        primera = grupos.setdefault(clave, fila)
+        if primera is fila:
+            continue
+        for campo in CONTADORES:
+            setattr(primera, campo, getattr(primera, campo) + getattr(fila, campo))
+        primera.save(update_fields=CONTADORES)
+        fila.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitica', '0002_intervalos_estado'),
+    ]
+
+    operations = [
+        migrations.RunPython(fusionar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resumendiario',
+            constraint=models.UniqueConstraint(models.F('dia'), models.F('estado'), django.db.models.functions.comparison.Coalesce('area', models.Value(0)), models.F('tipo_documento'), name='resumen_diario_unico'),
+        ),
+    ]
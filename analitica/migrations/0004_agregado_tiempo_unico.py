@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:33
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def fusionar_duplicados(apps, schema_editor):
+    """Ejecuciones solapadas pudieron crear dos filas del mismo grupo: se suman en una."""
+    AgregadoTiempo = apps.get_model("analitica", "AgregadoTiempo")
+    grupos = {}
+    for fila in AgregadoTiempo.objects.order_by("id"):
+        clave = (fila.metrica, fila.dia, fila.estado, fila.area_id)
+        primera = grupos.setdefault(clave, fila)
+        if primera is fila:
+            continue
+        largo = max(len(primera.histograma), len(fila.histograma))
+        primera.histograma = [
+            (primera.histograma[i] if i < len(primera.histograma) else 0)
+            + (fila.histograma[i] if i < len(fila.histograma) else 0)
+            for i in range(largo)
+        ]
+        primera.cantidad += fila.cantidad
+        primera.suma_segundos += fila.suma_segundos
+        primera.save(update_fields=["cantidad", "suma_segundos", "histograma"])
+        fila.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitica', '0003_resumen_diario_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(fusionar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='agregadotiempo',
+            constraint=models.UniqueConstraint(models.F('metrica'), models.F('dia'), models.F('estado'), django.db.models.functions.comparison.Coalesce('area', models.Value(0)), name='agregado_tiempo_unico'),
+        ),
+    ]
@@ -0,0 +1,136 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from usuarios.models import Area
+
+
+class MarcaAgregado(models.Model):
+    """Marca de agua de un job incremental: hasta dónde ya se procesó."""
+    nombre = models.CharField(max_length=50, unique=True)
+    fecha = models.DateTimeField(null=True, blank=True)
+    # Desempate dentro de la misma fecha (p. ej. history_id)
+    ultimo_id = models.BigIntegerField(default=0)
+    fecha_ejecucion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre}: {self.fecha}"
+
+
+class AporteSolicitud(models.Model):
+    """
+    Lo que cada solicitud sumó al resumen la última vez que se procesó.
+    Al volver a procesarla se resta este aporte y se suma el nuevo.
+    """
+    solicitud_id = models.BigIntegerField(unique=True)
+    estado = models.CharField(max_length=20)
+    area_id = models.BigIntegerField(null=True, blank=True)
+    tipo_documento = models.CharField(max_length=50)
+    dia_creacion = models.DateField()
+    dia_cierre = models.DateField(null=True, blank=True)
+    segundos_cierre = models.BigIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Solicitud {self.solicitud_id}: {self.estado}"
+
+
+class ResumenDiario(models.Model):
+    """
+    Rollup diario por (estado, área del asignado, tipo de documento):
+    - ingresadas: solicitudes creadas ese día (en su estado actual)
+    - cerradas / segundos_cierre: cerradas ese día y su tiempo total hasta fecha_cierre
+    """
+    dia = models.DateField()
+    estado = models.CharField(max_length=20)
+    # Sin FK real: el id se conserva aunque el área se borre (el aporte debe poder restarse)
+    area = models.ForeignKey(
+        Area, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name="+"
+    )
+    tipo_documento = models.CharField(max_length=50)
+    ingresadas = models.PositiveIntegerField(default=0)
+    cerradas = models.PositiveIntegerField(default=0)
+    segundos_cierre = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["dia", "estado"]),
+        ]
+        constraints = [
+            # Una fila por grupo; Coalesce para que "sin área" (NULL) también sea única
+            models.UniqueConstraint(
+                "dia", "estado", Coalesce("area", Value(0)), "tipo_documento",
+                name="resumen_diario_unico",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.estado} {self.area_id} {self.tipo_documento}"
+
+
+class IntervaloEstado(models.Model):
+    """
+    Tramo en que una solicitud permaneció en un estado, derivado de HistoricalSolicitud.
+    salida = None mientras sigue en ese estado. Los estados finales no abren tramo.
+    """
+    solicitud_id = models.BigIntegerField()
+    estado = models.CharField(max_length=20)
+    entrada = models.DateTimeField()
+    salida = models.DateTimeField(null=True, blank=True)
+    duracion_segundos = models.BigIntegerField(null=True, blank=True)
+    # Quién la movió a este estado y el área del asignado en ese momento
+    usuario = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name="+"
+    )
+    area = models.ForeignKey(
+        Area, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["solicitud_id", "entrada"]),
+            # Tramos abiertos: trabajo en curso por estado
+            models.Index(
+                fields=["estado", "entrada"],
+                name="intervalo_abierto_idx",
+                condition=models.Q(salida__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Solicitud {self.solicitud_id}: {self.estado} desde {self.entrada}"
+
+
+class AgregadoTiempo(models.Model):
+    """
+    Duraciones agregadas por día de salida, estado y área, con histograma
+    (ver analitica.intervalos.LIMITES) para estimar percentiles sin releer tramos.
+    - metrica "estado": tiempo en `estado`
+    - metrica "ciclo": creación -> estado final (estado = estado final alcanzado)
+    """
+    METRICAS = [("estado", "Tiempo en estado"), ("ciclo", "Tiempo de ciclo")]
+
+    metrica = models.CharField(max_length=10, choices=METRICAS)
+    dia = models.DateField()
+    estado = models.CharField(max_length=20)
+    area = models.ForeignKey(
+        Area, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name="+"
+    )
+    cantidad = models.PositiveIntegerField(default=0)
+    suma_segundos = models.BigIntegerField(default=0)
+    histograma = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["metrica", "dia"]),
+        ]
+        constraints = [
+            # Una fila por grupo; Coalesce para que "sin área" (NULL) también sea única
+            models.UniqueConstraint(
+                "metrica", "dia", "estado", Coalesce("area", Value(0)),
+                name="agregado_tiempo_unico",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metrica} {self.dia} {self.estado} {self.area_id}"
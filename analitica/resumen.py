@@ -0,0 +1,214 @@
+"""
+Resumen diario incremental (ResumenDiario).
+
+Cada ejecución procesa solo lo que cambió desde la marca de agua: solicitudes
+(o sus expedientes) actualizadas y solicitudes borradas. Por cada una se resta
+su aporte anterior (AporteSolicitud) y se suma el actual, así que reprocesar
+es idempotente y el costo depende de los cambios, no del tamaño del historial.
+
+La marca avanza hasta `ahora - margen`: las escrituras que se confirman tarde
+(historial agrupado, transacciones largas) entran en la siguiente ejecución.
+
+Si dos ejecuciones se solapan (cron + manual), cada lote bloquea primero la
+fila de MarcaAgregado: los lotes se serializan y cada uno lee los contadores
+ya confirmados. La restricción única de ResumenDiario es la red de seguridad.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from solicitudes.models import Solicitud
+from .models import AporteSolicitud, MarcaAgregado, ResumenDiario
+
+CONFIG_DEFECTO = {
+    "zona_horaria": "America/Lima",
+    "lote": 1000,
+    "margen_segundos": 60,
+}
+
+MARCA = "resumen_diario"
+CONTADORES = ("ingresadas", "cerradas", "segundos_cierre")
+
+
+def config_analitica():
+    return {**CONFIG_DEFECTO, **getattr(settings, "ANALITICA", {})}
+
+
+def _cursor_servidor(alias):
+    conexion = connections[alias]
+    return conexion.vendor == "postgresql" and not conexion.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS")
+
+
+def _valor(fila, campo):
+    return fila[campo] if isinstance(fila, dict) else getattr(fila, campo)
+
+
+def en_lotes(queryset, lote, orden):
+    """
+    Recorre `queryset` ordenado por `orden` (dos campos, el último único) en
+    listas de `lote` filas (instancias o dicts de values()).
+
+    - PostgreSQL: una sola consulta con cursor del servidor (iterator(); WITH
+      HOLD fuera de una transacción, así sobrevive a los commits de cada lote)
+    - SQLite: keyset, una consulta corta por lote. Un SELECT abierto fija la
+      instantánea de lectura y, con otros procesos escribiendo, el BEGIN
+      IMMEDIATE de cada lote fallaría con "database is locked"
+    """
+    queryset = queryset.order_by(*orden)
+    if _cursor_servidor(queryset.db):
+        filas = []
+        for fila in queryset.iterator(chunk_size=lote):
+            filas.append(fila)
+            if len(filas) >= lote:
+                yield filas
+                filas = []
+        if filas:
+            yield filas
+        return
+
+    primero, segundo = orden
+    siguiente = Q()
+    while True:
+        filas = list(queryset.filter(siguiente)[:lote])
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1]
+        siguiente = (
+            Q(**{f"{primero}__gt": _valor(ultimo, primero)})
+            | Q(**{primero: _valor(ultimo, primero), f"{segundo}__gt": _valor(ultimo, segundo)})
+        )
+
+
+def _dia(momento, zona):
+    return timezone.localtime(momento, zona).date()
+
+
+def _aporte(fila, zona):
+    creacion, cierre = fila["fecha_creacion"], fila["fecha_cierre"]
+    return AporteSolicitud(
+        solicitud_id=fila["id"],
+        estado=fila["estado"],
+        area_id=fila["usuario_asignado__perfilusuario__area_id"],
+        tipo_documento=fila["expediente__tipo_documento"],
+        dia_creacion=_dia(creacion, zona),
+        dia_cierre=_dia(cierre, zona) if cierre else None,
+        segundos_cierre=int((cierre - creacion).total_seconds()) if cierre else None,
+    )
+
+
+def _sumar(deltas, aporte, signo):
+    grupo = (aporte.estado, aporte.area_id, aporte.tipo_documento)
+    deltas[(aporte.dia_creacion, *grupo)][0] += signo
+    if aporte.dia_cierre:
+        cierre = deltas[(aporte.dia_cierre, *grupo)]
+        cierre[1] += signo
+        cierre[2] += signo * aporte.segundos_cierre
+
+
+def _aplicar(deltas):
+    """Suma los deltas a ResumenDiario: un SELECT, un UPDATE/INSERT por lote y borra los vacíos."""
+    deltas = {clave: valores for clave, valores in deltas.items() if any(valores)}
+    if not deltas:
+        return
+    existentes = {
+        (fila.dia, fila.estado, fila.area_id, fila.tipo_documento): fila
+        for fila in ResumenDiario.objects.filter(
+            dia__in={clave[0] for clave in deltas},
+            estado__in={clave[1] for clave in deltas},
+        )
+    }
+    nuevas, cambiadas = [], []
+    for clave, valores in deltas.items():
+        fila = existentes.get(clave)
+        if fila is None:
+            dia, estado, area_id, tipo_documento = clave
+            fila = ResumenDiario(dia=dia, estado=estado, area_id=area_id, tipo_documento=tipo_documento)
+            nuevas.append(fila)
+        else:
+            cambiadas.append(fila)
+        for campo, delta in zip(CONTADORES, valores):
+            setattr(fila, campo, getattr(fila, campo) + delta)
+
+    vacias = [fila.id for fila in cambiadas if not fila.ingresadas and not fila.cerradas]
+    ResumenDiario.objects.bulk_create(nuevas)
+    ResumenDiario.objects.bulk_update([fila for fila in cambiadas if fila.id not in vacias], CONTADORES)
+    ResumenDiario.objects.filter(id__in=vacias).delete()
+
+
+def procesar_solicitudes(ids, zona):
+    """Recalcula el aporte de `ids` (las que ya no existen solo se restan)."""
+    filas = Solicitud.objects.filter(id__in=ids).values(
+        "id",
+        "estado",
+        "fecha_creacion",
+        "fecha_cierre",
+        "expediente__tipo_documento",
+        "usuario_asignado__perfilusuario__area_id",
+    )
+    actuales = {fila["id"]: _aporte(fila, zona) for fila in filas}
+
+    with transaction.atomic():
+        # Exclusivo frente a otra ejecución: lee y escribe ResumenDiario sin carreras
+        MarcaAgregado.objects.select_for_update().filter(nombre=MARCA).first()
+        previos = {
+            aporte.solicitud_id: aporte
+            for aporte in AporteSolicitud.objects.select_for_update().filter(solicitud_id__in=ids)
+        }
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for solicitud_id in ids:
+            if solicitud_id in previos:
+                _sumar(deltas, previos[solicitud_id], -1)
+            if solicitud_id in actuales:
+                _sumar(deltas, actuales[solicitud_id], +1)
+        _aplicar(deltas)
+
+        AporteSolicitud.objects.bulk_create(
+            actuales.values(),
+            update_conflicts=True,
+            unique_fields=["solicitud_id"],
+            update_fields=[
+                "estado", "area_id", "tipo_documento", "dia_creacion", "dia_cierre", "segundos_cierre",
+            ],
+        )
+        AporteSolicitud.objects.filter(solicitud_id__in=set(previos) - set(actuales)).delete()
+
+
+def _cambiadas(desde, hasta, lote):
+    """Ids de solicitudes tocadas en (desde, hasta], por lotes."""
+    rango = {"__lte": hasta, **({"__gt": desde} if desde else {})}
+    fuentes = [
+        (Solicitud.objects.all(), "fecha_actualizacion"),
+        # Un cambio de tipo_documento en el expediente también mueve la solicitud de grupo
+        (Solicitud.objects.all(), "expediente__fecha_actualizacion"),
+        (Solicitud.history.model.objects.filter(history_type="-"), "history_date"),
+    ]
+    for queryset, campo in fuentes:
+        filtrado = queryset.filter(**{f"{campo}{op}": valor for op, valor in rango.items()})
+        for filas in en_lotes(filtrado.values(campo, "id"), lote, (campo, "id")):
+            yield [fila["id"] for fila in filas]
+
+
+def actualizar_resumen(ahora=None):
+    """Procesa los cambios desde la marca de agua. Devuelve cuántas solicitudes se reprocesaron."""
+    config = config_analitica()
+    zona = ZoneInfo(config["zona_horaria"])
+    hasta = (ahora or timezone.now()) - timedelta(seconds=config["margen_segundos"])
+    marca, _ = MarcaAgregado.objects.get_or_create(nombre=MARCA)
+
+    # Una solicitud puede salir en varias fuentes (ella y su expediente): se procesa una vez
+    procesadas = set()
+    for ids in _cambiadas(marca.fecha, hasta, config["lote"]):
+        ids = [solicitud_id for solicitud_id in ids if solicitud_id not in procesadas]
+        if ids:
+            procesar_solicitudes(ids, zona)
+            procesadas.update(ids)
+
+    marca.fecha = hasta
+    marca.save(update_fields=["fecha", "fecha_ejecucion"])
+    return len(procesadas)
@@ -0,0 +1,192 @@
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from expedientes.models import Expediente
+from solicitudes.models import Solicitud
+
+from . import intervalos
+from .models import AgregadoTiempo, AporteSolicitud, IntervaloEstado, ResumenDiario
+from .resumen import actualizar_resumen, config_analitica, procesar_solicitudes
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def crear_solicitud(usuario, momento=None):
+    """Solicitud nueva; `momento` fija la fecha de su primera fila de historial."""
+    expediente = Expediente(
+        tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Analitica",
+        telefono="999999999", correo="analitica@example.com",
+        departamento="LIMA", provincia="LIMA", distrito="LIMA",
+        tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="Analitica",
+        creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+    )
+    expediente.save()
+    solicitud = Solicitud(expediente=expediente, usuario_asignado=usuario, modificado_por=usuario)
+    if momento:
+        solicitud._history_date = momento
+    solicitud.save()
+    return solicitud
+
+
+def cambiar_estado(solicitud, estado, momento):
+    solicitud.estado = estado
+    solicitud.finalizado = estado == "CERRADO"
+    solicitud._history_date = momento
+    solicitud.save()
+
+
+class ResumenDiarioTests(TestCase):
+    def test_un_grupo_una_fila(self):
+        for area_id in (None, 7):
+            ResumenDiario.objects.create(
+                dia=date(2024, 1, 1), estado="PENDIENTE", area_id=area_id, tipo_documento="CARTA"
+            )
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                ResumenDiario.objects.create(
+                    dia=date(2024, 1, 1), estado="PENDIENTE", area_id=area_id, tipo_documento="CARTA"
+                )
+
+
+@override_settings(HISTORIAL={"modo": "sincrono"}, MEDIA_ROOT=MEDIA_TEMPORAL)
+class ActualizarResumenTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="analitica")
+        self.solicitudes = [crear_solicitud(self.usuario) for _ in range(3)]
+
+    def actualizar(self):
+        # La marca queda justo en el instante actual: lo que se escriba después entra en la siguiente
+        margen = timedelta(seconds=config_analitica()["margen_segundos"])
+        return actualizar_resumen(ahora=timezone.now() + margen)
+
+    def totales(self):
+        return {
+            fila["estado"]: (fila["ingresadas"], fila["cerradas"])
+            for fila in ResumenDiario.objects.values("estado").annotate(
+                ingresadas=Sum("ingresadas"), cerradas=Sum("cerradas")
+            )
+        }
+
+    def test_el_margen_deja_lo_reciente_para_despues(self):
+        self.assertEqual(actualizar_resumen(ahora=timezone.now()), 0)
+        self.assertFalse(ResumenDiario.objects.exists())
+        self.assertEqual(self.actualizar(), 3)
+        self.assertEqual(self.totales(), {"EN_GESTION_MP": (3, 0)})
+
+    def test_la_marca_no_reprocesa(self):
+        self.assertEqual(self.actualizar(), 3)
+        self.assertEqual(self.actualizar(), 0)
+        self.assertEqual(self.totales(), {"EN_GESTION_MP": (3, 0)})
+
+    def test_reprocesar_es_idempotente(self):
+        self.actualizar()
+        ids = [solicitud.id for solicitud in self.solicitudes]
+        procesar_solicitudes(ids, timezone.get_current_timezone())
+        procesar_solicitudes(ids, timezone.get_current_timezone())
+        self.assertEqual(self.totales(), {"EN_GESTION_MP": (3, 0)})
+
+    def test_un_cambio_de_estado_mueve_el_aporte(self):
+        self.actualizar()
+        cerrada = self.solicitudes[0]
+        cambiar_estado(cerrada, "CERRADO", timezone.now())
+
+        self.assertEqual(self.actualizar(), 1)
+        self.assertEqual(self.totales(), {"EN_GESTION_MP": (2, 0), "CERRADO": (1, 1)})
+        self.assertEqual(AporteSolicitud.objects.get(solicitud_id=cerrada.id).estado, "CERRADO")
+
+    def test_una_solicitud_borrada_se_resta(self):
+        self.actualizar()
+        borrada = self.solicitudes[0]
+        borrada_id = borrada.id
+        borrada.delete()
+
+        self.assertEqual(self.actualizar(), 1)
+        self.assertEqual(self.totales(), {"EN_GESTION_MP": (2, 0)})
+        self.assertFalse(AporteSolicitud.objects.filter(solicitud_id=borrada_id).exists())
+
+
+class HistogramaTests(SimpleTestCase):
+    def test_cubos(self):
+        self.assertEqual(intervalos.cubo(0), 0)
+        self.assertEqual(intervalos.cubo(15 * 60), 0)  # el límite es inclusivo
+        self.assertEqual(intervalos.cubo(15 * 60 + 1), 1)
+        self.assertEqual(intervalos.cubo(10 ** 9), len(intervalos.LIMITES))  # cubo abierto
+
+    def test_sumar_completa_histogramas_cortos(self):
+        largo = len(intervalos.LIMITES) + 1
+        self.assertEqual(intervalos.sumar_histogramas([], [1, 2]), [1, 2] + [0] * (largo - 2))
+
+    def test_percentiles(self):
+        histograma = [0] * (len(intervalos.LIMITES) + 1)
+        self.assertIsNone(intervalos.percentil(histograma, 50))
+        # 10 duraciones en (0, 15 min] y 10 en (1 h, 4 h]
+        histograma[0], histograma[2] = 10, 10
+        self.assertEqual(intervalos.percentil(histograma, 25), 450)
+        self.assertEqual(intervalos.percentil(histograma, 50), 900)
+        self.assertEqual(intervalos.percentil(histograma, 75), 3600 + 3 * 3600 / 2)
+        self.assertEqual(intervalos.percentil(histograma, 100), 4 * 3600)
+
+
+@override_settings(HISTORIAL={"modo": "sincrono"}, MEDIA_ROOT=MEDIA_TEMPORAL)
+class IntervalosTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="intervalos")
+        self.inicio = timezone.now() - timedelta(days=2)
+        self.solicitud = crear_solicitud(self.usuario, momento=self.inicio)
+        # fecha_creacion es auto_now_add: se alinea con la primera fila de historial
+        Solicitud.objects.filter(pk=self.solicitud.pk).update(fecha_creacion=self.inicio)
+        self.solicitud.refresh_from_db()
+
+    def actualizar(self):
+        margen = timedelta(seconds=config_analitica()["margen_segundos"])
+        return intervalos.actualizar_intervalos(ahora=timezone.now() + margen)
+
+    def tramos(self):
+        return list(
+            IntervaloEstado.objects.filter(solicitud_id=self.solicitud.id)
+            .order_by("entrada")
+            .values_list("estado", "duracion_segundos")
+        )
+
+    def test_cada_cambio_de_estado_cierra_y_abre_tramo(self):
+        self.assertEqual(self.actualizar(), 1)
+        self.assertEqual(self.tramos(), [("EN_GESTION_MP", None)])
+
+        cambiar_estado(self.solicitud, "ENVIADO_A_AREA", self.inicio + timedelta(hours=2))
+        self.assertEqual(self.actualizar(), 1)
+        self.assertEqual(self.tramos(), [("EN_GESTION_MP", 7200), ("ENVIADO_A_AREA", None)])
+
+        agregado = AgregadoTiempo.objects.get(metrica="estado")
+        self.assertEqual((agregado.estado, agregado.cantidad, agregado.suma_segundos), ("EN_GESTION_MP", 1, 7200))
+        self.assertEqual(agregado.histograma[intervalos.cubo(7200)], 1)
+
+    def test_estado_final_cierra_el_ciclo(self):
+        cambiar_estado(self.solicitud, "CERRADO", self.inicio + timedelta(days=1))
+        self.assertEqual(self.actualizar(), 2)
+        # El estado final no abre tramo
+        self.assertEqual(self.tramos(), [("EN_GESTION_MP", 86400)])
+        ciclo = AgregadoTiempo.objects.get(metrica="ciclo")
+        self.assertEqual((ciclo.estado, ciclo.cantidad), ("CERRADO", 1))
+        self.assertEqual(ciclo.suma_segundos, 86400)
+
+    def test_ejecuciones_solapadas_no_duplican(self):
+        cambiar_estado(self.solicitud, "ENVIADO_A_AREA", self.inicio + timedelta(hours=2))
+        en_lotes = intervalos.en_lotes
+
+        def dos_veces(*args):
+            # Otra ejecución leyó los mismos lotes con la marca anterior
+            lotes = list(en_lotes(*args))
+            return iter(lotes + lotes)
+
+        with mock.patch.object(intervalos, "en_lotes", side_effect=dos_veces):
+            self.assertEqual(self.actualizar(), 2)
+        self.assertEqual(self.tramos(), [("EN_GESTION_MP", 7200), ("ENVIADO_A_AREA", None)])
+        self.assertEqual(AgregadoTiempo.objects.get().cantidad, 1)
+        self.assertEqual(self.actualizar(), 0)
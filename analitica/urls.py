@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import ResumenViewSet, TiempoEnEstadoViewSet
+
+router = DefaultRouter()
+
+router.register(r"analitica/resumen", ResumenViewSet, basename="analitica-resumen")
+router.register(r"analitica/tiempo-en-estado", TiempoEnEstadoViewSet, basename="analitica-tiempo-en-estado")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
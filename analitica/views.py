@@ -0,0 +1,150 @@
+from collections import defaultdict
+
+from django.db.models import Count, Min, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from solicitudes.permissions.django_permissions_coment import DjangoModelPermissionsConMensaje
+from usuarios.models import Area
+from .intervalos import percentil, sumar_histogramas
+from .models import AgregadoTiempo, IntervaloEstado, ResumenDiario
+
+
+class FiltroFechasMixin:
+    def _filtrar_fechas(self, queryset):
+        for parametro, lookup in (("desde", "dia__gte"), ("hasta", "dia__lte")):
+            valor = self.request.query_params.get(parametro)
+            if not valor:
+                continue
+            try:
+                fecha = parse_date(valor)
+            except ValueError:  # bien formada pero inexistente (2024-13-45)
+                fecha = None
+            if fecha is None:
+                raise ValidationError({parametro: "Formato de fecha inválido (AAAA-MM-DD)."})
+            queryset = queryset.filter(**{lookup: fecha})
+        return queryset
+
+
+# 📌 RESUMEN (solo lee los rollups de ResumenDiario)
+# ================================================
+class ResumenViewSet(FiltroFechasMixin, viewsets.GenericViewSet):
+    """
+    Conteos y tiempos de cierre agregados. Filtros: ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD
+    - GET /api/analitica/resumen/?agrupar=estado|area|tipo_documento|dia
+    """
+    queryset = ResumenDiario.objects.all()
+    permission_classes = [permissions.IsAuthenticated, DjangoModelPermissionsConMensaje]
+
+    AGRUPACIONES = {
+        "estado": "estado",
+        "area": "area_id",
+        "tipo_documento": "tipo_documento",
+        "dia": "dia",
+    }
+
+    def list(self, request):
+        agrupar = request.query_params.get("agrupar", "estado")
+        campo = self.AGRUPACIONES.get(agrupar)
+        if campo is None:
+            raise ValidationError({"agrupar": f"Use uno de: {', '.join(self.AGRUPACIONES)}."})
+
+        filas = (
+            self._filtrar_fechas(self.get_queryset())
+            .values(campo)
+            .annotate(
+                ingresadas=Sum("ingresadas"),
+                cerradas=Sum("cerradas"),
+                segundos_cierre=Sum("segundos_cierre"),
+            )
+            .order_by(campo)
+        )
+        areas = (
+            dict(Area.objects.values_list("id", "nombre")) if agrupar == "area" else {}
+        )
+
+        resultados = []
+        for fila in filas:
+            clave = fila[campo]
+            resultados.append({
+                agrupar: clave,
+                **({"area_nombre": areas.get(clave)} if agrupar == "area" else {}),
+                "ingresadas": fila["ingresadas"],
+                "cerradas": fila["cerradas"],
+                "horas_promedio_cierre": (
+                    round(fila["segundos_cierre"] / fila["cerradas"] / 3600, 2) if fila["cerradas"] else None
+                ),
+            })
+        return Response(resultados)
+
+
+def _horas(segundos):
+    return round(segundos / 3600, 2) if segundos is not None else None
+
+
+# 📌 TIEMPO EN ESTADO (agregados de IntervaloEstado)
+# ================================================
+class TiempoEnEstadoViewSet(FiltroFechasMixin, viewsets.GenericViewSet):
+    """
+    Dónde se acumula el trabajo. Filtros: ?desde ?hasta (día de salida) ?area=<id>
+    - GET /api/analitica/tiempo-en-estado/?metrica=estado|ciclo
+      Por estado: tramos cerrados, promedio y p50/p90/p95 en horas; con
+      metrica=estado también los tramos en curso y la antigüedad del más viejo.
+    """
+    queryset = AgregadoTiempo.objects.all()
+    permission_classes = [permissions.IsAuthenticated, DjangoModelPermissionsConMensaje]
+
+    def list(self, request):
+        metrica = request.query_params.get("metrica", "estado")
+        if metrica not in dict(AgregadoTiempo.METRICAS):
+            raise ValidationError({"metrica": "Use 'estado' o 'ciclo'."})
+        area = request.query_params.get("area")
+
+        agregados = self._filtrar_fechas(self.get_queryset().filter(metrica=metrica))
+        abiertos = IntervaloEstado.objects.filter(salida__isnull=True)
+        if area:
+            agregados = agregados.filter(area_id=area)
+            abiertos = abiertos.filter(area_id=area)
+
+        por_estado = defaultdict(lambda: {"cantidad": 0, "suma": 0, "histograma": []})
+        for cantidad, suma, histograma, estado in agregados.values_list(
+            "cantidad", "suma_segundos", "histograma", "estado"
+        ):
+            acumulado = por_estado[estado]
+            acumulado["cantidad"] += cantidad
+            acumulado["suma"] += suma
+            acumulado["histograma"] = sumar_histogramas(acumulado["histograma"], histograma)
+
+        en_curso = {}
+        if metrica == "estado":
+            en_curso = {
+                fila["estado"]: fila
+                for fila in abiertos.values("estado").annotate(cantidad=Count("id"), desde=Min("entrada"))
+            }
+
+        ahora = timezone.now()
+        resultados = []
+        for estado in sorted(set(por_estado) | set(en_curso)):
+            acumulado = por_estado.get(estado) or {"cantidad": 0, "suma": 0, "histograma": []}
+            abierto = en_curso.get(estado)
+            resultados.append({
+                "estado": estado,
+                "cantidad": acumulado["cantidad"],
+                "horas_promedio": (
+                    _horas(acumulado["suma"] / acumulado["cantidad"]) if acumulado["cantidad"] else None
+                ),
+                **{
+                    f"horas_p{p}": _horas(percentil(acumulado["histograma"], p))
+                    for p in (50, 90, 95)
+                },
+                **({
+                    "en_curso": abierto["cantidad"] if abierto else 0,
+                    "horas_mas_antiguo": (
+                        _horas((ahora - abierto["desde"]).total_seconds()) if abierto else None
+                    ),
+                } if metrica == "estado" else {}),
+            })
+        return Response(resultados)
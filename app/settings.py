@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
     'simple_history',
+    'historial',
+    'analitica',
 ]
 
 MIDDLEWARE = [
@@ -59,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
+    'historial.middleware.HistorialAgrupadoMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -85,12 +89,58 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_MOTOR=postgres: PostgreSQL configurado por variables de entorno (POSTGRES_*).
+# Por defecto, SQLite.
+if os.environ.get('DB_MOTOR') == 'postgres':
+    # Pool nativo de Django (psycopg_pool, un pool por proceso). Es incompatible
+    # con CONN_MAX_AGE > 0: sin pool, se reutiliza la conexión CONN_MAX_AGE segundos.
+    DB_POOL = os.environ.get('DB_POOL', '1') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'mesa_de_partes'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('CONN_MAX_AGE', 60)),
+            # Descarta conexiones caídas (reinicio del servidor) antes de usarlas
+            'CONN_HEALTH_CHECKS': True,
+            # iterator() usa cursores del servidor (exportaciones, analítica).
+            # Detrás de pgbouncer en modo transacción hay que desactivarlos.
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_SIN_CURSORES_SERVIDOR') == '1',
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX', 10)),
+                    'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),  # s esperando conexión
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            # SQLite con WAL, PRAGMAs y BEGIN IMMEDIATE con reintento (ver common/db/sqlite3)
+            'ENGINE': 'common.db.sqlite3',
+            # SQLITE_PATH: otra base (p. ej. la temporal de benchmark_servidores)
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Cada atomic() toma el lock de escritura al empezar: sin "database is
+                # locked" al pasar de lectura a escritura con varios workers
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': 5000,  # ms
+                    'cache_size': -20000,  # KiB
+                    'mmap_size': 128 * 1024 * 1024,
+                    'temp_store': 'MEMORY',
+                },
+                'reintentos': {'intentos': 5, 'espera': 0.05},
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -186,4 +236,143 @@ SIMPLE_JWT = {
 }
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / "media"
+
+# OCR de documentos escaneados (pytesseract + binario tesseract)
+OCR_CONFIG = {
+    "idioma": "spa",
+    "max_workers": None,  # None = número de CPUs
+}
+
+# Normalización de imágenes subidas (Pillow): reducción, re-codificación y limpieza EXIF
+NORMALIZACION_IMAGENES = {
+    "activo": True,
+    "dpi": 200,
+    "calidad": 80,
+    "conservar_original": False,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "common": {"handlers": ["console"], "level": "INFO"},
+        "expedientes": {"handlers": ["console"], "level": "INFO"},
+        "solicitudes": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# Layout de media con prefijo hash (expedientes/ab/cd/<id_publico>/...) para subidas nuevas
+MEDIA_SHARDING = False
+
+# Validación de anexos durante la subida: tamaño, tipo (magic bytes) y cuotas.
+# Claves: "defecto" o la etiqueta del modelo de anexo ("app.Modelo").
+VALIDACION_ANEXOS = {
+    "defecto": {
+        "tamano_maximo": 20 * 1024 * 1024,
+        "cuota_usuario": None,
+        "cuota_expediente": 500 * 1024 * 1024,
+    },
+    "solicitudes.ComentarioSolicitudArchivoAnexo": {
+        "tamano_maximo": 10 * 1024 * 1024,
+    },
+}
+
+# Directorio del servidor con los archivos para importaciones masivas de expedientes
+IMPORTACION_DIR = BASE_DIR / "importaciones"
+
+# Historial (simple_history): omitir snapshots sin cambios y agrupar las filas por petición.
+# modo: "sincrono" (una fila por save), "agrupado" (bulk al final de la petición)
+# o "cola" (el bulk se hace en un hilo de fondo)
+HISTORIAL = {
+    "modo": "agrupado",
+    "omitir_sin_cambios": True,
+}
+
+# Retención del historial (manage.py podar_historial).
+# Por modelo: "colapsar_cerradas_meses" deja solo el estado final de lo ligado a
+# solicitudes cerradas hace más de N meses; "conservar_meses" recorta cualquier
+# versión más antigua (la última de cada objeto nunca se borra).
+HISTORIAL_RETENCION = {
+    "directorio": BASE_DIR / "archivo_historial",
+    "lote": 500,
+    "pausa": 0.05,  # segundos entre lotes
+    "politicas": {
+        "solicitudes.Solicitud": {"colapsar_cerradas_meses": 12},
+        "solicitudes.ComentarioSolicitud": {"colapsar_cerradas_meses": 12},
+        "solicitudes.ComentarioSolicitudArchivoAnexo": {"colapsar_cerradas_meses": 12},
+        "solicitudes.UsuarioSolicitudAdjuntado": {"colapsar_cerradas_meses": 12},
+        "expedientes.Expediente": {"colapsar_cerradas_meses": 24},
+    },
+}
+
+# Plazos de atención (solicitudes.sla): días hábiles por estado / tipo de documento.
+# Las reglas específicas se cargan en PlazoSLA y los feriados en Feriado.
+SLA = {
+    "zona_horaria": "America/Lima",
+    "dias_defecto": 2,
+    "estados_sin_plazo": ["REENVIO_MP"],
+    "laborables": [0, 1, 2, 3, 4],  # lunes a viernes
+}
+
+# Vencimientos (manage.py vigilar_vencimientos): marca las solicitudes con
+# fecha_limite pasada y encola un AvisoVencimiento por asignado / jefe.
+VENCIMIENTOS = {
+    "cron": "*/15 * * * *",
+    "lote": 500,
+    "enviar_correo": False,  # requiere EMAIL_* configurado
+}
+
+# Analítica (manage.py actualizar_analitica): rollups incrementales por marca de agua.
+ANALITICA = {
+    "zona_horaria": "America/Lima",  # los días del resumen se cortan en esta zona
+    "lote": 1000,
+    "margen_segundos": 60,  # lo escrito en el último minuto entra en la siguiente ejecución
+}
+
+# Listados grandes (common.utils.streaming.listado): con ?stream=1 o un limit
+# mayor que el umbral, la respuesta JSON se serializa y emite por bloques.
+LISTADO_STREAMING = {
+    "umbral": 200,
+    "chunk_size": 200,
+}
+
+# Caché (common.utils.cache). Memoria local por defecto; con REDIS_URL se usa
+# Redis, compartido entre procesos: con varios workers de gunicorn es lo que
+# hace que una invalidación se vea en todos al instante (en memoria local cada
+# worker solo ve las suyas y el resto espera al timeout). Por eso los listados
+# personales de solicitudes (asignadas, creadas...) y los catálogos de Área y
+# PerfilUsuario solo se cachean con Redis.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "mesa-de-partes",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+CACHE_RESPUESTAS = {
+    "timeout": 300,  # segundos
+}
+
+# Avisos en vivo (GET /api/async/eventos/, SSE; requiere el perfil ASGI).
+# "memoria" solo ve lo publicado en el mismo proceso; con varios procesos
+# (workers WSGI que escriben + ASGI que sirve el stream) hace falta Redis.
+EVENTOS = {
+    "backend": "redis" if os.environ.get("REDIS_URL") else "memoria",
+    "url": os.environ.get("REDIS_URL"),
+    "cola": 100,
+    "keepalive": 15,  # segundos
+    "reintento_ms": 3000,
+}
@@ -11,6 +11,7 @@ urlpatterns = [
     path("api/", include("usuarios.urls")), 
     path("api/", include("expedientes.urls")),
     path("api/", include("solicitudes.urls")),# <-- tus routers aquí
+    path("api/", include("analitica.urls")),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
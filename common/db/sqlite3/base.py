@@ -0,0 +1,66 @@
+"""
+Backend SQLite para producción (ENGINE "common.db.sqlite3").
+
+Sobre el backend de Django agrega:
+- PRAGMAs en cada conexión nueva (OPTIONS["pragmas"]): WAL, synchronous,
+  busy_timeout, cache_size, mmap_size, temp_store
+- Reintento acotado del BEGIN (OPTIONS["reintentos"]) cuando el lock de
+  escritura sigue ocupado tras busy_timeout
+
+Con OPTIONS["transaction_mode"] = "IMMEDIATE" cada atomic() toma el lock de
+escritura en el BEGIN. Con el BEGIN por defecto (DEFERRED), una transacción que
+lee y luego escribe intenta subir de lector a escritor a mitad de camino y,
+si otro proceso escribió entre medio, SQLite responde "database is locked" sin
+esperar (busy_timeout no aplica). Fallar en el BEGIN, en cambio, es seguro de
+reintentar: todavía no se ejecutó nada.
+"""
+import random
+import time
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+PRAGMAS_DEFECTO = {
+    "journal_mode": "WAL",      # lectores y un escritor a la vez; persiste en el archivo
+    "synchronous": "NORMAL",    # seguro con WAL; fsync solo en los checkpoints
+    "busy_timeout": 5000,       # ms esperando el lock antes de fallar
+    "cache_size": -20000,       # negativo = KiB (~20 MB por conexión)
+    "mmap_size": 134217728,     # 128 MB de lecturas por memoria mapeada
+    "temp_store": "MEMORY",
+}
+
+REINTENTOS_DEFECTO = {
+    "intentos": 5,
+    "espera": 0.05,  # segundos; se duplica en cada intento (con variación aleatoria)
+}
+
+
+def _bloqueada(exc):
+    mensaje = str(exc).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**PRAGMAS_DEFECTO, **(kwargs.pop("pragmas", None) or {})}
+        self.reintentos = {**REINTENTOS_DEFECTO, **(kwargs.pop("reintentos", None) or {})}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for nombre, valor in self.pragmas.items():
+            if valor is not None:
+                conn.execute(f"PRAGMA {nombre} = {valor}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        intentos, espera = self.reintentos["intentos"], self.reintentos["espera"]
+        for intento in range(intentos):
+            try:
+                return super()._start_transaction_under_autocommit()
+            except OperationalError as exc:
+                if not _bloqueada(exc) or intento == intentos - 1:
+                    raise
+                time.sleep(espera * (2 ** intento) * random.uniform(0.5, 1.5))
@@ -0,0 +1,206 @@
+"""
+Canal de eventos en vivo (publicar / suscribir) para las vistas SSE.
+
+Backends (EVENTOS["backend"]):
+- "memoria": solo entrega lo publicado en el mismo proceso (runserver, un
+  único worker ASGI que también atiende las escrituras)
+- "redis": pub/sub de Redis; cualquier proceso (workers WSGI, jobs) publica y
+  cada proceso ASGI lo reparte a sus suscriptores locales con UNA sola
+  conexión de escucha, no una por cliente
+
+Los eventos son avisos, no un registro: si un cliente no está conectado se
+los pierde, y al reconectar debe volver a leer su estado una vez.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "eventos:"
+
+CONFIG_DEFECTO = {
+    "backend": "memoria",
+    "url": None,
+    "cola": 100,       # eventos pendientes por suscriptor (se descartan los más viejos)
+    "keepalive": 15,   # segundos entre comentarios ": ping" del stream SSE
+    "reintento_ms": 3000,
+}
+
+
+def config_eventos():
+    return {**CONFIG_DEFECTO, **getattr(settings, "EVENTOS", {})}
+
+
+# ----------------------------
+# Reparto local: canal -> colas de los suscriptores de este proceso
+# ----------------------------
+class _Reparto:
+    def __init__(self):
+        self._suscriptores = {}
+        self._candado = threading.Lock()
+
+    def agregar(self, canal, suscripcion):
+        with self._candado:
+            self._suscriptores.setdefault(canal, set()).add(suscripcion)
+
+    def quitar(self, canal, suscripcion):
+        with self._candado:
+            grupo = self._suscriptores.get(canal)
+            if grupo:
+                grupo.discard(suscripcion)
+                if not grupo:
+                    del self._suscriptores[canal]
+
+    def entregar(self, canal, evento):
+        """Seguro desde cualquier hilo: cada cola se alimenta en el loop de su suscriptor."""
+        with self._candado:
+            destino = list(self._suscriptores.get(canal, ()))
+        for suscripcion in destino:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion.poner, evento)
+            except RuntimeError:
+                pass  # loop cerrado: la suscripción ya no existe
+
+
+class Suscripcion:
+    """`async with canal.suscripcion("usuario:7") as s: evento = await s.siguiente(15)`"""
+
+    def __init__(self, backend, canal):
+        self.backend = backend
+        self.canal = canal
+        self.cola = asyncio.Queue(maxsize=config_eventos()["cola"])
+        self.loop = None
+
+    def poner(self, evento):
+        if self.cola.full():
+            self.cola.get_nowait()  # cliente lento: se pierde el más viejo
+        self.cola.put_nowait(evento)
+
+    async def siguiente(self, espera):
+        """Siguiente evento o None si no llegó ninguno en `espera` segundos."""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout=espera)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        await self.backend.escuchar()
+        self.backend.reparto.agregar(self.canal, self)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.backend.reparto.quitar(self.canal, self)
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class CanalMemoria:
+    def __init__(self, config):
+        self.reparto = _Reparto()
+
+    def publicar(self, canal, evento):
+        self.reparto.entregar(canal, evento)
+
+    async def escuchar(self):
+        pass
+
+    def suscripcion(self, canal):
+        return Suscripcion(self, canal)
+
+
+class CanalRedis(CanalMemoria):
+    def __init__(self, config):
+        import redis
+
+        super().__init__(config)
+        self.url = config["url"]
+        self.cliente = redis.Redis.from_url(self.url)
+        self._escuchas = {}  # loop -> tarea de escucha
+
+    def publicar(self, canal, evento):
+        self.cliente.publish(PREFIJO + canal, json.dumps(evento, cls=DjangoJSONEncoder))
+
+    async def escuchar(self):
+        loop = asyncio.get_running_loop()
+        tarea = self._escuchas.get(loop)
+        if tarea is None or tarea.done():
+            self._escuchas[loop] = loop.create_task(self._escucha())
+
+    async def _escucha(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            try:
+                cliente = aioredis.Redis.from_url(self.url)
+                async with cliente.pubsub() as pubsub:
+                    await pubsub.psubscribe(PREFIJO + "*")
+                    async for mensaje in pubsub.listen():
+                        if mensaje["type"] != "pmessage":
+                            continue
+                        canal = mensaje["channel"].decode()[len(PREFIJO):]
+                        self.reparto.entregar(canal, json.loads(mensaje["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Escucha de eventos en Redis interrumpida; reintentando")
+                await asyncio.sleep(1)
+
+
+BACKENDS = {"memoria": CanalMemoria, "redis": CanalRedis}
+
+
+@lru_cache(maxsize=None)
+def canal_eventos():
+    config = config_eventos()
+    return BACKENDS[config["backend"]](config)
+
+
+def publicar(canal, tipo, **datos):
+    """Publica tras el commit (nunca se avisa de algo que luego se revierte)."""
+    evento = {"id": time.time_ns(), "tipo": tipo, **datos}
+
+    def enviar():
+        try:
+            canal_eventos().publicar(canal, evento)
+        except Exception:
+            # Un aviso perdido no debe romper la escritura que lo originó
+            logger.exception("No se pudo publicar el evento %s en %s", tipo, canal)
+
+    transaction.on_commit(enviar)
+
+
+# ----------------------------
+# Stream SSE
+# ----------------------------
+def _mensaje(evento):
+    datos = json.dumps(evento, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+
+def respuesta_sse(canal):
+    """text/event-stream con los eventos de `canal` y un ": ping" periódico (solo ASGI)."""
+    config = config_eventos()
+
+    async def emitir():
+        async with canal_eventos().suscripcion(canal) as suscripcion:
+            yield f"retry: {config['reintento_ms']}\n\n"
+            while True:
+                evento = await suscripcion.siguiente(config["keepalive"])
+                # El ping mantiene viva la conexión en proxies y detecta clientes caídos
+                yield _mensaje(evento) if evento else ": ping\n\n"
+
+    response = StreamingHttpResponse(emitir(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: no acumular el stream
+    return response
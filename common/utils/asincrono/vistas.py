@@ -0,0 +1,123 @@
+"""
+Utilidades para vistas async de solo lectura (Django puro: DRF no tiene vistas async).
+
+- usuario_autenticado: JWT (Authorization: Bearer) o sesión, sin bloquear el loop
+- en_paralelo: consultas independientes en hilos distintos, cada uno con su conexión
+- paginar: mismo formato que LimitOffsetPagination (count / next / previous / results)
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+def respuesta_json(datos, status=200):
+    return JsonResponse(datos, status=status, safe=False, encoder=JSONEncoder)
+
+
+async def usuario_autenticado(request, token_en_query=False):
+    """
+    Usuario activo de la petición o None. Con `token_en_query` también se acepta
+    ?token=<access> (EventSource no puede enviar la cabecera Authorization).
+    """
+    cabecera = request.headers.get("Authorization", "")
+    partes = cabecera.split()
+    if token_en_query and not partes and request.GET.get("token"):
+        partes = [jwt_settings.AUTH_HEADER_TYPES[0], request.GET["token"]]
+    if len(partes) == 2 and partes[0] in jwt_settings.AUTH_HEADER_TYPES:
+        try:
+            # Validar la firma no toca la base de datos
+            token = JWTAuthentication().get_validated_token(partes[1].encode())
+        except (InvalidToken, TokenError):
+            return None
+        return await get_user_model().objects.filter(
+            **{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]}, is_active=True
+        ).afirst()
+    usuario = await request.auser()
+    return usuario if usuario.is_authenticated else None
+
+
+def autenticada(vista=None, *, token_en_query=False):
+    """
+    Exige usuario autenticado (401 con el mismo cuerpo que DRF) y lo deja en request.user.
+    Uso: @autenticada o @autenticada(token_en_query=True).
+    """
+    if vista is None:
+        return lambda funcion: autenticada(funcion, token_en_query=token_en_query)
+
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        if request.method != "GET":
+            return respuesta_json({"detail": f'Método "{request.method}" no permitido.'}, status=405)
+        usuario = await usuario_autenticado(request, token_en_query=token_en_query)
+        if usuario is None:
+            return respuesta_json(
+                {"detail": "Las credenciales de autenticación no se proveyeron o no son válidas."},
+                status=401,
+            )
+        request.user = usuario
+        return await vista(request, *args, **kwargs)
+    return envoltura
+
+
+async def en_paralelo(*funciones):
+    """
+    Ejecuta funciones síncronas (ORM + serialización) a la vez, cada una en un
+    hilo del pool con su propia conexión, que se cierra al terminar.
+    """
+    def aislada(funcion):
+        def ejecutar():
+            try:
+                return funcion()
+            finally:
+                connections.close_all()
+        return ejecutar
+
+    return await asyncio.gather(
+        *(sync_to_async(aislada(funcion), thread_sensitive=False)() for funcion in funciones)
+    )
+
+
+def _entero(valor, defecto):
+    try:
+        return max(int(valor), 0)
+    except (TypeError, ValueError):
+        return defecto
+
+
+async def paginar(request, queryset, serializar):
+    """
+    Página limit/offset de `queryset`; `serializar(filas)` corre fuera del loop.
+    El conteo y la página se consultan en paralelo.
+    """
+    limite = _entero(request.GET.get("limit"), settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10) or 10
+    desplazamiento = _entero(request.GET.get("offset"), 0)
+
+    total, datos = await en_paralelo(
+        queryset.count,
+        lambda: serializar(list(queryset[desplazamiento:desplazamiento + limite])),
+    )
+
+    url = request.build_absolute_uri()
+    siguiente = anterior = None
+    if desplazamiento + limite < total:
+        siguiente = replace_query_param(
+            replace_query_param(url, "limit", limite), "offset", desplazamiento + limite
+        )
+    if desplazamiento > 0:
+        anterior = replace_query_param(url, "limit", limite)
+        anterior = (
+            remove_query_param(anterior, "offset")
+            if desplazamiento - limite <= 0
+            else replace_query_param(anterior, "offset", desplazamiento - limite)
+        )
+    return respuesta_json({"count": total, "next": siguiente, "previous": anterior, "results": datos})
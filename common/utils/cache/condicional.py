@@ -0,0 +1,126 @@
+import hashlib
+from functools import partial
+
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class GetCondicionalMixin:
+    """
+    GET condicional (If-None-Match / If-Modified-Since) para list y retrieve.
+
+    El validador se calcula solo sobre las filas de la página pedida (limit /
+    offset): por cada fila, una subconsulta correlacionada con el máximo de
+    cada campo de `validador_fechas` y otra con el conteo de cada relación de
+    `validador_conteos` (los conteos detectan borrados, que no mueven ninguna
+    fecha). Cada subconsulta recorre una sola relación, sin el producto
+    cartesiano de unirlas todas. Si el cliente ya tiene esa versión se
+    responde 304 sin serializar.
+
+    - validador_fechas = ["fecha_actualizacion", "comentarios__fecha_creacion", ...]
+    - validador_conteos = ["comentarios", ...]
+
+    Last-Modified / If-Modified-Since solo se usan cuando la fecha refleja
+    todo cambio: en retrieve y sin `validador_conteos`. En list una fila
+    puede borrarse o salir de la página sin mover ninguna fecha, y los
+    borrados de relaciones solo se ven en los conteos; ahí vale solo el ETag.
+    """
+    validador_fechas = ["fecha_actualizacion"]
+    validador_conteos = []
+
+    def _pagina(self, queryset):
+        """(queryset de la página, total) con los mismos límites que LimitOffsetPagination."""
+        paginador = self.paginator
+        if paginador is None or not hasattr(paginador, "get_limit"):
+            return queryset, None
+        limite = paginador.get_limit(self.request)
+        if limite is None:
+            return queryset, None
+        desde = paginador.get_offset(self.request)
+        # El total también cambia la respuesta (count, next / previous)
+        return queryset[desde:desde + limite], queryset.count()
+
+    def _por_fila(self, modelo, camino, agregado):
+        if "__" not in camino and agregado is Max:
+            return F(camino)
+        return Subquery(
+            modelo.objects.filter(pk=OuterRef("pk"))
+            .order_by()
+            .values("pk")
+            .annotate(valor=agregado(camino))
+            .values("valor")[:1]
+        )
+
+    def validador(self, queryset, paginar=False):
+        """
+        (etag, última modificación) de las filas que se van a devolver, para
+        este usuario y esta URL. La última modificación es None si la fecha no
+        basta para detectar todo cambio (ver la docstring de la clase).
+        """
+        total = None
+        if paginar:
+            queryset, total = self._pagina(queryset)
+        modelo = queryset.model
+        anotaciones = {
+            f"fecha_{i}": self._por_fila(modelo, campo, Max) for i, campo in enumerate(self.validador_fechas)
+        }
+        anotaciones.update({
+            f"conteo_{i}": self._por_fila(modelo, relacion, partial(Count, distinct=True))
+            for i, relacion in enumerate(self.validador_conteos)
+        })
+        filas = list(queryset.annotate(**anotaciones).values_list("pk", *anotaciones))
+
+        ultima = None
+        if not paginar and not self.validador_conteos:
+            fechas = [valor for fila in filas for valor in fila[1:len(self.validador_fechas) + 1] if valor]
+            ultima = max(fechas) if fechas else None
+        base = repr((
+            filas,
+            total,
+            self.request.user.pk,  # la respuesta puede variar por usuario
+            self.request.get_full_path(),
+        ))
+        return hashlib.sha1(base.encode("utf-8")).hexdigest(), ultima
+
+    def _sin_cambios(self, etag, ultima):
+        si_no_coincide = self.request.META.get("HTTP_IF_NONE_MATCH")
+        if si_no_coincide:
+            # If-None-Match manda sobre If-Modified-Since (RFC 9110)
+            etags = parse_etags(si_no_coincide)
+            return "*" in etags or quote_etag(etag) in etags or f"W/{quote_etag(etag)}" in etags
+        desde = parse_http_date_safe(self.request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+        return bool(desde and ultima and int(ultima.timestamp()) <= desde)
+
+    def _con_validadores(self, response, etag, ultima):
+        response["ETag"] = quote_etag(etag)
+        if ultima:
+            response["Last-Modified"] = http_date(ultima.timestamp())
+        # El cliente debe revalidar siempre (no hay max-age)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def respuesta_condicional(self, queryset, generar, paginar=False):
+        etag, ultima = self.validador(queryset, paginar)
+        if self._sin_cambios(etag, ultima):
+            return self._con_validadores(Response(status=status.HTTP_304_NOT_MODIFIED), etag, ultima)
+        response = generar()
+        if response.status_code == status.HTTP_200_OK:
+            self._con_validadores(response, etag, ultima)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_condicional(
+            self.filter_queryset(self.get_queryset()),
+            lambda: super(GetCondicionalMixin, self).list(request, *args, **kwargs),
+            paginar=True,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object() primero: 404 y permisos de objeto como siempre
+        instancia = self.get_object()
+        return self.respuesta_condicional(
+            type(instancia).objects.filter(pk=instancia.pk),
+            lambda: Response(self.get_serializer(instancia).data),
+        )
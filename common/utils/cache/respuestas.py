@@ -0,0 +1,92 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .versiones import generaciones
+
+CONFIG_DEFECTO = {
+    "timeout": 300,
+}
+
+# Backends cuyo contenido vive en cada proceso: los workers no ven las
+# invalidaciones (generaciones) de los demás
+BACKENDS_LOCALES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def config_cache_respuestas():
+    return {**CONFIG_DEFECTO, **getattr(settings, "CACHE_RESPUESTAS", {})}
+
+
+def cache_compartida():
+    """True si la caché por defecto la comparten todos los procesos (Redis, Memcached, BD...)."""
+    return settings.CACHES["default"]["BACKEND"] not in BACKENDS_LOCALES
+
+
+class CacheRespuestaMixin:
+    """
+    Cachea `response.data` de las acciones GET en `cache_acciones`, por ruta,
+    parámetros de consulta y la generación de cada espacio de `cache_espacios`
+    (ver common.utils.cache.versiones). Los permisos se siguen evaluando en
+    cada petición: solo se omite la consulta y la serialización.
+
+    - cache_espacios: etiquetas de modelo ("usuarios.Area") u otros espacios
+    - espacios_cache(): para espacios que dependen del usuario o la acción
+    - cache_solo_compartida: no cachear si la caché es local a cada proceso
+      (datos que cambian seguido: otro worker serviría la versión vieja)
+    """
+    cache_acciones = ("list", "retrieve")
+    cache_espacios = ()
+    cache_solo_compartida = False
+
+    def espacios_cache(self):
+        return list(self.cache_espacios)
+
+    def clave_cache(self, espacios):
+        parametros = sorted(self.request.query_params.lists())
+        versiones = sorted(generaciones(espacios).items())
+        base = repr((
+            type(self).__module__,
+            type(self).__name__,
+            self.action,
+            self.request.get_host(),  # los enlaces next/previous son absolutos
+            sorted(self.kwargs.items()),
+            parametros,
+            versiones,
+        ))
+        return "resp:" + hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+    def con_cache(self, generar):
+        """Devuelve la respuesta cacheada o la genera con `generar()` y la guarda si es 200."""
+        if self.request.method != "GET" or self.action not in self.cache_acciones:
+            return generar()
+        if self.cache_solo_compartida and not cache_compartida():
+            return generar()
+
+        espacios = self.espacios_cache()
+        if espacios is None:  # la vista decidió no cachear esta petición
+            return generar()
+
+        clave = self.clave_cache(espacios)
+        datos = cache.get(clave)
+        if datos is not None:
+            response = Response(datos)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = generar()
+        # Solo respuestas DRF completas (no StreamingHttpResponse ni errores)
+        if isinstance(response, Response) and response.status_code == 200:
+            cache.set(clave, response.data, config_cache_respuestas()["timeout"])
+            response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.con_cache(lambda: super(CacheRespuestaMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.con_cache(lambda: super(CacheRespuestaMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,64 @@
+"""
+Contadores de generación por "espacio" (p. ej. "usuarios.Area" o
+"solicitudes:usuario:7"). Las claves de caché incluyen la generación vigente de
+cada espacio del que dependen: al incrementarla, las entradas viejas dejan de
+encontrarse y expiran solas. Invalidar cuesta un INCR, no un barrido.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+PREFIJO = "gen:"
+
+
+def _clave(espacio):
+    return f"{PREFIJO}{espacio}"
+
+
+def _inicial():
+    # Si el contador se pierde (desalojo, reinicio), el nuevo valor no puede
+    # coincidir con uno anterior: se parte de un valor basado en la hora
+    return time.time_ns()
+
+
+def generaciones(espacios):
+    """{espacio: generación} en una sola lectura; crea las que falten."""
+    claves = {_clave(espacio): espacio for espacio in espacios}
+    vigentes = cache.get_many(list(claves))
+    for clave in claves.keys() - vigentes.keys():
+        cache.add(clave, _inicial(), timeout=None)
+        vigentes[clave] = cache.get(clave)
+    return {claves[clave]: valor for clave, valor in vigentes.items()}
+
+
+def incrementar(*espacios):
+    for espacio in set(espacios):
+        try:
+            cache.incr(_clave(espacio))
+        except ValueError:
+            # No existía: cualquier valor nuevo invalida lo anterior
+            cache.set(_clave(espacio), _inicial(), timeout=None)
+
+
+def espacio_de(modelo):
+    return modelo._meta.label
+
+
+def conectar_invalidacion(*modelos):
+    """
+    Cada post_save / post_delete de `modelos` incrementa la generación del
+    modelo tras el commit: antes, una petición concurrente podría guardar los
+    datos sin confirmar con la generación nueva.
+    """
+    for modelo in modelos:
+        receptor = _receptor(espacio_de(modelo))
+        post_save.connect(receptor, sender=modelo, weak=False, dispatch_uid=f"gen_{espacio_de(modelo)}_save")
+        post_delete.connect(receptor, sender=modelo, weak=False, dispatch_uid=f"gen_{espacio_de(modelo)}_delete")
+
+
+def _receptor(espacio):
+    def receptor(**kwargs):
+        transaction.on_commit(lambda: incrementar(espacio))
+    return receptor
@@ -0,0 +1,51 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+
+class CalendarioLaboral:
+    """
+    Días hábiles precalculados entre `desde` y `hasta` como un arreglo
+    ordenado de ordinales: sumar N días hábiles es un bisect + un índice.
+
+    `laborables`: días de la semana hábiles (0 = lunes ... 6 = domingo).
+    """
+
+    def __init__(self, desde, hasta, feriados=(), laborables=(0, 1, 2, 3, 4)):
+        feriados = {f.toordinal() for f in feriados}
+        laborables = set(laborables)
+        self.desde = desde
+        self.hasta = hasta
+        self.dias = [
+            ordinal
+            for ordinal in range(desde.toordinal(), hasta.toordinal() + 1)
+            if ordinal not in feriados and date.fromordinal(ordinal).weekday() in laborables
+        ]
+
+    def cubre(self, fecha):
+        return self.desde <= fecha <= self.hasta
+
+    def es_habil(self, fecha):
+        ordinal = fecha.toordinal()
+        i = bisect_left(self.dias, ordinal)
+        return i < len(self.dias) and self.dias[i] == ordinal
+
+    def sumar_dias_habiles(self, momento, dias):
+        """
+        `momento` + `dias` días hábiles, contando desde el día hábil siguiente
+        y conservando la hora. Con dias=0 devuelve `momento`.
+        ValueError si el resultado cae fuera del rango precalculado.
+        """
+        if dias <= 0:
+            return momento
+        fecha = momento.date() if isinstance(momento, datetime) else momento
+        i = bisect_right(self.dias, fecha.toordinal()) + dias - 1
+        if i >= len(self.dias):
+            raise ValueError("La fecha queda fuera del calendario precalculado.")
+        destino = date.fromordinal(self.dias[i])
+        if isinstance(momento, datetime):
+            return momento + timedelta(days=(destino - fecha).days)
+        return destino
+
+    def dias_habiles_entre(self, inicio, fin):
+        """Días hábiles en (inicio, fin]: dos bisects."""
+        return max(bisect_right(self.dias, fin.toordinal()) - bisect_right(self.dias, inicio.toordinal()), 0)
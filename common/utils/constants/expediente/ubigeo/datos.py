@@ -9811,6 +9811,13 @@ DISTRITOS = {
     for prov in UBIGEOS[dpto]
 }
 
+# Tripletas válidas: permite validar lotes completos con una sola búsqueda por fila
+UBIGEOS_VALIDOS = frozenset(
+    (dpto, prov, dist)
+    for (dpto, prov), distritos in DISTRITOS.items()
+    for dist in distritos
+)
+
 DEPARTAMENTO_CHOICES = [(d, d.title()) for d in DEPARTAMENTOS]
 
 PROVINCIA_CHOICES = [
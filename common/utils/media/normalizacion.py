@@ -0,0 +1,184 @@
+import contextlib
+import logging
+import os
+import shutil
+from functools import partial
+
+from django.conf import settings
+from django.db.models.signals import post_save, pre_save
+
+from common.utils.workers.pool import encolar, obtener_pool
+
+logger = logging.getLogger(__name__)
+
+POOL = "imagenes"
+
+CONFIG_DEFECTO = {
+    "activo": True,
+    "dpi": 200,                 # resolución objetivo
+    "lado_pagina_pulgadas": 11.69,  # lado largo de una hoja A4
+    "calidad": 80,              # calidad JPEG de re-codificación
+    "conservar_original": False,  # copia el original en <carpeta>/originales/
+    "ahorro_minimo": 0.10,      # solo reemplaza si ahorra al menos 10 %
+    "max_workers": None,        # None = número de CPUs
+}
+
+FORMATOS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+
+def obtener_config():
+    return {**CONFIG_DEFECTO, **getattr(settings, "NORMALIZACION_IMAGENES", {})}
+
+
+# ================================================
+# 🔧 TRABAJO (se ejecuta en el pool de procesos)
+# ================================================
+def normalizar_imagen(ruta, config):
+    """
+    Reduce la imagen a la resolución objetivo, la re-codifica y elimina
+    los metadatos EXIF. El reemplazo es atómico (os.replace) para que otros
+    lectores, como el OCR, nunca vean un archivo a medio escribir.
+
+    Nunca lanza: si el archivo falla (dañado, borrado, disco lleno...) devuelve
+    {"ruta", "error"} y el resto del lote sigue. El temporal se borra siempre.
+    """
+    temporal = f"{ruta}.normalizando"
+    try:
+        return _normalizar(ruta, config, temporal)
+    except Exception as error:
+        return {"ruta": ruta, "error": f"{type(error).__name__}: {error}"}
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporal)
+
+
+def _normalizar(ruta, config, temporal):
+    from PIL import Image, ImageOps
+
+    formato = FORMATOS.get(os.path.splitext(ruta)[1].lower())
+    antes = os.path.getsize(ruta)
+    resultado = {"ruta": ruta, "antes": antes, "despues": antes, "reemplazado": False}
+    if formato is None:
+        return resultado
+
+    with Image.open(ruta) as original:
+        # Aplica la rotación EXIF antes de descartar los metadatos
+        imagen = ImageOps.exif_transpose(original)
+        dpi_origen = original.info.get("dpi", (0, 0))[0] or 0
+
+        escala = 1.0
+        if dpi_origen > config["dpi"]:
+            escala = config["dpi"] / dpi_origen
+        lado_maximo = int(config["dpi"] * config["lado_pagina_pulgadas"])
+        escala = min(escala, lado_maximo / max(imagen.size))
+        if escala < 1.0:
+            nuevo = (max(1, int(imagen.width * escala)), max(1, int(imagen.height * escala)))
+            imagen = imagen.resize(nuevo, Image.Resampling.LANCZOS)
+
+        opciones = {"dpi": (config["dpi"], config["dpi"])}
+        if formato == "JPEG":
+            if imagen.mode not in ("RGB", "L"):
+                imagen = imagen.convert("RGB")
+            opciones.update(quality=config["calidad"], optimize=True, progressive=True)
+        else:
+            opciones.update(optimize=True)
+        imagen.save(temporal, formato, **opciones)
+
+    despues = os.path.getsize(temporal)
+    if despues > antes * (1 - config["ahorro_minimo"]):
+        return resultado
+
+    if config["conservar_original"]:
+        carpeta = os.path.join(os.path.dirname(ruta), "originales")
+        os.makedirs(carpeta, exist_ok=True)
+        shutil.copy2(ruta, os.path.join(carpeta, os.path.basename(ruta)))
+
+    os.replace(temporal, ruta)
+    resultado.update(despues=despues, reemplazado=True)
+    return resultado
+
+
+def reportar(resultado):
+    if "error" in resultado:
+        logger.warning("No se pudo normalizar %s: %s", resultado["ruta"], resultado["error"])
+        return 0
+    ahorro = resultado["antes"] - resultado["despues"]
+    if resultado["reemplazado"]:
+        logger.info(
+            "Imagen normalizada %s: %d -> %d bytes (%d bytes ahorrados)",
+            resultado["ruta"], resultado["antes"], resultado["despues"], ahorro,
+        )
+    return ahorro
+
+
+# ================================================
+# 📌 PROGRAMACIÓN
+# ================================================
+def es_imagen(nombre):
+    return os.path.splitext(nombre)[1].lower() in FORMATOS
+
+
+def programar_normalizacion(archivos):
+    """
+    Envía al pool los FieldFile que sean imágenes, una vez confirmada
+    la transacción que los registró.
+    """
+    config = obtener_config()
+    if not config["activo"]:
+        return
+    for archivo in archivos:
+        if archivo and es_imagen(archivo.name):
+            encolar(
+                POOL,
+                normalizar_imagen,
+                archivo.path,
+                config,
+                al_terminar=reportar,
+                max_workers=config["max_workers"],
+            )
+
+
+def normalizar_lote(rutas):
+    """
+    Normaliza sincrónicamente un lote de rutas en el pool (comando de mantenimiento).
+    Los archivos que fallan vuelven como {"ruta", "error"}.
+    """
+    config = obtener_config()
+    pool = obtener_pool(POOL, config["max_workers"])
+    return list(pool.map(normalizar_imagen, rutas, [config] * len(rutas)))
+
+
+# ================================================
+# 🔔 SEÑALES (solo archivos recién subidos)
+# ================================================
+def marcar_archivos_nuevos(sender, instance, campos, **kwargs):
+    """pre_save: recuerda qué FileField traen un archivo aún no guardado en disco."""
+    instance._archivos_nuevos = [
+        campo for campo in campos
+        if getattr(instance, campo) and not getattr(instance, campo)._committed
+    ]
+
+
+def normalizar_archivos_nuevos(sender, instance, raw=False, **kwargs):
+    """post_save: programa la normalización de los archivos marcados en pre_save."""
+    campos = getattr(instance, "_archivos_nuevos", [])
+    if raw or not campos:
+        return
+    del instance._archivos_nuevos
+    programar_normalizacion([getattr(instance, campo) for campo in campos])
+
+
+def conectar_normalizacion(modelo, *campos):
+    """Activa la normalización para los FileField `campos` de `modelo`."""
+    etiqueta = modelo._meta.label
+    pre_save.connect(
+        partial(marcar_archivos_nuevos, campos=campos),
+        sender=modelo,
+        weak=False,
+        dispatch_uid=f"normalizacion-pre-{etiqueta}",
+    )
+    post_save.connect(
+        normalizar_archivos_nuevos,
+        sender=modelo,
+        dispatch_uid=f"normalizacion-post-{etiqueta}",
+    )
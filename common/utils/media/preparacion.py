@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class ArchivosPreparados:
+    """
+    Escribe los archivos subidos en el storage ANTES de abrir la transacción,
+    para que el lock de escritura de la BD no se retenga mientras hay E/S de
+    disco. Las filas se insertan después con bulk_create usando los nombres ya
+    guardados; si la preparación o la transacción fallan, los archivos
+    preparados se eliminan:
+
+        with preparados.preparando():
+            ...preparados.guardar(...)
+        with preparados.transaccion():
+            ...bulk_create(...)
+    """
+
+    def __init__(self):
+        self._guardados = []
+
+    def guardar(self, instancia, campo, archivo, ruta=None):
+        """
+        Guarda `archivo` en el storage del FileField `campo` y lo asigna a
+        `instancia` (sin guardarla). `ruta` reemplaza al upload_to del campo.
+        """
+        field = instancia._meta.get_field(campo)
+        if ruta:
+            nombre = field.storage.generate_filename(ruta)
+        else:
+            nombre = field.generate_filename(instancia, archivo.name)
+        nombre = field.storage.save(nombre, archivo, max_length=field.max_length)
+        self._guardados.append((field.storage, nombre))
+        # Asignar el nombre deja el FieldFile "committed": bulk_create no lo reescribe
+        setattr(instancia, campo, nombre)
+        return instancia
+
+    @contextmanager
+    def preparando(self):
+        """Bloque en que se guardan los archivos: si algo falla, se eliminan los ya escritos."""
+        try:
+            yield self
+        except BaseException:
+            self.descartar()
+            raise
+
+    def descartar(self):
+        for storage, nombre in self._guardados:
+            storage.delete(nombre)
+        self._guardados.clear()
+
+    @contextmanager
+    def transaccion(self):
+        """transaction.atomic() que elimina los archivos preparados si hay rollback."""
+        try:
+            with transaction.atomic():
+                yield
+        except BaseException:
+            self.descartar()
+            raise
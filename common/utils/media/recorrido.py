@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def _escanear(directorio):
+    archivos, subdirectorios = [], []
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if entrada.is_dir(follow_symlinks=False):
+                subdirectorios.append(entrada.path)
+            elif entrada.is_file(follow_symlinks=False):
+                archivos.append((entrada.path, entrada.stat(follow_symlinks=False).st_mtime))
+    return archivos, subdirectorios
+
+
+def recorrer_en_paralelo(raiz, hilos=8):
+    """
+    Recorre `raiz` con una cola de trabajo: cada directorio es una tarea
+    y sus subdirectorios se encolan en cuanto se descubren, así el árbol
+    se lista con `hilos` scandir simultáneos. Genera (ruta, mtime).
+    """
+    if not os.path.isdir(raiz):
+        return
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        pendientes = {pool.submit(_escanear, raiz)}
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                archivos, subdirectorios = futuro.result()
+                yield from archivos
+                pendientes |= {pool.submit(_escanear, d) for d in subdirectorios}
+
+
+def eliminar_directorios_vacios(raiz):
+    """Elimina, de abajo hacia arriba, los directorios que quedaron vacíos."""
+    eliminados = 0
+    for directorio, subdirectorios, archivos in os.walk(raiz, topdown=False):
+        if directorio != str(raiz) and not os.listdir(directorio):
+            os.rmdir(directorio)
+            eliminados += 1
+    return eliminados
@@ -0,0 +1,19 @@
+import hashlib
+
+from django.conf import settings
+
+
+def ruta_media(raiz, clave, *partes):
+    """
+    Arma la ruta de subida `raiz/clave/partes...`.
+
+    Con MEDIA_SHARDING activo se antepone un prefijo de dos niveles derivado
+    del hash de la clave (`raiz/ab/cd/clave/...`), para que ningún directorio
+    acumule miles de carpetas. Solo afecta a archivos nuevos: los existentes
+    conservan la ruta guardada en la BD.
+    """
+    clave = str(clave)
+    if getattr(settings, "MEDIA_SHARDING", False):
+        digest = hashlib.sha1(clave.encode("utf-8")).hexdigest()
+        return "/".join([raiz, digest[:2], digest[2:4], clave, *map(str, partes)])
+    return "/".join([raiz, clave, *map(str, partes)])
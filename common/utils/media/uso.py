@@ -0,0 +1,131 @@
+"""
+Uso de almacenamiento por usuario y por expediente (usuarios.UsoAlmacenamiento).
+
+Cada archivo subido se carga al guardarse, con su tamaño real, y queda
+registrado en ArchivoAlmacenado (quién lo subió, su expediente, sus bytes):
+al reemplazarlo o borrar el objeto se descuenta exactamente lo cargado.
+El expediente sale del propio objeto, así que también cuenta en la creación.
+El usuario es el de la petición en curso (ValidacionAnexosMixin); fuera de
+una petición solo se carga el expediente.
+
+Los caminos con bulk_create no emiten post_save: llaman a `cargar_archivos`.
+"""
+from contextvars import ContextVar
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+_usuario_actual = ContextVar("usuario_subida", default=None)
+
+# modelo -> función que devuelve el id del expediente de una instancia
+_expediente_de = {}
+
+
+def usar_usuario(obtener_usuario):
+    """Define quién sube los archivos en este contexto; devuelve el token para `soltar_usuario`."""
+    return _usuario_actual.set(obtener_usuario)
+
+
+def soltar_usuario(token):
+    _usuario_actual.reset(token)
+
+
+def usuario_actual():
+    obtener = _usuario_actual.get()
+    usuario = obtener() if obtener else None
+    return usuario.id if usuario is not None and usuario.is_authenticated else None
+
+
+def _cargar(registro, signo):
+    from usuarios.models import UsoAlmacenamiento
+
+    cantidad = signo * registro.bytes
+    if registro.usuario_id:
+        UsoAlmacenamiento.sumar("usuario", registro.usuario_id, cantidad)
+    if registro.expediente_id:
+        UsoAlmacenamiento.sumar("expediente", registro.expediente_id, cantidad)
+
+
+def _registrar(instancia, subidas):
+    """Carga {campo: bytes} de `instancia` y libera lo del archivo que cada uno reemplaza."""
+    from usuarios.models import ArchivoAlmacenado
+
+    modelo = type(instancia)
+    content_type = ContentType.objects.get_for_model(modelo)
+    usuario_id = usuario_actual()
+    expediente_id = _expediente_de[modelo](instancia)
+    with transaction.atomic():
+        for campo, cantidad in subidas.items():
+            previo = ArchivoAlmacenado.objects.filter(
+                content_type=content_type, objeto_id=instancia.pk, campo=campo
+            ).first()
+            if previo is not None:
+                _cargar(previo, -1)
+                previo.delete()
+            _cargar(ArchivoAlmacenado.objects.create(
+                content_type=content_type,
+                objeto_id=instancia.pk,
+                campo=campo,
+                usuario_id=usuario_id,
+                expediente_id=expediente_id,
+                bytes=cantidad,
+            ), +1)
+
+
+def cargar_archivos(objetos, *campos):
+    """Carga los archivos de objetos ya insertados sin post_save (bulk_create)."""
+    for objeto in objetos:
+        subidas = {campo: getattr(objeto, campo).size for campo in campos if getattr(objeto, campo)}
+        if subidas:
+            _registrar(objeto, subidas)
+
+
+# ================================================
+# 🔔 SEÑALES
+# ================================================
+def marcar_subidas(sender, instance, campos, **kwargs):
+    """pre_save: bytes de cada FileField que trae un archivo aún no guardado en disco."""
+    instance._subidas = {
+        campo: getattr(instance, campo).size
+        for campo in campos
+        if getattr(instance, campo) and not getattr(instance, campo)._committed
+    }
+
+
+def cargar_subidas(sender, instance, raw=False, **kwargs):
+    """post_save: carga los archivos marcados en pre_save."""
+    subidas = instance.__dict__.pop("_subidas", None)
+    if raw or not subidas:
+        return
+    _registrar(instance, subidas)
+
+
+def liberar_subidas(sender, instance, **kwargs):
+    """post_delete: descuenta lo cargado por los archivos del objeto."""
+    from usuarios.models import ArchivoAlmacenado
+
+    registros = ArchivoAlmacenado.objects.filter(
+        content_type=ContentType.objects.get_for_model(sender), objeto_id=instance.pk
+    )
+    for registro in registros:
+        _cargar(registro, -1)
+    registros.delete()
+
+
+def conectar_uso(modelo, expediente_de, *campos):
+    """
+    Cuenta los FileField `campos` de `modelo` en las cuotas.
+    `expediente_de(instancia)` devuelve el id del expediente al que pertenece.
+    """
+    etiqueta = modelo._meta.label
+    _expediente_de[modelo] = expediente_de
+    pre_save.connect(
+        partial(marcar_subidas, campos=campos),
+        sender=modelo,
+        weak=False,
+        dispatch_uid=f"uso-pre-{etiqueta}",
+    )
+    post_save.connect(cargar_subidas, sender=modelo, dispatch_uid=f"uso-post-{etiqueta}")
+    post_delete.connect(liberar_subidas, sender=modelo, dispatch_uid=f"uso-delete-{etiqueta}")
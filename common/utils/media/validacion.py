@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+from .uso import soltar_usuario, usar_usuario
+
+MB = 1024 * 1024
+
+# Firmas (magic bytes) de los formatos aceptados como anexo
+FIRMAS = {
+    "pdf": [b"%PDF-"],
+    "jpeg": [b"\xff\xd8\xff"],
+    "png": [b"\x89PNG\r\n\x1a\n"],
+    "tiff": [b"II*\x00", b"MM\x00*"],
+    "gif": [b"GIF87a", b"GIF89a"],
+    "office": [b"PK\x03\x04"],  # docx / xlsx / pptx (contenedores ZIP)
+    "office_antiguo": [b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"],  # doc / xls
+}
+
+POLITICA_DEFECTO = {
+    "tamano_maximo": 20 * MB,  # por archivo
+    "tipos": ["pdf", "jpeg", "png", "tiff", "gif", "office", "office_antiguo"],
+    "cuota_usuario": None,     # bytes totales subidos por usuario (None = sin límite)
+    "cuota_expediente": None,  # bytes totales por expediente (None = sin límite)
+}
+
+
+class ArchivoRechazado(MultiPartParserError):
+    """
+    Se lanza durante el parseo del multipart. DRF la convierte en un 400
+    (ParseError) y el resto del cuerpo no se llega a leer.
+    """
+
+
+def obtener_politica(modelo):
+    """Política del modelo de anexo (`app.Modelo`), sobre la política por defecto."""
+    politicas = getattr(settings, "VALIDACION_ANEXOS", {})
+    return {**POLITICA_DEFECTO, **politicas.get("defecto", {}), **politicas.get(modelo, {})}
+
+
+def detectar_tipo(cabecera):
+    for tipo, firmas in FIRMAS.items():
+        if any(cabecera.startswith(firma) for firma in firmas):
+            return tipo
+    return None
+
+
+class ValidacionAnexosUploadHandler(FileUploadHandler):
+    """
+    Primer handler de la cadena: valida cada archivo mientras llega.
+
+    - Tamaño declarado (Content-Length) contra las cuotas, antes de leer nada.
+    - Magic bytes en el primer bloque del archivo.
+    - Tamaño real acumulado por archivo y contra las cuotas restantes.
+
+    `politicas` mapea el nombre del campo del formulario al modelo de anexo
+    (p. ej. {"archivos_anexados": "solicitudes.SolicitudArchivoAnexo"}).
+    `cuotas` es un dict {"usuario": (usados, limite), "expediente": (...)}
+    calculado de forma perezosa por la vista.
+    """
+
+    def __init__(self, request, politicas, obtener_cuotas):
+        super().__init__(request)
+        self.politicas = politicas
+        self.obtener_cuotas = obtener_cuotas
+        self.recibidos_total = 0
+        self._cuotas = None
+
+    @property
+    def cuotas(self):
+        if self._cuotas is None:
+            self._cuotas = self.obtener_cuotas()
+        return self._cuotas
+
+    def _validar_cuotas(self, bytes_nuevos):
+        for ambito, (usados, limite) in self.cuotas.items():
+            if limite is not None and usados + bytes_nuevos > limite:
+                raise ArchivoRechazado(
+                    f"Se supera la cuota de almacenamiento por {ambito} ({limite // MB} MB)."
+                )
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # El cuerpo completo ya declara un tamaño: si no cabe, no se lee nada
+        if content_length:
+            self._validar_cuotas(content_length)
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.politica = obtener_politica(self.politicas.get(field_name, "defecto"))
+        self.recibidos = 0
+        if content_length and content_length > self.politica["tamano_maximo"]:
+            raise ArchivoRechazado(self._mensaje_tamano())
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            tipo = detectar_tipo(raw_data[:16])
+            if tipo not in self.politica["tipos"]:
+                raise ArchivoRechazado(
+                    f"El archivo '{self.file_name}' no es de un tipo permitido."
+                )
+
+        self.recibidos += len(raw_data)
+        self.recibidos_total += len(raw_data)
+        if self.recibidos > self.politica["tamano_maximo"]:
+            raise ArchivoRechazado(self._mensaje_tamano())
+        self._validar_cuotas(self.recibidos_total)
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Deja que el siguiente handler (memoria / temporal) cree el archivo
+        return None
+
+    def _mensaje_tamano(self):
+        return (
+            f"El archivo '{self.file_name}' supera el tamaño máximo de "
+            f"{self.politica['tamano_maximo'] // MB} MB."
+        )
+
+
+class ValidacionAnexosMixin:
+    """
+    Instala ValidacionAnexosUploadHandler al inicio de la cadena de upload
+    handlers de la petición, antes de que DRF parsee el cuerpo.
+
+    - `politicas_anexos`: campo del formulario -> modelo de anexo.
+    - `expediente_de_anexos()`: id del expediente afectado, si se conoce
+      antes de leer el cuerpo (p. ej. por el pk de la URL). En una creación
+      no lo hay: la cuota del expediente se empieza a cargar al guardar.
+    """
+
+    politicas_anexos = {}
+
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        self._handler_anexos = None
+        self._token_uso = None
+        if request.method in ("POST", "PUT", "PATCH"):
+            # Quién sube los archivos que se guarden en esta petición (common.utils.media.uso)
+            self._token_uso = usar_usuario(lambda: getattr(drf_request, "_user", None))
+            self._handler_anexos = ValidacionAnexosUploadHandler(
+                request,
+                self.politicas_anexos,
+                lambda: self._cuotas_anexos(drf_request),
+            )
+            request.upload_handlers.insert(0, self._handler_anexos)
+        return drf_request
+
+    def expediente_de_anexos(self):
+        return None
+
+    def _politica_principal(self):
+        modelos = list(self.politicas_anexos.values())
+        return obtener_politica(modelos[0] if modelos else "defecto")
+
+    def _ambitos_anexos(self, drf_request):
+        # El usuario ya está autenticado cuando DRF parsea el cuerpo
+        usuario = getattr(drf_request, "_user", None)
+        ambitos = {}
+        if usuario is not None and usuario.is_authenticated:
+            ambitos["usuario"] = usuario.id
+        expediente_id = self.expediente_de_anexos()
+        if expediente_id:
+            ambitos["expediente"] = expediente_id
+        return ambitos
+
+    def _cuotas_anexos(self, drf_request):
+        from usuarios.models import UsoAlmacenamiento
+
+        politica = self._politica_principal()
+        cuotas = {}
+        for ambito, clave in self._ambitos_anexos(drf_request).items():
+            limite = politica[f"cuota_{ambito}"]
+            if limite is not None:
+                cuotas[ambito] = (UsoAlmacenamiento.usados(ambito, clave), limite)
+        return cuotas
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # El uso se carga al guardar cada archivo (señales de common.utils.media.uso)
+        if getattr(self, "_token_uso", None) is not None:
+            soltar_usuario(self._token_uso)
+            self._token_uso = None
+        return response
@@ -0,0 +1,51 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from .tabular import csv_en_streaming, xlsx_en_streaming
+
+FORMATOS = {
+    "csv": (csv_en_streaming, "text/csv; charset=utf-8"),
+    "xlsx": (xlsx_en_streaming, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+class ExportacionMixin:
+    """
+    Agrega GET <ruta>/exportar/?formato=csv|xlsx al ViewSet, con los mismos
+    filtros, búsqueda y orden que el listado.
+
+    Lee con values_list() + iterator(chunk_size): nunca arma instancias ni la
+    lista completa (en PostgreSQL usa un cursor del lado del servidor).
+
+    Atributos del ViewSet:
+    - columnas_exportacion = [("Título", "lookup__orm"), ...]
+    - nombre_exportacion = "expedientes"
+    """
+    columnas_exportacion = []
+    nombre_exportacion = "exportacion"
+    exportacion_chunk_size = 2000
+
+    def get_queryset_exportacion(self):
+        return self.filter_queryset(self.get_queryset())
+
+    @action(detail=False, methods=["get"], url_path="exportar")
+    def exportar(self, request):
+        formato = request.query_params.get("formato", "csv")
+        if formato not in FORMATOS:
+            raise ValidationError({"formato": f"Use uno de: {', '.join(FORMATOS)}."})
+        generador, content_type = FORMATOS[formato]
+
+        titulos = [titulo for titulo, _ in self.columnas_exportacion]
+        lookups = [lookup for _, lookup in self.columnas_exportacion]
+        filas = (
+            self.get_queryset_exportacion()
+            .values_list(*lookups)
+            .iterator(chunk_size=self.exportacion_chunk_size)
+        )
+
+        nombre = f"{self.nombre_exportacion}_{timezone.localdate():%Y%m%d}.{formato}"
+        response = StreamingHttpResponse(generador(titulos, filas), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{nombre}"'
+        return response
@@ -0,0 +1,87 @@
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+CONFIG_DEFECTO = {
+    "umbral": 200,      # limit a partir del cual el listado se emite en streaming
+    "chunk_size": 200,  # filas serializadas por bloque
+}
+
+
+def config_listado():
+    return {**CONFIG_DEFECTO, **getattr(settings, "LISTADO_STREAMING", {})}
+
+
+def _a_json(datos):
+    return json.dumps(datos, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+class ListadoStreamingMixin:
+    """
+    Modo streaming para listados grandes: con ?stream=1 o un `limit` mayor que
+    LISTADO_STREAMING["umbral"], las filas se serializan y emiten por bloques
+    (iterator(chunk_size)) dentro del mismo sobre de la paginación:
+
+        {"count": N, "next": ..., "previous": ..., "results": [ ...bloques... ]}
+
+    La memoria queda acotada por un bloque y no por la respuesta completa.
+    Sin paginación, se emite el arreglo solo.
+    """
+
+    def usar_streaming(self):
+        parametros = self.request.query_params
+        if parametros.get("stream") in ("1", "true"):
+            return True
+        limite = parametros.get("limit")
+        return bool(limite and limite.isdigit() and int(limite) > config_listado()["umbral"])
+
+    def list(self, request, *args, **kwargs):
+        if self.usar_streaming():
+            return self.respuesta_streaming(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def respuesta_streaming(self, queryset):
+        sobre = None
+        paginador = self.paginator
+        if paginador is not None and hasattr(paginador, "get_limit"):
+            # Mismos límites y enlaces que LimitOffsetPagination, sin materializar la página
+            paginador.request = self.request
+            paginador.limit = paginador.get_limit(self.request)
+            if paginador.limit is not None:
+                paginador.offset = paginador.get_offset(self.request)
+                paginador.count = paginador.get_count(queryset)
+                queryset = queryset[paginador.offset:paginador.offset + paginador.limit]
+                sobre = {
+                    "count": paginador.count,
+                    "next": paginador.get_next_link(),
+                    "previous": paginador.get_previous_link(),
+                }
+
+        response = StreamingHttpResponse(self._emitir(queryset, sobre), content_type="application/json")
+        response["X-Listado-Streaming"] = "1"
+        return response
+
+    def _emitir(self, queryset, sobre):
+        if sobre is not None:
+            yield _a_json(sobre)[:-1].encode("utf-8") + b',"results":['
+        else:
+            yield b"["
+
+        chunk_size = config_listado()["chunk_size"]
+        bloque, primero = [], True
+        for instancia in queryset.iterator(chunk_size=chunk_size):
+            bloque.append(instancia)
+            if len(bloque) >= chunk_size:
+                yield self._bloque(bloque, primero)
+                bloque, primero = [], False
+        if bloque:
+            yield self._bloque(bloque, primero)
+
+        yield b"]}" if sobre is not None else b"]"
+
+    def _bloque(self, instancias, primero):
+        # "[a,b,c]" -> "a,b,c" (con coma delante si no es el primer bloque)
+        filas = _a_json(self.get_serializer(instancias, many=True).data)[1:-1]
+        return (filas if primero else "," + filas).encode("utf-8")
@@ -0,0 +1,150 @@
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .zip import zip_en_streaming
+
+# Filas por bloque emitido: acota la memoria y evita un write por fila
+FILAS_POR_BLOQUE = 500
+
+# Caracteres de control no válidos en XML 1.0
+_INVALIDOS_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Inicio de celda que Excel / LibreOffice interpretan como fórmula (inyección CSV)
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def formatear(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        valor = timezone.localtime(valor) if timezone.is_aware(valor) else valor
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _en_bloques(filas):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+# ----------------------------
+# CSV
+# ----------------------------
+def _celda_csv(valor):
+    valor = formatear(valor)
+    # Texto del usuario ("=HYPERLINK(...)") como texto literal, no como fórmula
+    if isinstance(valor, str) and valor.startswith(_INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+class _Linea:
+    """Destino de csv.writer que devuelve lo escrito en vez de guardarlo."""
+
+    def write(self, valor):
+        return valor
+
+
+def csv_en_streaming(encabezados, filas):
+    """
+    CSV (UTF-8 con BOM, para que Excel respete tildes) emitido por bloques de filas.
+    Las celdas de texto que empiezan con = + - @ (o tabulador / retorno) llevan un ' delante
+    para que la hoja de cálculo no las evalúe como fórmula.
+    """
+    escritor = csv.writer(_Linea())
+    yield ("\ufeff" + escritor.writerow([_celda_csv(valor) for valor in encabezados])).encode("utf-8")
+    for bloque in _en_bloques(filas):
+        yield "".join(
+            escritor.writerow([_celda_csv(valor) for valor in fila]) for fila in bloque
+        ).encode("utf-8")
+
+
+# ----------------------------
+# XLSX (SpreadsheetML mínimo: una hoja, cadenas en línea, sin estilos)
+# ----------------------------
+_TIPOS_CONTENIDO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_RELACIONES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_LIBRO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_RELACIONES_LIBRO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_FIN_HOJA = "</sheetData></worksheet>"
+
+
+def _celda(valor):
+    valor = formatear(valor)
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f"<c><v>{valor}</v></c>"
+    texto = escape(_INVALIDOS_XML.sub("", str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(fila):
+    return "<row>" + "".join(_celda(valor) for valor in fila) + "</row>"
+
+
+def _hoja(encabezados, filas):
+    yield (_INICIO_HOJA + _fila_xml(encabezados)).encode("utf-8")
+    for bloque in _en_bloques(filas):
+        yield "".join(_fila_xml(fila) for fila in bloque).encode("utf-8")
+    yield _FIN_HOJA.encode("utf-8")
+
+
+def xlsx_en_streaming(encabezados, filas, hoja="Datos"):
+    """Libro XLSX de una hoja, comprimido y emitido conforme se leen las filas."""
+    entradas = [
+        ("[Content_Types].xml", [_TIPOS_CONTENIDO.encode("utf-8")]),
+        ("_rels/.rels", [_RELACIONES.encode("utf-8")]),
+        ("xl/workbook.xml", [_LIBRO.format(hoja=escape(hoja)).encode("utf-8")]),
+        ("xl/_rels/workbook.xml.rels", [_RELACIONES_LIBRO.encode("utf-8")]),
+        ("xl/worksheets/sheet1.xml", _hoja(encabezados, filas)),
+    ]
+    return zip_en_streaming(entradas, compresion=zipfile.ZIP_DEFLATED)
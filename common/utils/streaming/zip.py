@@ -0,0 +1,51 @@
+import time
+import zipfile
+
+
+class _BufferSalida:
+    """
+    Destino de escritura sin seek para ZipFile: acumula lo escrito hasta
+    que el generador lo vacía. Nunca guarda más de un bloque a la vez.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def zip_en_streaming(entradas, compresion=zipfile.ZIP_STORED):
+    """
+    Genera un ZIP bloque a bloque, sin armarlo en memoria ni en un temporal.
+
+    `entradas` es un iterable de (nombre_en_zip, iterable_de_bytes); cada
+    entrada se consume y se emite conforme se lee. Como la salida no admite
+    seek, ZipFile escribe los tamaños en descriptores de datos al final de
+    cada archivo.
+    """
+    buffer = _BufferSalida()
+    with zipfile.ZipFile(buffer, mode="w", compression=compresion, allowZip64=True) as zf:
+        for nombre, bloques in entradas:
+            info = zipfile.ZipInfo(nombre, date_time=time.localtime()[:6])
+            info.compress_type = compresion
+            with zf.open(info, mode="w", force_zip64=True) as destino:
+                for bloque in bloques:
+                    destino.write(bloque)
+                    datos = buffer.vaciar()
+                    if datos:
+                        yield datos
+            datos = buffer.vaciar()
+            if datos:
+                yield datos
+    # Directorio central
+    yield buffer.vaciar()
@@ -0,0 +1,60 @@
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Un pool de procesos por tipo de trabajo ("ocr", "imagenes", ...), creado bajo demanda
+_pools = {}
+_lock = threading.Lock()
+
+
+def obtener_pool(nombre, max_workers=None):
+    """
+    Devuelve el pool de procesos `nombre`, creándolo la primera vez.
+    Por defecto la concurrencia es igual al número de CPUs.
+    """
+    with _lock:
+        pool = _pools.get(nombre)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+            _pools[nombre] = pool
+        return pool
+
+
+def _cerrar_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_cerrar_pools)
+
+
+def encolar(nombre, funcion, *args, al_terminar=None, max_workers=None):
+    """
+    Envía `funcion(*args)` al pool `nombre` cuando la transacción actual
+    se confirma (o de inmediato si no hay transacción abierta).
+
+    `funcion` se ejecuta en otro proceso: debe ser importable y no tocar la BD.
+    `al_terminar(resultado)` se ejecuta en este proceso y sí puede usar el ORM.
+    """
+
+    def _callback(futuro):
+        try:
+            al_terminar(futuro.result())
+        except Exception:
+            logger.exception("Fallo el trabajo '%s' (%s)", nombre, funcion.__name__)
+        finally:
+            # El callback corre en un hilo del executor: no dejar conexiones abiertas
+            connections.close_all()
+
+    def _enviar():
+        futuro = obtener_pool(nombre, max_workers).submit(funcion, *args)
+        if al_terminar is not None:
+            futuro.add_done_callback(_callback)
+
+    transaction.on_commit(_enviar)
@@ -24,6 +24,18 @@ User.objects.filter(username='admin').exists() or User.objects.create_superuser(
 
 echo "[ENTRYPOINT] Creando Usuario"
 python manage.py script_user_rol || echo "⚠️ no se pudieron crear por que existen"
+# ----------------------
+# ⚡ Perfil ASGI (SERVIDOR=asgi): pocos workers uvicorn atienden miles de
+# polls concurrentes en /api/async/... sin un proceso bloqueado por petición.
+# ----------------------
+if [ "${SERVIDOR:-wsgi}" = "asgi" ]; then
+    echo "[ENTRYPOINT] Iniciando servidor ASGI (uvicorn)..."
+    exec gunicorn app.asgi:application --bind 0.0.0.0:8000 \
+        --workers "${WORKERS:-1}" \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --backlog "${BACKLOG:-4096}"
+fi
+
 # ----------------------
 # 🚀 Iniciar servidor Gunicorn (PRODUCCIÓN) 🚀
 # ----------------------
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class ExpedientesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'expedientes'
+
+    def ready(self):
+        from operator import attrgetter
+
+        from common.utils.media.normalizacion import conectar_normalizacion
+        from common.utils.media.uso import conectar_uso
+        from .models import Expediente, ExpedienteArchivoAnexo
+
+        conectar_normalizacion(Expediente, "archivo_principal")
+        conectar_normalizacion(ExpedienteArchivoAnexo, "archivo_anexo")
+
+        # Cuotas de almacenamiento (usuarios.UsoAlmacenamiento)
+        conectar_uso(Expediente, attrgetter("pk"), "archivo_principal")
+        conectar_uso(ExpedienteArchivoAnexo, attrgetter("expediente_id"), "archivo_anexo")
@@ -0,0 +1,304 @@
+import csv
+import hashlib
+import json
+import os
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import validate_email
+from historial.compacto import bulk_create_con_historial
+
+from common.utils.constants.expediente.datafields.choices import (
+    TIPO_DOCUMENTO_CHOICES,
+    TIPO_PERSONA_CHOICES,
+)
+from common.utils.constants.expediente.ubigeo.datos import UBIGEOS_VALIDOS
+from common.utils.media.preparacion import ArchivosPreparados
+from common.utils.media.uso import cargar_archivos
+
+from .models import Expediente, ExpedienteArchivoAnexo, LoteImportacion
+
+TIPOS_PERSONA = {clave for clave, _ in TIPO_PERSONA_CHOICES}
+TIPOS_DOCUMENTO = {clave for clave, _ in TIPO_DOCUMENTO_CHOICES}
+
+CAMPOS_OBLIGATORIOS = [
+    "tipo_persona", "apellidos", "nombres", "telefono", "correo",
+    "departamento", "provincia", "distrito",
+    "tipo_documento", "numero_documento", "numero_folios", "asunto",
+    "archivo_principal",
+]
+
+MAX_ERRORES_GUARDADOS = 1000
+
+
+# ================================================
+# 📥 LECTURA EN STREAMING
+# ================================================
+def huella_archivo(archivo):
+    """sha256 del archivo de datos (leído por bloques, sin cargarlo entero)."""
+    sha256 = hashlib.sha256()
+    archivo.seek(0)
+    for bloque in iter(lambda: archivo.read(1024 * 1024), b""):
+        sha256.update(bloque)
+    archivo.seek(0)
+    return sha256.hexdigest()
+
+
+class FilaIlegible:
+    """Línea que no se pudo leer (UTF-8 o JSON inválidos): se rechaza sin detener la importación."""
+
+    def __init__(self, mensaje):
+        self.mensaje = mensaje
+
+
+def _lineas_csv(archivo, malas):
+    """Decodifica línea a línea; las que no son UTF-8 se anotan en `malas` y siguen con reemplazos."""
+    for numero, linea in enumerate(archivo, start=1):
+        try:
+            yield linea.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            malas.add(numero)
+            yield linea.decode("utf-8-sig", errors="replace")
+
+
+def _fila_json(linea):
+    try:
+        fila = json.loads(linea.decode("utf-8-sig"))
+    except UnicodeDecodeError:
+        return FilaIlegible("La línea no está codificada en UTF-8.")
+    except json.JSONDecodeError as error:
+        return FilaIlegible(f"JSON inválido: {error.msg} (columna {error.colno}).")
+    if not isinstance(fila, dict):
+        return FilaIlegible("Cada línea debe ser un objeto JSON.")
+    return fila
+
+
+def leer_filas(archivo, formato):
+    """
+    Genera (numero_de_linea, fila) desde un archivo binario CSV o JSONL.
+    En CSV las columnas `anexos` y `anexos_descripciones` se separan con "|".
+    Una línea ilegible se entrega como FilaIlegible en lugar de cortar la lectura.
+    """
+    if formato == "csv":
+        malas = set()
+        lector = csv.DictReader(_lineas_csv(archivo, malas))
+        anterior = 1  # la cabecera
+        for fila in lector:
+            # Un registro puede ocupar varias líneas (campos entre comillas)
+            lineas = range(anterior + 1, lector.line_num + 1)
+            anterior = lector.line_num
+            if malas.intersection(lineas):
+                yield lector.line_num, FilaIlegible("La línea no está codificada en UTF-8.")
+                continue
+            for campo in ("anexos", "anexos_descripciones"):
+                fila[campo] = [v for v in (fila.get(campo) or "").split("|") if v]
+            yield lector.line_num, fila
+    else:
+        for numero, linea in enumerate(archivo, start=1):
+            if linea.strip():
+                yield numero, _fila_json(linea)
+
+
+def formato_por_nombre(nombre):
+    return "jsonl" if nombre.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+# ================================================
+# ✅ VALIDACIÓN POR LOTE (columna a columna)
+# ================================================
+def _texto(valor):
+    return "" if valor is None else str(valor).strip()
+
+
+def validar_lote(filas, directorio):
+    """
+    Aplica las reglas de Expediente.clean() a un lote completo: cada regla
+    recorre una columna entera, y el ubigeo se valida con una sola búsqueda
+    en UBIGEOS_VALIDOS por fila. Devuelve (validas, errores).
+    """
+    columnas = {
+        campo: [_texto(fila.get(campo)) for _, fila in filas]
+        for campo in CAMPOS_OBLIGATORIOS + ["dni", "ruc", "razon_social"]
+    }
+    errores = [{} for _ in filas]
+
+    def marcar(campo, mascara, mensaje):
+        for i, invalido in enumerate(mascara):
+            if invalido and campo not in errores[i]:
+                errores[i][campo] = mensaje
+
+    for campo in CAMPOS_OBLIGATORIOS:
+        marcar(campo, [not v for v in columnas[campo]], "Este campo es obligatorio.")
+
+    tipo = columnas["tipo_persona"]
+    marcar("tipo_persona", [t not in TIPOS_PERSONA for t in tipo], "Tipo de persona no válido.")
+    marcar("tipo_documento", [t not in TIPOS_DOCUMENTO for t in columnas["tipo_documento"]], "Tipo de documento no válido.")
+
+    # DNI / RUC según tipo de persona
+    marcar("dni", [
+        t == "NATURAL" and not (d.isdigit() and len(d) == 8)
+        for t, d in zip(tipo, columnas["dni"])
+    ], "El DNI debe tener exactamente 8 dígitos.")
+    marcar("ruc", [
+        t == "JURIDICA" and not (r.isdigit() and len(r) == 11)
+        for t, r in zip(tipo, columnas["ruc"])
+    ], "El RUC debe tener exactamente 11 dígitos.")
+    marcar("razon_social", [
+        t == "JURIDICA" and not rs
+        for t, rs in zip(tipo, columnas["razon_social"])
+    ], "La razón social es obligatoria para personas jurídicas.")
+
+    marcar("telefono", [
+        not (v.isdigit() and 7 <= len(v) <= 9) for v in columnas["telefono"]
+    ], "El teléfono debe tener entre 7 y 9 dígitos.")
+    marcar("numero_documento", [len(v) < 3 for v in columnas["numero_documento"]],
+           "El número de documento debe tener al menos 3 caracteres.")
+    marcar("numero_folios", [not v.isdigit() for v in columnas["numero_folios"]],
+           "El número de folios debe ser un entero positivo.")
+
+    ubigeos = zip(columnas["departamento"], columnas["provincia"], columnas["distrito"])
+    marcar("distrito", [u not in UBIGEOS_VALIDOS for u in ubigeos], "Ubigeo no válido.")
+
+    def correo_invalido(valor):
+        try:
+            validate_email(valor)
+        except ValidationError:
+            return True
+        return False
+
+    marcar("correo", [correo_invalido(v) for v in columnas["correo"]], "Correo no válido.")
+
+    raiz = os.path.realpath(directorio)
+
+    def archivo_invalido(relativa):
+        ruta = os.path.realpath(os.path.join(raiz, relativa))
+        return not ruta.startswith(raiz + os.sep) or not os.path.isfile(ruta)
+
+    marcar("archivo_principal", [archivo_invalido(v) for v in columnas["archivo_principal"]],
+           "El archivo no existe en el directorio de importación.")
+    marcar("anexos", [
+        any(archivo_invalido(_texto(a)) for a in (fila.get("anexos") or []))
+        for _, fila in filas
+    ], "Algún anexo no existe en el directorio de importación.")
+
+    validas, rechazadas = [], []
+    for (numero, fila), error in zip(filas, errores):
+        if error:
+            rechazadas.append({"linea": numero, "errores": error})
+        else:
+            validas.append((numero, fila))
+    return validas, rechazadas
+
+
+# ================================================
+# 💾 INSERCIÓN POR LOTES
+# ================================================
+def _construir(fila, usuario):
+    juridica = fila["tipo_persona"] == "JURIDICA"
+    return Expediente(
+        id_publico=Expediente.generar_id_publico(),
+        tipo_persona=fila["tipo_persona"],
+        dni="" if juridica else _texto(fila.get("dni")),
+        ruc=_texto(fila.get("ruc")) if juridica else None,
+        razon_social=_texto(fila.get("razon_social")) if juridica else None,
+        apellidos=_texto(fila["apellidos"]),
+        nombres=_texto(fila["nombres"]),
+        telefono=_texto(fila["telefono"]),
+        correo=_texto(fila["correo"]),
+        departamento=_texto(fila["departamento"]),
+        provincia=_texto(fila["provincia"]),
+        distrito=_texto(fila["distrito"]),
+        tipo_documento=_texto(fila["tipo_documento"]),
+        numero_documento=_texto(fila["numero_documento"]),
+        numero_folios=int(_texto(fila["numero_folios"])),
+        asunto=_texto(fila["asunto"]),
+        creado_por=usuario,
+    )
+
+
+def _insertar_lote(validas, directorio, usuario):
+    """Copia los archivos (fuera de la transacción) e inserta el lote con bulk_create."""
+    preparados = ArchivosPreparados()
+    expedientes, anexos = [], []
+
+    with preparados.preparando():
+        for _, fila in validas:
+            expediente = _construir(fila, usuario)
+            with open(os.path.join(directorio, _texto(fila["archivo_principal"])), "rb") as origen:
+                preparados.guardar(expediente, "archivo_principal", File(origen, name=os.path.basename(origen.name)))
+            expedientes.append(expediente)
+
+            descripciones = list(fila.get("anexos_descripciones") or [])
+            for i, relativa in enumerate(fila.get("anexos") or []):
+                anexo = ExpedienteArchivoAnexo(
+                    expediente=expediente,
+                    descripcion=_texto(descripciones[i]) if i < len(descripciones) else "",
+                )
+                with open(os.path.join(directorio, _texto(relativa)), "rb") as origen:
+                    preparados.guardar(anexo, "archivo_anexo", File(origen, name=os.path.basename(origen.name)))
+                anexos.append(anexo)
+
+    with preparados.transaccion():
+        # Un INSERT por lote y un INSERT de historial por lote
+        bulk_create_con_historial(expedientes, Expediente, usuario=usuario)
+        # bulk_create toma el expediente_id de los expedientes recién insertados
+        ExpedienteArchivoAnexo.objects.bulk_create(anexos)
+        # Sin post_save: la cuota de cada expediente se carga aquí
+        cargar_archivos(expedientes, "archivo_principal")
+        cargar_archivos(anexos, "archivo_anexo")
+    return len(expedientes)
+
+
+def importar(archivo, nombre, directorio, usuario, tamano_lote=500, reiniciar=False):
+    """
+    Importa expedientes desde un CSV/JSONL (archivo binario abierto) y un
+    directorio de archivos. Tras cada lote confirmado guarda el punto de
+    control en LoteImportacion; si se vuelve a llamar con el mismo archivo,
+    continúa desde la última línea procesada.
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser mayor que cero.")
+
+    huella = huella_archivo(archivo)
+    control, _ = LoteImportacion.objects.get_or_create(
+        huella=huella,
+        defaults={"origen": nombre, "creado_por": usuario},
+    )
+    if reiniciar:
+        control.ultima_linea = control.creados = control.rechazados = 0
+        control.errores = []
+        control.completado = False
+    if control.completado:
+        return control
+
+    filas = (
+        (numero, fila)
+        for numero, fila in leer_filas(archivo, formato_por_nombre(nombre))
+        if numero > control.ultima_linea
+    )
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            break
+        ilegibles = [
+            {"linea": numero, "errores": {"fila": fila.mensaje}}
+            for numero, fila in lote
+            if isinstance(fila, FilaIlegible)
+        ]
+        validas, rechazadas = validar_lote(
+            [(numero, fila) for numero, fila in lote if not isinstance(fila, FilaIlegible)], directorio
+        )
+        rechazadas = sorted(ilegibles + rechazadas, key=lambda error: error["linea"])
+        if validas:
+            control.creados += _insertar_lote(validas, directorio, usuario)
+
+        control.rechazados += len(rechazadas)
+        espacio = MAX_ERRORES_GUARDADOS - len(control.errores)
+        control.errores.extend(rechazadas[:max(espacio, 0)])
+        control.ultima_linea = lote[-1][0]
+        control.save()
+
+    control.completado = True
+    control.save()
+    return control
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from expedientes.models import Expediente
+from expedientes.paquetes import generar_paquete_lote
+
+
+class Command(BaseCommand):
+    help = "Genera un ZIP de archivo con los expedientes creados en un rango de fechas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", required=True, help="Fecha inicial (AAAA-MM-DD).")
+        parser.add_argument("--hasta", required=True, help="Fecha final inclusive (AAAA-MM-DD).")
+        parser.add_argument("--salida", required=True, help="Ruta del archivo ZIP a generar.")
+
+    def handle(self, *args, **options):
+        try:
+            desde = parse_date(options["desde"])
+            hasta = parse_date(options["hasta"])
+        except ValueError as error:
+            # Bien formada pero inexistente (p. ej. 2024-13-45)
+            raise CommandError(f"Fecha inválida: {error}.")
+        if not desde or not hasta:
+            raise CommandError("Las fechas deben tener el formato AAAA-MM-DD.")
+
+        qs = Expediente.objects.filter(
+            fecha_creacion__date__gte=desde,
+            fecha_creacion__date__lte=hasta,
+        ).order_by("fecha_creacion")
+
+        escritos = 0
+        with open(options["salida"], "wb") as salida:
+            for bloque in generar_paquete_lote(qs):
+                salida.write(bloque)
+                escritos += len(bloque)
+
+        self.stdout.write(self.style.SUCCESS(f"ZIP generado en {options['salida']} ({escritos} bytes)."))
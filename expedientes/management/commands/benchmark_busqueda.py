@@ -0,0 +1,106 @@
+import importlib
+import random
+import statistics
+import string
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from expedientes.models import Expediente, TextoOCR
+from expedientes.views import ExpedienteViewSet
+
+# Índices de trigramas de PostgreSQL (crear / borrar), los mismos de la migración
+indices_trigram = importlib.import_module("expedientes.migrations.0006_indices_busqueda_trigram")
+
+APELLIDOS = ["QUISPE", "FLORES", "SANCHEZ", "RODRIGUEZ", "HUAMAN", "GARCIA", "MAMANI", "CHAVEZ", "ROJAS"]
+NOMBRES = ["MARIA", "JOSE", "LUIS", "ROSA", "JUAN", "CARMEN", "CARLOS", "ANA", "JORGE", "ELENA"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la búsqueda de expedientes (?search= de ExpedienteViewSet: contiene, sin "
+        "distinguir mayúsculas) sobre una base de prueba temporal del motor configurado. "
+        "En PostgreSQL compara con y sin los índices GIN de trigramas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--expedientes", type=int, default=20000)
+        parser.add_argument("--repeticiones", type=int, default=20, help="Veces que se repite cada término.")
+
+    def handle(self, *args, **options):
+        nombre_original = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._preparar(options["expedientes"])
+            terminos = ["QUISP", "ARMEN", "00012", "4521", "resolución"]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"Motor: {connection.vendor}, {options['expedientes']} expedientes"
+            ))
+            if connection.vendor == "postgresql":
+                self._medir("con índices trigram", terminos, options["repeticiones"])
+                with connection.schema_editor() as editor:
+                    indices_trigram.borrar_indices(None, editor)
+                self._medir("sin índices", terminos, options["repeticiones"])
+            else:
+                self._medir("sin índices (LIKE recorre la tabla)", terminos, options["repeticiones"])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    # ----------------------------
+    # Datos
+    # ----------------------------
+    def _preparar(self, cantidad):
+        usuario = User.objects.create_user(username="benchmark")
+        azar = random.Random(0)
+        for inicio in range(0, cantidad, 1000):
+            expedientes = Expediente.objects.bulk_create([
+                Expediente(
+                    id_publico=f"EXP-{i:08d}", tipo_persona="NATURAL",
+                    dni="".join(azar.choices(string.digits, k=8)),
+                    apellidos=f"{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}",
+                    nombres=azar.choice(NOMBRES), telefono="999999999", correo="benchmark@example.com",
+                    departamento="LIMA", provincia="LIMA", distrito="LIMA", tipo_documento="CARTA",
+                    numero_documento=str(azar.randint(1, 99999)), numero_folios=1, asunto="Benchmark",
+                    archivo_principal="principal.pdf", creado_por=usuario,
+                )
+                for i in range(inicio, min(inicio + 1000, cantidad))
+            ])
+            TextoOCR.objects.bulk_create([
+                TextoOCR(
+                    expediente=expediente, origen="PRINCIPAL", archivo="principal.pdf", estado="PROCESADO",
+                    texto=" ".join(azar.choices(["solicito", "copia", "resolución", "expediente", "pago"], k=40)),
+                )
+                for expediente in expedientes[::10]  # uno de cada diez con texto OCR
+            ])
+
+    # ----------------------------
+    # Escenario
+    # ----------------------------
+    def _consulta(self, termino):
+        """El mismo queryset que arma SearchFilter para GET /api/expedientes/?search=<termino>."""
+        request = Request(APIRequestFactory().get("/api/expedientes/", {"search": termino}))
+        vista = ExpedienteViewSet(request=request, format_kwarg=None, action="list")
+        return SearchFilter().filter_queryset(request, vista.queryset, vista)
+
+    def _medir(self, etiqueta, terminos, repeticiones):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{etiqueta}"))
+        self.stdout.write(f"{'término':<14}{'resultados':>12}{'p50 (ms)':>12}{'máx (ms)':>12}")
+        for termino in terminos:
+            consulta = self._consulta(termino)
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                # Lo que hace el listado paginado: conteo + primera página
+                total = consulta.count()
+                list(consulta[:10])
+                tiempos.append(time.perf_counter() - inicio)
+            self.stdout.write(
+                f"{termino:<14}{total:>12}{statistics.median(tiempos) * 1000:>12.2f}{max(tiempos) * 1000:>12.2f}"
+            )
+        if connection.vendor == "postgresql":
+            self.stdout.write(self._consulta(terminos[0]).explain())
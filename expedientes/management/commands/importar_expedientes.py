@@ -0,0 +1,47 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from expedientes.importacion import importar
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa expedientes en bloque desde un CSV o JSONL y un directorio con "
+        "los archivos. Reanuda automáticamente desde el último lote confirmado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("datos", help="Archivo .csv o .jsonl con un expediente por fila.")
+        parser.add_argument("--archivos", required=True, help="Directorio con los archivos referenciados.")
+        parser.add_argument("--usuario", required=True, help="Username que figurará como creador.")
+        parser.add_argument("--lote", type=int, default=500, help="Filas por lote.")
+        parser.add_argument("--reiniciar", action="store_true", help="Ignora el punto de control previo.")
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options["usuario"])
+        except User.DoesNotExist:
+            raise CommandError(f"El usuario '{options['usuario']}' no existe.")
+        if not os.path.isdir(options["archivos"]):
+            raise CommandError("El directorio de archivos no existe.")
+        if options["lote"] < 1:
+            raise CommandError("--lote debe ser mayor que cero.")
+
+        with open(options["datos"], "rb") as datos:
+            control = importar(
+                datos,
+                os.path.basename(options["datos"]),
+                options["archivos"],
+                usuario,
+                tamano_lote=options["lote"],
+                reiniciar=options["reiniciar"],
+            )
+
+        for error in control.errores:
+            self.stdout.write(self.style.WARNING(f"Línea {error['linea']}: {error['errores']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación terminada: {control.creados} creados, {control.rechazados} rechazados "
+            f"(última línea {control.ultima_linea})."
+        ))
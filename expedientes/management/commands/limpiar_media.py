@@ -0,0 +1,85 @@
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from common.utils.media.recorrido import eliminar_directorios_vacios, recorrer_en_paralelo
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina de MEDIA_ROOT los archivos que ningún FileField referencia "
+        "(restos de borrados en CASCADE o de eliminar_usuarios)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Solo lista los huérfanos, no borra nada.")
+        parser.add_argument("--lote", type=int, default=500, help="Archivos borrados por lote.")
+        parser.add_argument("--hilos", type=int, default=8, help="Hilos para recorrer el árbol.")
+        parser.add_argument(
+            "--antiguedad-minima",
+            type=float,
+            default=24,
+            help="Horas: se ignoran archivos más recientes (subidas en curso o sin confirmar).",
+        )
+
+    def handle(self, *args, **options):
+        raiz = os.path.abspath(settings.MEDIA_ROOT)
+        referenciados = self._referenciados()
+        limite = time.time() - options["antiguedad_minima"] * 3600
+
+        # Diferencia de conjuntos: lo que hay en disco menos lo referenciado
+        huerfanos = []
+        for ruta, mtime in recorrer_en_paralelo(raiz, options["hilos"]):
+            relativa = os.path.relpath(ruta, raiz).replace(os.sep, "/")
+            if mtime > limite or relativa in referenciados:
+                continue
+            if self._es_copia_original(relativa, referenciados):
+                continue
+            huerfanos.append(ruta)
+
+        if options["dry_run"]:
+            for ruta in huerfanos:
+                self.stdout.write(ruta)
+            self.stdout.write(self.style.WARNING(f"[dry-run] {len(huerfanos)} archivos huérfanos."))
+            return
+
+        borrados = 0
+        liberados = 0
+        for inicio in range(0, len(huerfanos), options["lote"]):
+            for ruta in huerfanos[inicio:inicio + options["lote"]]:
+                try:
+                    liberados += os.path.getsize(ruta)
+                    os.remove(ruta)
+                    borrados += 1
+                except FileNotFoundError:
+                    pass
+            self.stdout.write(f"Lote {inicio // options['lote'] + 1}: {borrados} archivos borrados.")
+
+        directorios = eliminar_directorios_vacios(raiz)
+        self.stdout.write(self.style.SUCCESS(
+            f"Borrados {borrados} archivos ({liberados} bytes) y {directorios} directorios vacíos."
+        ))
+
+    def _referenciados(self):
+        """Nombres guardados en todos los FileField de todos los modelos."""
+        nombres = set()
+        for modelo in apps.get_models():
+            campos = [f.name for f in modelo._meta.get_fields() if isinstance(f, models.FileField)]
+            for campo in campos:
+                nombres.update(
+                    modelo._default_manager.exclude(**{campo: ""})
+                    .values_list(campo, flat=True)
+                    .iterator(chunk_size=5000)
+                )
+        return nombres
+
+    def _es_copia_original(self, relativa, referenciados):
+        """Las copias de `originales/` (normalización de imágenes) siguen a su archivo."""
+        carpeta, nombre = os.path.split(relativa)
+        if os.path.basename(carpeta) != "originales":
+            return False
+        return f"{os.path.dirname(carpeta)}/{nombre}" in referenciados
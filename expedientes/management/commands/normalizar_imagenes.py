@@ -0,0 +1,60 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.utils.media.normalizacion import es_imagen, normalizar_lote
+from expedientes.models import Expediente, ExpedienteArchivoAnexo
+from solicitudes.models import ComentarioSolicitudArchivoAnexo, SolicitudArchivoAnexo
+
+CAMPOS_ARCHIVO = [
+    (Expediente, "archivo_principal"),
+    (ExpedienteArchivoAnexo, "archivo_anexo"),
+    (SolicitudArchivoAnexo, "archivo_anexo"),
+    (ComentarioSolicitudArchivoAnexo, "archivo_anexo"),
+]
+
+
+class Command(BaseCommand):
+    help = "Normaliza (reduce, re-codifica y limpia EXIF) las imágenes ya subidas e informa los bytes ahorrados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=100, help="Imágenes por lote.")
+
+    def handle(self, *args, **options):
+        self.fallidas = 0
+        total = 0
+        for modelo, campo in CAMPOS_ARCHIVO:
+            nombres = (
+                modelo.objects.exclude(**{campo: ""})
+                .values_list(campo, flat=True)
+                .iterator(chunk_size=options["lote"])
+            )
+            lote = []
+            for nombre in nombres:
+                ruta = os.path.join(settings.MEDIA_ROOT, nombre)
+                if es_imagen(nombre) and os.path.exists(ruta):
+                    lote.append(ruta)
+                if len(lote) >= options["lote"]:
+                    total += self._procesar(lote)
+                    lote = []
+            if lote:
+                total += self._procesar(lote)
+
+        self.stdout.write(self.style.SUCCESS(f"Total ahorrado: {total} bytes."))
+        if self.fallidas:
+            self.stderr.write(self.style.WARNING(f"{self.fallidas} imagen(es) no se pudieron normalizar."))
+
+    def _procesar(self, rutas):
+        ahorrado = 0
+        for resultado in normalizar_lote(rutas):
+            if "error" in resultado:
+                # Se informa y se sigue con el resto
+                self.fallidas += 1
+                self.stderr.write(self.style.ERROR(f"{resultado['ruta']}: {resultado['error']}"))
+                continue
+            ahorro = resultado["antes"] - resultado["despues"]
+            ahorrado += ahorro
+            if resultado["reemplazado"]:
+                self.stdout.write(f"{resultado['ruta']}: {ahorro} bytes ahorrados")
+        return ahorrado
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from expedientes.models import Expediente, ExpedienteArchivoAnexo, TextoOCR
+from expedientes.ocr import procesar_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Extrae por OCR el texto de los documentos ya existentes en media. "
+        "Trabaja por lotes de expedientes y es reanudable: lo ya procesado se omite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=50, help="Expedientes por lote.")
+        parser.add_argument("--desde-id", type=int, default=0, help="Reanudar desde este id de expediente.")
+        parser.add_argument("--reintentar-errores", action="store_true", help="Vuelve a procesar documentos con ERROR.")
+
+    def handle(self, *args, **options):
+        lote = options["lote"]
+        ultimo_id = options["desde_id"]
+        terminados = ["PROCESADO", "NO_SOPORTADO"]
+        if not options["reintentar_errores"]:
+            terminados.append("ERROR")
+
+        total = 0
+        while True:
+            expedientes = list(
+                Expediente.objects.filter(id__gt=ultimo_id)
+                .order_by("id")
+                .only("id", "archivo_principal")[:lote]
+            )
+            if not expedientes:
+                break
+
+            registros = self._pendientes(expedientes, terminados)
+            if registros:
+                procesar_lote(registros)
+                total += len(registros)
+
+            ultimo_id = expedientes[-1].id
+            # Punto de control: con este id se puede reanudar con --desde-id
+            self.stdout.write(f"Lote hasta expediente {ultimo_id}: {len(registros)} documentos procesados.")
+
+        self.stdout.write(self.style.SUCCESS(f"OCR completado: {total} documentos."))
+
+    def _pendientes(self, expedientes, terminados):
+        """Crea/obtiene los registros OCR del lote que aún no están terminados."""
+        ids = [e.id for e in expedientes]
+        existentes = TextoOCR.objects.filter(expediente_id__in=ids)
+        hechos_principal = set(
+            existentes.filter(origen="PRINCIPAL", estado__in=terminados).values_list("expediente_id", flat=True)
+        )
+        hechos_anexo = set(
+            existentes.filter(origen="ANEXO", estado__in=terminados).values_list("anexo_id", flat=True)
+        )
+
+        nuevos = [
+            TextoOCR(expediente=e, origen="PRINCIPAL", archivo=e.archivo_principal.name)
+            for e in expedientes
+            if e.archivo_principal and e.id not in hechos_principal
+        ]
+        anexos = ExpedienteArchivoAnexo.objects.filter(expediente_id__in=ids).exclude(id__in=hechos_anexo)
+        nuevos += [
+            TextoOCR(expediente_id=a.expediente_id, anexo=a, origen="ANEXO", archivo=a.archivo_anexo.name)
+            for a in anexos
+        ]
+
+        # Los pendientes/errores previos se reemplazan para no duplicar
+        existentes.filter(
+            Q(origen="PRINCIPAL", expediente_id__in=[r.expediente_id for r in nuevos if r.origen == "PRINCIPAL"])
+            | Q(anexo_id__in=[r.anexo_id for r in nuevos if r.anexo_id])
+        ).delete()
+        return TextoOCR.objects.bulk_create(nuevos)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextoOCR',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(choices=[('PRINCIPAL', 'Archivo principal'), ('ANEXO', 'Archivo anexo')], max_length=20)),
+                ('archivo', models.CharField(max_length=255)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESADO', 'Procesado'), ('NO_SOPORTADO', 'Formato no soportado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20)),
+                ('texto', models.TextField(blank=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('fecha_procesado', models.DateTimeField(blank=True, null=True)),
+                ('anexo', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='texto_ocr', to='expedientes.expedientearchivoanexo')),
+                ('expediente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='textos_ocr', to='expedientes.expediente')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado'], name='expedientes_estado_74aea7_idx')],
+            },
+        ),
+    ]
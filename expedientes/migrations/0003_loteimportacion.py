@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0002_textoocr'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteImportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('huella', models.CharField(max_length=64, unique=True)),
+                ('origen', models.CharField(max_length=255)),
+                ('ultima_linea', models.PositiveIntegerField(default=0)),
+                ('creados', models.PositiveIntegerField(default=0)),
+                ('rechazados', models.PositiveIntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list)),
+                ('completado', models.BooleanField(default=False)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('creado_por', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='importaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
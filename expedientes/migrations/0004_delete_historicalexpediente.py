@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0003_loteimportacion'),
+        # Primero se copia el historial a VersionCompacta
+        ('historial', '0002_convertir_historial_expediente'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='HistoricalExpediente',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0004_delete_historicalexpediente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expediente',
+            index=models.Index(fields=['fecha_actualizacion'], name='expedientes_fecha_a_197306_idx'),
+        ),
+    ]
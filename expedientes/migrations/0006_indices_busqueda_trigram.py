@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:20
+
+from django.db import migrations
+
+# Índices GIN de trigramas (pg_trgm) para la búsqueda de ExpedienteViewSet
+# (?search=, también la de solicitudes por expediente__id_publico).
+# SearchFilter genera UPPER("col"::text) LIKE UPPER('%...%'): el índice se crea
+# sobre esa misma expresión para que PostgreSQL lo use con comodines a ambos lados.
+# Solo en PostgreSQL; en SQLite la migración no hace nada.
+INDICES = [
+    ("expediente_id_publico_trgm", "expedientes_expediente", "id_publico"),
+    ("expediente_dni_trgm", "expedientes_expediente", "dni"),
+    ("expediente_apellidos_trgm", "expedientes_expediente", "apellidos"),
+    ("expediente_nombres_trgm", "expedientes_expediente", "nombres"),
+    ("expediente_numero_doc_trgm", "expedientes_expediente", "numero_documento"),
+    ("textoocr_texto_trgm", "expedientes_textoocr", "texto"),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # Requiere permiso para crear la extensión (o que ya exista en la base)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for nombre, tabla, columna in INDICES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{nombre}" ON "{tabla}" '
+            f'USING gin ((UPPER("{columna}"::text)) gin_trgm_ops)'
+        )
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for nombre, _, _ in INDICES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0005_indice_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices, elidable=False),
+    ]
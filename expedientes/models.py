@@ -5,13 +5,14 @@ import secrets
 from common.utils.constants.expediente.ubigeo.datos import DEPARTAMENTOS, PROVINCIAS, DISTRITOS, DEPARTAMENTO_CHOICES, PROVINCIA_CHOICES, DISTRITO_CHOICES
 from common.utils.constants.expediente.datafields.choices import TIPO_PERSONA_CHOICES, TIPO_DOCUMENTO_CHOICES
 from django.core.exceptions import ValidationError
-from simple_history.models import HistoricalRecords
+from historial.registros import HistorialCompacto
+from common.utils.media.rutas import ruta_media
  
 class Expediente(models.Model):
     
     def expediente_principal_path(instance, filename):
         # Usa id_publico para que exista incluso antes de guardarse por primera vez
-        return f"expedientes/{instance.id_publico}/principal/{filename}"
+        return ruta_media("expedientes", instance.id_publico, "principal", filename)
     
     id_publico = models.CharField(max_length=20, unique=True, editable=False)
     tipo_persona = models.CharField(max_length=20, choices=TIPO_PERSONA_CHOICES)
@@ -37,7 +38,14 @@ class Expediente(models.Model):
     creado_por = models.ForeignKey(User, on_delete=models.PROTECT, related_name="expedientes_creados")
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
-    history = HistoricalRecords()
+    # Modelo ancho: historial compacto (deltas + checkpoints) en historial.VersionCompacta
+    history = HistorialCompacto(campos_ignorados=["fecha_actualizacion"])
+
+    class Meta:
+        indexes = [
+            # Lectura incremental por marca de agua (analitica.resumen)
+            models.Index(fields=["fecha_actualizacion"]),
+        ]
     
     
     # ----------------------------
@@ -112,12 +120,16 @@ class Expediente(models.Model):
     def save(self, *args, **kwargs):
 
         if not self.id_publico:
-            fecha = timezone.now().strftime("%Y%m%d")
-            aleatorio = secrets.token_hex(4).upper()
-            self.id_publico = f"LIMA-{fecha}-{aleatorio}"
+            self.id_publico = self.generar_id_publico()
 
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def generar_id_publico():
+        fecha = timezone.now().strftime("%Y%m%d")
+        aleatorio = secrets.token_hex(4).upper()
+        return f"LIMA-{fecha}-{aleatorio}"
+
     def __str__(self):
         return f"{self.id_publico}"
     
@@ -125,7 +137,7 @@ class ExpedienteArchivoAnexo(models.Model):
     
     def expediente_anexo_path(instance, filename):
         expediente = instance.expediente
-        return f"expedientes/{expediente.id_publico}/anexos/{filename}"
+        return ruta_media("expedientes", expediente.id_publico, "anexos", filename)
     
     expediente = models.ForeignKey(
         Expediente,
@@ -147,3 +159,68 @@ class ExpedienteArchivoAnexo(models.Model):
     
 
 
+class LoteImportacion(models.Model):
+    """
+    Punto de control de una importación masiva de expedientes.
+    Se identifica por la huella (sha256) del archivo de datos, así una
+    importación interrumpida se reanuda desde `ultima_linea`.
+    """
+
+    huella = models.CharField(max_length=64, unique=True)
+    origen = models.CharField(max_length=255)
+    ultima_linea = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    rechazados = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True)
+    completado = models.BooleanField(default=False)
+    creado_por = models.ForeignKey(User, on_delete=models.PROTECT, related_name="importaciones")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.origen} ({self.creados} creados)"
+
+
+class TextoOCR(models.Model):
+    """
+    Texto extraído por OCR de un documento del expediente
+    (el archivo principal o uno de sus anexos).
+    """
+
+    ORIGEN_CHOICES = [
+        ("PRINCIPAL", "Archivo principal"),
+        ("ANEXO", "Archivo anexo"),
+    ]
+    ESTADO_CHOICES = [
+        ("PENDIENTE", "Pendiente"),
+        ("PROCESADO", "Procesado"),
+        ("NO_SOPORTADO", "Formato no soportado"),
+        ("ERROR", "Error"),
+    ]
+
+    expediente = models.ForeignKey(
+        Expediente,
+        on_delete=models.CASCADE,
+        related_name="textos_ocr"
+    )
+    anexo = models.OneToOneField(
+        ExpedienteArchivoAnexo,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="texto_ocr"
+    )
+    origen = models.CharField(max_length=20, choices=ORIGEN_CHOICES)
+    archivo = models.CharField(max_length=255)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default="PENDIENTE")
+    texto = models.TextField(blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    fecha_procesado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["estado"]),
+        ]
+
+    def __str__(self):
+        return f"{self.archivo} ({self.estado})"
@@ -0,0 +1,139 @@
+import logging
+import os
+
+from django.conf import settings
+from django.utils import timezone
+
+from common.utils.workers.pool import encolar, obtener_pool
+
+from .models import TextoOCR
+
+logger = logging.getLogger(__name__)
+
+POOL = "ocr"
+
+CONFIG_DEFECTO = {
+    "idioma": "spa",
+    "max_workers": None,  # None = número de CPUs
+    "extensiones": [".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp"],
+}
+
+
+def obtener_config():
+    return {**CONFIG_DEFECTO, **getattr(settings, "OCR_CONFIG", {})}
+
+
+# ================================================
+# 🔧 TRABAJO (se ejecuta en el pool de procesos)
+# ================================================
+def extraer_texto(ruta, idioma, extensiones):
+    """
+    Corre en un proceso hijo: no usa el ORM, solo lee el archivo.
+    Devuelve un dict con `estado`, `texto` y `error`.
+    """
+    if os.path.splitext(ruta)[1].lower() not in extensiones:
+        return {"estado": "NO_SOPORTADO", "texto": "", "error": ""}
+
+    try:
+        import pytesseract
+        from PIL import Image, ImageSequence
+
+        paginas = []
+        with Image.open(ruta) as imagen:
+            # Los TIFF escaneados suelen traer varias páginas
+            for pagina in ImageSequence.Iterator(imagen):
+                paginas.append(pytesseract.image_to_string(pagina.convert("L"), lang=idioma))
+        return {"estado": "PROCESADO", "texto": "\n".join(paginas).strip(), "error": ""}
+    except Exception as exc:
+        return {"estado": "ERROR", "texto": "", "error": str(exc)[:255]}
+
+
+# ================================================
+# 📌 PROGRAMACIÓN DESDE LAS VISTAS
+# ================================================
+def _registro_principal(expediente):
+    registro, _ = TextoOCR.objects.update_or_create(
+        expediente=expediente,
+        origen="PRINCIPAL",
+        defaults={
+            "archivo": expediente.archivo_principal.name,
+            "estado": "PENDIENTE",
+            "texto": "",
+            "error": "",
+        },
+    )
+    return registro
+
+
+def _registro_anexo(anexo):
+    registro, _ = TextoOCR.objects.update_or_create(
+        anexo=anexo,
+        defaults={
+            "expediente_id": anexo.expediente_id,
+            "origen": "ANEXO",
+            "archivo": anexo.archivo_anexo.name,
+            "estado": "PENDIENTE",
+            "texto": "",
+            "error": "",
+        },
+    )
+    return registro
+
+
+def _guardar_resultado(registro_id):
+    def _guardar(resultado):
+        TextoOCR.objects.filter(pk=registro_id).update(
+            fecha_procesado=timezone.now(),
+            **resultado,
+        )
+    return _guardar
+
+
+def programar_ocr(expediente, anexos=(), incluir_principal=True):
+    """
+    Marca los documentos como PENDIENTE y los envía al pool de OCR
+    cuando la transacción actual confirma.
+    """
+    config = obtener_config()
+    registros = [_registro_anexo(anexo) for anexo in anexos]
+    if incluir_principal and expediente.archivo_principal:
+        registros.insert(0, _registro_principal(expediente))
+
+    for registro in registros:
+        encolar(
+            POOL,
+            extraer_texto,
+            os.path.join(settings.MEDIA_ROOT, registro.archivo),
+            config["idioma"],
+            config["extensiones"],
+            al_terminar=_guardar_resultado(registro.id),
+            max_workers=config["max_workers"],
+        )
+
+
+def procesar_lote(registros):
+    """
+    Procesa sincrónicamente un lote de registros en el pool (usado por el
+    backfill) y guarda los resultados con un único bulk_update.
+    """
+    config = obtener_config()
+    pool = obtener_pool(POOL, config["max_workers"])
+    rutas = [os.path.join(settings.MEDIA_ROOT, r.archivo) for r in registros]
+    resultados = pool.map(
+        extraer_texto,
+        rutas,
+        [config["idioma"]] * len(rutas),
+        [config["extensiones"]] * len(rutas),
+    )
+
+    ahora = timezone.now()
+    for registro, resultado in zip(registros, resultados):
+        registro.estado = resultado["estado"]
+        registro.texto = resultado["texto"]
+        registro.error = resultado["error"]
+        registro.fecha_procesado = ahora
+
+    TextoOCR.objects.bulk_update(
+        registros, ["estado", "texto", "error", "fecha_procesado"]
+    )
+    return registros
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from common.utils.streaming.zip import zip_en_streaming
+from solicitudes.models import ComentarioSolicitud
+
+from .models import Expediente
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+def _documentos(expediente, prefijo):
+    """
+    Lista (nombre_en_zip, FieldFile, origen) de todos los archivos
+    de un expediente y de su solicitud.
+    """
+    documentos = []
+    if expediente.archivo_principal:
+        documentos.append((
+            f"{prefijo}principal/{os.path.basename(expediente.archivo_principal.name)}",
+            expediente.archivo_principal,
+            "principal",
+        ))
+
+    for anexo in expediente.archivos_anexados.all():
+        documentos.append((
+            f"{prefijo}anexos/{anexo.id}-{os.path.basename(anexo.archivo_anexo.name)}",
+            anexo.archivo_anexo,
+            "anexo_expediente",
+        ))
+
+    solicitud = getattr(expediente, "solicitud", None)
+    if solicitud is None:
+        return documentos
+
+    for anexo in solicitud.solicitud_archivo_anexo.all():
+        documentos.append((
+            f"{prefijo}solicitud/anexos/{anexo.id}-{os.path.basename(anexo.archivo_anexo.name)}",
+            anexo.archivo_anexo,
+            "anexo_solicitud",
+        ))
+
+    for comentario in solicitud.comentarios_solicitud.all():
+        for anexo in comentario.comentario_solicitud.all():
+            documentos.append((
+                f"{prefijo}solicitud/comentarios/{comentario.id}/"
+                f"{anexo.id}-{os.path.basename(anexo.archivo_anexo.name)}",
+                anexo.archivo_anexo,
+                "anexo_comentario",
+            ))
+    return documentos
+
+
+def _leer(archivo, registro):
+    """Lee el archivo por bloques calculando tamaño y sha256 al vuelo."""
+    sha256 = hashlib.sha256()
+    tamano = 0
+    with archivo.open("rb"):
+        for bloque in archivo.chunks(TAMANO_BLOQUE):
+            sha256.update(bloque)
+            tamano += len(bloque)
+            yield bloque
+    registro.update(tamano=tamano, sha256=sha256.hexdigest())
+
+
+def _entradas(expedientes, por_carpeta):
+    manifiesto = {
+        "generado": timezone.now().isoformat(),
+        "expedientes": [],
+        "archivos": [],
+        "faltantes": [],
+    }
+
+    for expediente in expedientes:
+        prefijo = f"{expediente.id_publico}/" if por_carpeta else ""
+        manifiesto["expedientes"].append(expediente.id_publico)
+
+        for nombre, archivo, origen in _documentos(expediente, prefijo):
+            registro = {"nombre": nombre, "origen": origen, "expediente": expediente.id_publico}
+            if not archivo.storage.exists(archivo.name):
+                manifiesto["faltantes"].append(registro)
+                continue
+            manifiesto["archivos"].append(registro)
+            yield nombre, _leer(archivo, registro)
+
+    yield "manifest.json", [json.dumps(manifiesto, ensure_ascii=False, indent=2).encode("utf-8")]
+
+
+def queryset_paquete(queryset):
+    """Precarga todo lo necesario para armar los paquetes sin consultas N+1."""
+    return queryset.select_related("solicitud").prefetch_related(
+        "archivos_anexados",
+        "solicitud__solicitud_archivo_anexo",
+        Prefetch(
+            "solicitud__comentarios_solicitud",
+            queryset=ComentarioSolicitud.objects.prefetch_related("comentario_solicitud"),
+        ),
+    )
+
+
+def generar_paquete(expediente):
+    """ZIP en streaming de un expediente con todos sus archivos y un manifiesto."""
+    expediente = queryset_paquete(Expediente.objects.filter(pk=expediente.pk)).get()
+    return zip_en_streaming(_entradas([expediente], por_carpeta=False))
+
+
+def generar_paquete_lote(queryset, chunk_size=50):
+    """
+    ZIP en streaming de varios expedientes (una carpeta por id_publico),
+    recorriendo el queryset por bloques para no cargarlo entero.
+    """
+    expedientes = queryset_paquete(queryset).iterator(chunk_size=chunk_size)
+    return zip_en_streaming(_entradas(expedientes, por_carpeta=True))
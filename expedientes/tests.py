@@ -1,3 +1,173 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from common.utils.media.normalizacion import CONFIG_DEFECTO, normalizar_imagen
+from common.utils.streaming.tabular import csv_en_streaming
+
+from . import importacion
+from .models import Expediente, LoteImportacion
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+class NormalizarImagenTests(SimpleTestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    def test_archivo_danado_devuelve_error(self):
+        ruta = self.ruta("danada.jpg")
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"\xff\xd8\xff" + b"no es una imagen")
+        resultado = normalizar_imagen(ruta, CONFIG_DEFECTO)
+        self.assertEqual(resultado["ruta"], ruta)
+        self.assertIn("error", resultado)
+        self.assertFalse(os.path.exists(f"{ruta}.normalizando"))
+
+    def test_archivo_inexistente_devuelve_error(self):
+        resultado = normalizar_imagen(self.ruta("no-existe.png"), CONFIG_DEFECTO)
+        self.assertIn("FileNotFoundError", resultado["error"])
+
+    def test_reemplaza_sin_dejar_temporal(self):
+        from PIL import Image
+
+        ruta = self.ruta("grande.jpg")
+        Image.new("RGB", (4000, 3000), "white").save(ruta, quality=100)
+        resultado = normalizar_imagen(ruta, CONFIG_DEFECTO)
+        self.assertTrue(resultado["reemplazado"])
+        self.assertLess(resultado["despues"], resultado["antes"])
+        self.assertFalse(os.path.exists(f"{ruta}.normalizando"))
+
+
+class FechasInvalidasTests(TestCase):
+    def test_paquete_lote_responde_400(self):
+        cliente = APIClient()
+        cliente.force_authenticate(User.objects.create_superuser(username="admin"))
+        for desde in ("2024-13-45", "2024-02-30", "ayer"):
+            response = cliente.get("/api/expedientes/paquete-lote/", {"desde": desde, "hasta": "2024-03-01"})
+            self.assertEqual(response.status_code, 400, desde)
+
+    def test_archivar_expedientes_falla_con_mensaje(self):
+        with self.assertRaisesMessage(CommandError, "Fecha inválida"):
+            call_command("archivar_expedientes", desde="2024-13-45", hasta="2024-12-31", salida=os.devnull)
+
+
+class ExportacionCsvTests(SimpleTestCase):
+    def test_celdas_con_formula_se_escapan(self):
+        filas = [["=HYPERLINK(\"http://x\")", "+51 999", "@SUMA(A1)", "-1", -1, "normal"]]
+        contenido = b"".join(csv_en_streaming(["Asunto", "Teléfono", "a", "b", "c", "d"], filas))
+        linea = contenido.decode("utf-8").splitlines()[1]
+        self.assertEqual(linea, "\"'=HYPERLINK(\"\"http://x\"\")\",'+51 999,'@SUMA(A1),'-1,-1,normal")
+
+
+def fila_importacion(numero, **cambios):
+    return {
+        "tipo_persona": "NATURAL", "dni": "12345678", "apellidos": "Prueba", "nombres": f"Fila {numero}",
+        "telefono": "999999999", "correo": "importacion@example.com",
+        "departamento": "LIMA", "provincia": "LIMA", "distrito": "LIMA",
+        "tipo_documento": "CARTA", "numero_documento": f"IMP-{numero}", "numero_folios": 1,
+        "asunto": f"Importado {numero}", "archivo_principal": "principal.pdf", **cambios,
+    }
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class ImportacionTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_superuser(username="importador")
+        self.directorio = tempfile.mkdtemp()
+        with open(os.path.join(self.directorio, "principal.pdf"), "wb") as archivo:
+            archivo.write(b"%PDF-1.4 importado")
+
+    def jsonl(self, lineas):
+        return io.BytesIO(b"\n".join(
+            linea if isinstance(linea, bytes) else json.dumps(linea).encode() for linea in lineas
+        ) + b"\n")
+
+    def importar(self, datos, **kwargs):
+        return importacion.importar(datos, "datos.jsonl", self.directorio, self.usuario, **kwargs)
+
+    def test_reanuda_desde_el_ultimo_lote_confirmado(self):
+        datos = self.jsonl([fila_importacion(n) for n in range(1, 6)])
+        insertar = importacion._insertar_lote
+        llamadas = []
+
+        def falla_en_el_segundo(*args):
+            llamadas.append(args)
+            if len(llamadas) == 2:
+                raise RuntimeError("corte")
+            return insertar(*args)
+
+        with mock.patch.object(importacion, "_insertar_lote", side_effect=falla_en_el_segundo):
+            with self.assertRaises(RuntimeError):
+                self.importar(datos, tamano_lote=2)
+        control = LoteImportacion.objects.get()
+        self.assertEqual((control.ultima_linea, control.creados, control.completado), (2, 2, False))
+
+        control = self.importar(datos, tamano_lote=2)
+        self.assertEqual((control.ultima_linea, control.creados, control.completado), (5, 5, True))
+        self.assertEqual(
+            sorted(Expediente.objects.values_list("numero_documento", flat=True)),
+            [f"IMP-{n}" for n in range(1, 6)],
+        )
+
+        # Un archivo ya completado no vuelve a importarse, salvo que se reinicie
+        self.assertEqual(self.importar(datos, tamano_lote=2).creados, 5)
+        self.assertEqual(Expediente.objects.count(), 5)
+        self.assertEqual(self.importar(datos, tamano_lote=2, reiniciar=True).creados, 5)
+        self.assertEqual(Expediente.objects.count(), 10)
+
+    def test_lineas_ilegibles_se_rechazan_una_a_una(self):
+        datos = self.jsonl([
+            fila_importacion(1),
+            b"{no es json",
+            b'{"asunto": "\xff\xfe"}',
+            b"[1, 2]",
+            fila_importacion(5, telefono="12"),
+            fila_importacion(6),
+        ])
+        control = self.importar(datos, tamano_lote=2)
+        self.assertEqual((control.creados, control.rechazados, control.completado), (2, 4, True))
+        self.assertEqual([error["linea"] for error in control.errores], [2, 3, 4, 5])
+        self.assertIn("JSON inválido", control.errores[0]["errores"]["fila"])
+        self.assertIn("UTF-8", control.errores[1]["errores"]["fila"])
+        self.assertIn("telefono", control.errores[3]["errores"])
+
+    def test_csv_con_linea_no_utf8(self):
+        cabecera = ",".join(fila_importacion(1)).encode()
+        lineas = [
+            ",".join(str(v) for v in fila_importacion(n).values()).encode() for n in (1, 2)
+        ]
+        lineas[0] = lineas[0].replace(b"Prueba", b"Pr\xe9ba")
+        datos = io.BytesIO(b"\r\n".join([cabecera, *lineas]) + b"\r\n")
+        control = importacion.importar(datos, "datos.csv", self.directorio, self.usuario)
+        self.assertEqual((control.creados, control.rechazados), (1, 1))
+        self.assertEqual(control.errores[0]["linea"], 2)
+
+    def test_lote_no_positivo(self):
+        with self.assertRaisesMessage(CommandError, "--lote"):
+            call_command(
+                "importar_expedientes", os.devnull,
+                archivos=self.directorio, usuario=self.usuario.username, lote=0,
+            )
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario)
+        with override_settings(IMPORTACION_DIR=os.path.dirname(self.directorio)):
+            for lote in ("0", "-1"):
+                response = cliente.post("/api/expedientes-importacion/", {
+                    "datos": SimpleUploadedFile("datos.jsonl", self.jsonl([fila_importacion(1)]).getvalue()),
+                    "directorio": os.path.basename(self.directorio),
+                    "lote": lote,
+                }, format="multipart")
+                self.assertEqual(response.status_code, 400, lote)
+        self.assertFalse(LoteImportacion.objects.exists())
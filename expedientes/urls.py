@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from django.urls import path, include
 from .views import (
     ExpedienteViewSet, 
+    ImportacionExpedientesView,
 )
 
 router = DefaultRouter()
@@ -12,5 +13,6 @@ router.register(r"expedientes", ExpedienteViewSet)
 # router.register(r"pendientes", MisSolicitudesView.as_view(), basename="pendientes")  <-- ESTO ESTABA MAL
 
 urlpatterns = [
+    path("expedientes-importacion/", ImportacionExpedientesView.as_view(), name="expedientes-importacion"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -8,7 +8,7 @@ from .serializers import (
     ExpedienteSerializer, 
     ExpedienteArchivoAnexoSerializer
 )
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from common.utils.constants.expediente.ubigeo.datos import DEPARTAMENTOS, PROVINCIAS, DISTRITOS
 from .permissions.django_permissions_coment import DjangoModelPermissionsConMensaje
 
@@ -22,18 +22,40 @@ from .permissions.rol.expediente_archivo_anexo.supervisor_mesa_de_partes import
 )
 
 from .permissions.rol.expediente.base import (MesaDePartesExpedientePermission)
+from .ocr import programar_ocr
+from common.utils.media.validacion import ValidacionAnexosMixin
+from common.utils.streaming.exportacion import ExportacionMixin
+from common.utils.cache.condicional import GetCondicionalMixin
+from common.utils.streaming.listado import ListadoStreamingMixin
+from .paquetes import generar_paquete, generar_paquete_lote
+from .importacion import importar
+from rest_framework.views import APIView
+from rest_framework import status
+from django.conf import settings
+import os
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from historial.compacto import calcular_delta, reconstruir, versiones as versiones_compactas
  
 # ================================================
 # 📌 EXPEDIENTES
 # ================================================
-class ExpedienteViewSet(viewsets.ModelViewSet):
+class ExpedienteViewSet(
+    GetCondicionalMixin, ListadoStreamingMixin, ExportacionMixin, ValidacionAnexosMixin, viewsets.ModelViewSet
+):
     queryset = Expediente.objects.all().order_by("-fecha_creacion")
     serializer_class = ExpedienteSerializer
     parser_classes = [MultiPartParser, FormParser,JSONParser]
     permission_classes=[permissions.IsAuthenticated,DjangoModelPermissionsConMensaje,MesaDePartesExpedientePermission] #
 
+    # 📎 Validación de anexos mientras se suben (tamaño, tipo y cuotas)
+    politicas_anexos = {
+        "archivo_principal": "expedientes.Expediente",
+        "archivos_anexados": "expedientes.ExpedienteArchivoAnexo",
+    }
+
     # 🔍 Búsqueda
-    search_fields = ["id_publico", "dni", "apellidos", "nombres", "numero_documento"]
+    search_fields = ["id_publico", "dni", "apellidos", "nombres", "numero_documento", "textos_ocr__texto"]
 
     # 🔧 Filtros
     filterset_fields = ["departamento", "provincia", "distrito"]
@@ -42,6 +64,41 @@ class ExpedienteViewSet(viewsets.ModelViewSet):
     ordering_fields = ["fecha_creacion", "id_publico"]
     ordering = ["-fecha_creacion"]
 
+    # 🏷️ GET condicional (ETag / Last-Modified): lo que cambia ExpedienteSerializer
+    validador_fechas = [
+        "fecha_actualizacion",
+        "archivos_anexados__fecha_creacion",
+        "solicitud__fecha_actualizacion",
+    ]
+    validador_conteos = ["archivos_anexados"]
+
+    # 📤 Exportación CSV / XLSX (GET /api/expedientes/exportar/?formato=csv|xlsx)
+    nombre_exportacion = "expedientes"
+    columnas_exportacion = [
+        ("ID público", "id_publico"),
+        ("Tipo de persona", "tipo_persona"),
+        ("DNI", "dni"),
+        ("RUC", "ruc"),
+        ("Razón social", "razon_social"),
+        ("Apellidos", "apellidos"),
+        ("Nombres", "nombres"),
+        ("Teléfono", "telefono"),
+        ("Correo", "correo"),
+        ("Departamento", "departamento"),
+        ("Provincia", "provincia"),
+        ("Distrito", "distrito"),
+        ("Tipo de documento", "tipo_documento"),
+        ("N° de documento", "numero_documento"),
+        ("Folios", "numero_folios"),
+        ("Asunto", "asunto"),
+        ("Creado por", "creado_por__username"),
+        ("Fecha de creación", "fecha_creacion"),
+        ("Estado de solicitud", "solicitud__estado"),
+    ]
+
+    def expediente_de_anexos(self):
+        return self.kwargs.get("pk")
+
     # ----------------------------
     # Guardar expediente con anexos
     # ----------------------------
@@ -63,12 +120,17 @@ class ExpedienteViewSet(viewsets.ModelViewSet):
         anexos = self.request.FILES.getlist("archivos_anexados")
         descripciones = self.request.data.getlist("archivos_anexados_descripciones")
 
-        for archivo, descripcion in zip(anexos, descripciones):
+        creados = [
             ExpedienteArchivoAnexo.objects.create(
                 expediente=expediente,
                 archivo_anexo=archivo,
                 descripcion=descripcion
             )
+            for archivo, descripcion in zip(anexos, descripciones)
+        ]
+
+        # OCR asíncrono del principal y los anexos
+        programar_ocr(expediente, anexos=creados)
 
     # Actualizar expediente
     def update(self, request, *args, **kwargs):
@@ -81,12 +143,21 @@ class ExpedienteViewSet(viewsets.ModelViewSet):
         anexos = request.FILES.getlist("archivos_anexados")
         descripciones = request.data.getlist("archivos_anexados_descripciones")
 
-        for archivo, descripcion in zip(anexos, descripciones):
+        creados = [
             ExpedienteArchivoAnexo.objects.create(
                 expediente=expediente,
                 archivo_anexo=archivo,
                 descripcion=descripcion
             )
+            for archivo, descripcion in zip(anexos, descripciones)
+        ]
+
+        # OCR solo de lo que cambió
+        programar_ocr(
+            expediente,
+            anexos=creados,
+            incluir_principal="archivo_principal" in request.FILES,
+        )
 
         return Response(serializer.data)
 
@@ -99,6 +170,8 @@ class ExpedienteViewSet(viewsets.ModelViewSet):
         Helper para paginar cualquier queryset y devolver Response
         en el formato DRF paginado.
         """
+        if self.usar_streaming():
+            return self.respuesta_streaming(queryset)
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -115,6 +188,87 @@ class ExpedienteViewSet(viewsets.ModelViewSet):
     def creadas_sin_solicitud(self, request):
         qs = Expediente.objects.filter(creado_por=request.user, solicitud__isnull=True).distinct().order_by("-fecha_creacion")
         return self._paginar_queryset(qs)
+
+    # ----------------------------
+    # Paquete ZIP (descarga en streaming)
+    # ----------------------------
+    def _respuesta_zip(self, contenido, nombre):
+        response = StreamingHttpResponse(contenido, content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{nombre}"'
+        return response
+
+    @action(detail=True, methods=["get"], url_path="paquete")
+    def paquete(self, request, pk=None):
+        """
+        Descarga en un ZIP el archivo principal, los anexos del expediente,
+        los de su solicitud y los de sus comentarios, con un manifest.json.
+        """
+        expediente = self.get_object()
+        return self._respuesta_zip(generar_paquete(expediente), f"{expediente.id_publico}.zip")
+
+    @action(detail=False, methods=["get"], url_path="paquete-lote")
+    def paquete_lote(self, request):
+        """
+        ZIP de todos los expedientes creados entre ?desde=AAAA-MM-DD y
+        ?hasta=AAAA-MM-DD (inclusive), una carpeta por expediente. Para archivo.
+        """
+        try:
+            desde = parse_date(request.query_params.get("desde") or "")
+            hasta = parse_date(request.query_params.get("hasta") or "")
+        except ValueError:
+            # Bien formada pero inexistente (p. ej. 2024-13-45)
+            raise ValidationError("Fecha inválida en 'desde' o 'hasta'.")
+        if not desde or not hasta:
+            raise ValidationError("Debe indicar las fechas 'desde' y 'hasta' (AAAA-MM-DD).")
+        if desde > hasta:
+            raise ValidationError("La fecha 'desde' no puede ser posterior a 'hasta'.")
+
+        qs = self.filter_queryset(self.get_queryset()).filter(
+            fecha_creacion__date__gte=desde,
+            fecha_creacion__date__lte=hasta,
+        ).order_by("fecha_creacion")
+        return self._respuesta_zip(generar_paquete_lote(qs), f"expedientes_{desde}_{hasta}.zip")
+
+    # ----------------------------
+    # Historial compacto (versiones reconstruidas)
+    # ----------------------------
+    def _version_a_dict(self, version, cambios=None):
+        datos = {
+            "numero": version.numero,
+            "tipo": version.tipo,
+            "fecha": version.fecha,
+            "usuario": version.usuario_id,
+            "motivo": version.motivo,
+        }
+        if cambios is not None:
+            datos["cambios"] = cambios
+        return datos
+
+    @action(detail=True, methods=["get"], url_path="versiones")
+    def versiones(self, request, pk=None):
+        """Versiones del expediente, cada una con los campos que cambió."""
+        expediente = self.get_object()
+        resultado = []
+        previo = {}
+        for version in versiones_compactas(Expediente, expediente.pk):
+            resultado.append(self._version_a_dict(version, calcular_delta(previo, version.campos)))
+            previo = version.campos
+
+        page = self.paginate_queryset(resultado)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(resultado)
+
+    @action(detail=True, methods=["get"], url_path=r"versiones/(?P<numero>\d+)")
+    def version(self, request, pk=None, numero=None):
+        """Estado completo del expediente en la versión `numero`."""
+        expediente = self.get_object()
+        version = reconstruir(Expediente, expediente.pk, numero=int(numero))
+        if version is None:
+            raise NotFound("La versión no existe.")
+        datos = self._version_a_dict(version)
+        datos["campos"] = version.campos
+        return Response(datos)
     
 class ExpedienteArchivoAnexoViewSet(viewsets.ModelViewSet):
     queryset = ExpedienteArchivoAnexo.objects.all()
@@ -152,4 +306,49 @@ class ExpedienteArchivoAnexoViewSet(viewsets.ModelViewSet):
     # Opcional: filtrar solo los anexos del usuario logueado
     def get_queryset(self):
         user = self.request.user
-        return super().get_queryset().filter(expediente__creado_por=user)
\ No newline at end of file
+        return super().get_queryset().filter(expediente__creado_por=user)
+
+# ================================================
+# 📥 IMPORTACIÓN MASIVA (solo administradores)
+# ================================================
+class ImportacionExpedientesView(APIView):
+    """
+    POST multipart:
+    - `datos`: archivo CSV o JSONL (un expediente por fila)
+    - `directorio`: carpeta dentro de IMPORTACION_DIR con los archivos
+    - `lote` (opcional): filas por lote
+
+    Reenviar el mismo archivo reanuda desde el último lote confirmado.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        datos = request.FILES.get("datos")
+        if datos is None:
+            raise ValidationError("Debe adjuntar el archivo 'datos' (CSV o JSONL).")
+
+        raiz = os.path.realpath(settings.IMPORTACION_DIR)
+        directorio = os.path.realpath(os.path.join(raiz, request.data.get("directorio", "")))
+        if os.path.commonpath([raiz, directorio]) != raiz or not os.path.isdir(directorio):
+            raise ValidationError("El directorio de archivos no es válido.")
+
+        try:
+            tamano_lote = int(request.data.get("lote", 500))
+        except ValueError:
+            raise ValidationError("El tamaño de lote debe ser un entero.")
+        if tamano_lote < 1:
+            raise ValidationError("El tamaño de lote debe ser mayor que cero.")
+
+        control = importar(datos.file, datos.name, directorio, request.user, tamano_lote=tamano_lote)
+        return Response(
+            {
+                "id": control.id,
+                "creados": control.creados,
+                "rechazados": control.rechazados,
+                "ultima_linea": control.ultima_linea,
+                "completado": control.completado,
+                "errores": control.errores,
+            },
+            status=status.HTTP_201_CREATED,
+        )
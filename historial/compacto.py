@@ -0,0 +1,246 @@
+"""
+Historial compacto: versiones guardadas como delta de la anterior, con un
+checkpoint (estado completo) cada `checkpoint_cada` versiones.
+
+Reconstruir cualquier versión lee el último checkpoint previo y, como mucho,
+`checkpoint_cada - 1` deltas: una consulta acotada, sin importar cuántas
+versiones tenga el objeto.
+"""
+import datetime
+import decimal
+import logging
+import uuid
+from collections import namedtuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Fila pendiente de escribir (equivalente compacto de lotes.FilaHistorial)
+FilaCompacta = namedtuple("FilaCompacta", "modelo objeto_id tipo fecha usuario_id motivo estado using")
+
+# Versión reconstruida: `campos` es el estado completo (valores JSON, por attname)
+Version = namedtuple("Version", "numero tipo fecha usuario_id motivo checkpoint campos")
+
+# modelo -> HistorialCompacto que lo registra
+_registros = {}
+
+
+def registrar_modelo(modelo, registro):
+    _registros[modelo] = registro
+
+
+def registro_de(modelo):
+    return _registros.get(modelo)
+
+
+def modelos_compactos():
+    return list(_registros)
+
+
+# ----------------------------
+# Estado y deltas
+# ----------------------------
+def normalizar(valor):
+    """Lleva un valor de campo a su forma JSON, la misma que se lee de la BD."""
+    if isinstance(valor, FieldFile):
+        return valor.name or ""
+    if isinstance(valor, (datetime.date, datetime.time)):
+        # isoformat completo: DjangoJSONEncoder recorta los microsegundos
+        return valor.isoformat()
+    if isinstance(valor, (decimal.Decimal, uuid.UUID)):
+        return str(valor)
+    return valor
+
+
+def estado_json(objeto, campos):
+    return {campo.attname: normalizar(getattr(objeto, campo.attname)) for campo in campos}
+
+
+def calcular_delta(previo, actual):
+    return {campo: valor for campo, valor in actual.items() if campo not in previo or previo[campo] != valor}
+
+
+def a_python(modelo, campos):
+    """Convierte un estado reconstruido a valores Python según los campos del modelo."""
+    por_attname = {campo.attname: campo for campo in modelo._meta.concrete_fields}
+    return {
+        nombre: por_attname[nombre].to_python(valor) if nombre in por_attname and valor is not None else valor
+        for nombre, valor in campos.items()
+    }
+
+
+# ----------------------------
+# Escritura
+# ----------------------------
+def _cadenas(content_type_id, objetos_ids, **limite):
+    """
+    Versiones desde el último checkpoint (dentro de `limite`) de cada objeto,
+    en una sola consulta ordenada por (objeto_id, numero).
+    """
+    from .models import VersionCompacta
+
+    ultimo_checkpoint = (
+        VersionCompacta.objects.filter(
+            content_type_id=content_type_id,
+            objeto_id=OuterRef("objeto_id"),
+            checkpoint=True,
+            **limite,
+        )
+        .order_by("-numero")
+        .values("numero")[:1]
+    )
+    return (
+        VersionCompacta.objects.filter(
+            content_type_id=content_type_id,
+            objeto_id__in=objetos_ids,
+            numero__gte=Subquery(ultimo_checkpoint),
+            **limite,
+        )
+        .order_by("objeto_id", "numero")
+    )
+
+
+def _ultimos_estados(content_type_id, objetos_ids):
+    """{objeto_id: (numero, numero_checkpoint, estado)} de la última versión de cada objeto."""
+    ultimos = {}
+    for fila in _cadenas(content_type_id, objetos_ids).values("objeto_id", "numero", "checkpoint", "datos"):
+        previo = ultimos.get(fila["objeto_id"])
+        if fila["checkpoint"] or previo is None:
+            ultimos[fila["objeto_id"]] = (fila["numero"], fila["numero"], dict(fila["datos"]))
+        else:
+            previo[2].update(fila["datos"])
+            ultimos[fila["objeto_id"]] = (fila["numero"], previo[1], previo[2])
+    return ultimos
+
+
+def _construir_versiones(filas):
+    from .models import VersionCompacta
+
+    por_tipo = {}
+    for fila in filas:
+        content_type = ContentType.objects.get_for_model(fila.modelo)
+        por_tipo.setdefault(content_type.id, []).append(fila)
+
+    nuevas = []
+    for content_type_id, grupo in por_tipo.items():
+        ultimos = _ultimos_estados(content_type_id, {fila.objeto_id for fila in grupo})
+        for fila in grupo:
+            cada = _registros[fila.modelo].checkpoint_cada
+            numero, numero_checkpoint, previo = ultimos.get(fila.objeto_id, (0, None, None))
+            numero += 1
+            checkpoint = previo is None or numero - numero_checkpoint >= cada
+            nuevas.append(VersionCompacta(
+                content_type_id=content_type_id,
+                objeto_id=fila.objeto_id,
+                numero=numero,
+                tipo=fila.tipo,
+                fecha=fila.fecha,
+                usuario_id=fila.usuario_id,
+                motivo=fila.motivo,
+                checkpoint=checkpoint,
+                datos=fila.estado if checkpoint else calcular_delta(previo, fila.estado),
+            ))
+            ultimos[fila.objeto_id] = (numero, numero if checkpoint else numero_checkpoint, fila.estado)
+    return nuevas
+
+
+def escribir_versiones(filas, intentos=3):
+    """
+    Numera y guarda las versiones pendientes (deltas contra la última versión
+    guardada, no contra lo que el proceso tenía en memoria).
+    Si otro proceso tomó el mismo número, se recalcula.
+    """
+    from .models import VersionCompacta
+
+    for intento in range(intentos):
+        try:
+            with transaction.atomic():
+                VersionCompacta.objects.bulk_create(_construir_versiones(filas), batch_size=500)
+            return
+        except IntegrityError:
+            if intento == intentos - 1:
+                raise
+            logger.warning("Conflicto numerando versiones compactas; reintentando")
+
+
+def bulk_create_con_historial(objetos, modelo, usuario=None, batch_size=None):
+    """bulk_create + historial, compacto o de simple_history según el modelo."""
+    registro = registro_de(modelo)
+    if registro is None:
+        from simple_history.utils import bulk_create_with_history
+
+        return bulk_create_with_history(objetos, modelo, batch_size=batch_size, default_user=usuario)
+
+    creados = modelo._default_manager.bulk_create(objetos, batch_size=batch_size)
+    ahora = timezone.now()
+    escribir_versiones([registro.fila(objeto, "+", usuario, fecha=ahora) for objeto in creados])
+    return creados
+
+
+# ----------------------------
+# Lectura / reconstrucción
+# ----------------------------
+def _version(fila, campos):
+    return Version(
+        numero=fila["numero"],
+        tipo=fila["tipo"],
+        fecha=fila["fecha"],
+        usuario_id=fila["usuario_id"],
+        motivo=fila["motivo"],
+        checkpoint=fila["checkpoint"],
+        campos=campos,
+    )
+
+
+_COLUMNAS = ("numero", "tipo", "fecha", "usuario_id", "motivo", "checkpoint", "datos")
+
+
+def reconstruir(modelo, objeto_id, numero=None, fecha=None):
+    """
+    Estado del objeto en la versión `numero` (o la vigente en `fecha`;
+    sin ninguno de los dos, la última). None si no existe.
+    Lee como mucho `checkpoint_cada` filas.
+    """
+    limite = {}
+    if numero is not None:
+        limite["numero__lte"] = numero
+    if fecha is not None:
+        limite["fecha__lte"] = fecha
+
+    content_type = ContentType.objects.get_for_model(modelo)
+    campos = None
+    fila = None
+    for fila in _cadenas(content_type.id, [objeto_id], **limite).values(*_COLUMNAS):
+        if fila["checkpoint"]:
+            campos = dict(fila["datos"])
+        else:
+            campos.update(fila["datos"])
+    if fila is None or (numero is not None and fila["numero"] != numero):
+        return None
+    return _version(fila, campos)
+
+
+def versiones(modelo, objeto_id):
+    """Todas las versiones del objeto en orden, cada una con su estado completo."""
+    from .models import VersionCompacta
+
+    content_type = ContentType.objects.get_for_model(modelo)
+    campos = {}
+    consulta = (
+        VersionCompacta.objects.filter(content_type=content_type, objeto_id=objeto_id)
+        .order_by("numero")
+        .values(*_COLUMNAS)
+    )
+    for fila in consulta.iterator(chunk_size=500):
+        campos = dict(fila["datos"]) if fila["checkpoint"] else {**campos, **fila["datos"]}
+        yield _version(fila, campos)
+
+
+def instancia(modelo, version):
+    """Instancia (sin guardar) del modelo con el estado de `version`."""
+    return modelo(**a_python(modelo, version.campos))
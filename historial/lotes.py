@@ -0,0 +1,150 @@
+import logging
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections, transaction
+from simple_history.signals import post_create_historical_record
+
+logger = logging.getLogger(__name__)
+
+# Fila pendiente: la instancia histórica ya construida + lo necesario para las señales
+FilaHistorial = namedtuple("FilaHistorial", "instancia historica using")
+
+# Lote abierto para la petición / bloque actual (None = escribir al confirmar)
+_lote_actual = ContextVar("lote_historial", default=None)
+
+# Cola de fondo: un solo hilo para no competir por la BD con las peticiones
+_cola = None
+
+
+class LoteHistorial:
+    """Acumula las filas históricas confirmadas y las vuelca con un bulk_create por modelo."""
+
+    def __init__(self, en_segundo_plano=False):
+        self.filas = []
+        self.en_segundo_plano = en_segundo_plano
+
+    def agregar(self, fila):
+        self.filas.append(fila)
+
+    def volcar(self):
+        filas, self.filas = self.filas, []
+        if not filas:
+            return
+        if self.en_segundo_plano:
+            _obtener_cola().submit(_escribir_en_hilo, filas)
+        else:
+            escribir_tras_commit(filas)
+
+
+@contextmanager
+def agrupar_historial(en_segundo_plano=False):
+    """
+    Agrupa todas las filas de historial generadas dentro del bloque
+    y las escribe al salir (un INSERT por modelo histórico).
+    Los bloques anidados se suman al lote exterior.
+    """
+    if _lote_actual.get() is not None:
+        yield _lote_actual.get()
+        return
+
+    lote = LoteHistorial(en_segundo_plano)
+    token = _lote_actual.set(lote)
+    try:
+        yield lote
+    finally:
+        _lote_actual.reset(token)
+        # También si la vista falló: lo ya confirmado necesita su historial
+        lote.volcar()
+
+
+def registrar(fila):
+    """
+    Encola una fila histórica. Dentro de una transacción solo se acepta
+    al confirmarse (si hay rollback, la fila se descarta con los datos).
+    """
+    if transaction.get_connection(fila.using).in_atomic_block:
+        transaction.on_commit(partial(_acumular, fila), using=fila.using)
+    else:
+        _acumular(fila)
+
+
+def _acumular(fila):
+    lote = _lote_actual.get()
+    if lote is None:
+        escribir_tras_commit([fila])
+    else:
+        lote.agregar(fila)
+
+
+def escribir(filas):
+    """
+    Inserta las filas agrupadas por (modelo histórico, BD) y emite post_create_historical_record.
+    Las versiones compactas se numeran y escriben juntas en historial.compacto.
+    """
+    from .compacto import FilaCompacta, escribir_versiones
+
+    compactas = [fila for fila in filas if isinstance(fila, FilaCompacta)]
+    if compactas:
+        escribir_versiones(compactas)
+
+    grupos = defaultdict(list)
+    for fila in filas:
+        if not isinstance(fila, FilaCompacta):
+            grupos[(type(fila.historica), fila.using)].append(fila)
+
+    for (modelo, using), grupo in grupos.items():
+        modelo._default_manager.using(using).bulk_create(
+            [fila.historica for fila in grupo],
+            batch_size=500,
+        )
+        for fila in grupo:
+            post_create_historical_record.send(
+                sender=modelo,
+                instance=fila.instancia,
+                history_instance=fila.historica,
+                history_date=fila.historica.history_date,
+                history_user=fila.historica.history_user,
+                history_change_reason=fila.historica.history_change_reason,
+                using=using,
+            )
+
+
+def escribir_tras_commit(filas):
+    """
+    Escribe filas de cambios ya confirmados. Si falla (IntegrityError, BD
+    bloqueada tras los reintentos) se registra en el log y no se propaga:
+    la petición respondería 500 por un cambio que sí se guardó. El lote va
+    en su propio atomic, así un fallo no deja a medias ni rompe una
+    transacción exterior.
+    """
+    try:
+        with transaction.atomic():
+            escribir(filas)
+    except Exception:
+        logger.exception("No se pudo escribir un lote de %s filas de historial", len(filas))
+
+
+def _escribir_en_hilo(filas):
+    try:
+        escribir_tras_commit(filas)
+    finally:
+        connections.close_all()
+
+
+def _obtener_cola():
+    global _cola
+    if _cola is None:
+        _cola = ThreadPoolExecutor(max_workers=1, thread_name_prefix="historial")
+    return _cola
+
+
+def esperar_cola():
+    """Bloquea hasta que la cola de fondo termine lo pendiente (benchmarks, comandos)."""
+    global _cola
+    if _cola is not None:
+        _cola.shutdown(wait=True)
+        _cola = None
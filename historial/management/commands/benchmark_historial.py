@@ -0,0 +1,141 @@
+import re
+import tempfile
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from historial.lotes import esperar_cola
+from historial.models import VersionCompacta
+
+# (etiqueta, configuración HISTORIAL)
+MODOS = [
+    ("sin optimizar", {"modo": "sincrono", "omitir_sin_cambios": False}),
+    ("sincrono", {"modo": "sincrono", "omitir_sin_cambios": True}),
+    ("agrupado", {"modo": "agrupado", "omitir_sin_cambios": True}),
+    ("cola", {"modo": "cola", "omitir_sin_cambios": True}),
+]
+
+ESCRITURA = re.compile(r'^\s*(?:INSERT INTO|UPDATE|DELETE FROM)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide las escrituras por llamada a la API de solicitudes en cada modo de historial "
+        "(sentencias de negocio, sentencias de historial y filas históricas). "
+        "Usa una base de datos de prueba temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticiones", type=int, default=20, help="Veces que se repite cada escenario.")
+
+    def handle(self, *args, **options):
+        nombre_original = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+                for etiqueta, config in MODOS:
+                    with override_settings(HISTORIAL=config):
+                        resultados = self._medir(options["repeticiones"])
+                    self._imprimir(etiqueta, resultados, options["repeticiones"])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    # ----------------------------
+    # Escenario
+    # ----------------------------
+    def _medir(self, repeticiones):
+        admin, _ = User.objects.get_or_create(
+            username="benchmark", defaults={"is_superuser": True, "is_staff": True}
+        )
+        otro, _ = User.objects.get_or_create(username="benchmark-adjunto")
+        cliente = APIClient()
+        cliente.force_authenticate(admin)
+
+        tablas = {
+            modelo._meta.db_table
+            for modelo in apps.get_models()
+            if modelo.__name__.startswith("Historical") or modelo is VersionCompacta
+        }
+        resultados = defaultdict(lambda: defaultdict(int))
+
+        def llamar(nombre, metodo, url, datos):
+            filas_antes = self._filas_historial(tablas)
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = getattr(cliente, metodo)(url, datos, format="json")
+            esperar_cola()
+            if respuesta.status_code >= 400:
+                raise RuntimeError(f"{nombre}: {respuesta.status_code} {respuesta.content[:200]}")
+
+            for consulta in consultas.captured_queries:
+                coincidencia = ESCRITURA.match(consulta["sql"])
+                if coincidencia:
+                    clave = "historial" if coincidencia.group(1) in tablas else "negocio"
+                    resultados[nombre][clave] += 1
+            resultados[nombre]["filas"] += self._filas_historial(tablas) - filas_antes
+            return respuesta
+
+        for _ in range(repeticiones):
+            expediente = self._expediente(admin)
+            solicitud = llamar("crear solicitud", "post", "/api/solicitudes/", {
+                "expediente": expediente.id,
+                "usuario_asignado": admin.id,
+                "usuarios_adjuntados": [otro.id],
+            }).json()
+            url = f"/api/solicitudes/{solicitud['id']}/"
+            llamar("cambiar estado", "patch", url, {"estado": "ENVIADO_A_AREA"})
+            llamar("patch sin cambios", "patch", url, {"estado": "ENVIADO_A_AREA"})
+            llamar("comentar", "post", "/api/comentarios-solicitud/", {
+                "solicitud": solicitud["id"],
+                "texto": "Comentario de prueba",
+            })
+            llamar("operación masiva", "post", "/api/solicitudes/operaciones-masivas/", {
+                "ids": [solicitud["id"]],
+                "operacion": "reasignar",
+                "usuario_asignado": otro.id,
+            })
+        return resultados
+
+    def _expediente(self, usuario):
+        from expedientes.models import Expediente
+
+        expediente = Expediente(
+            tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Benchmark",
+            telefono="999999999", correo="benchmark@example.com",
+            departamento="LIMA", provincia="LIMA", distrito="LIMA",
+            tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="Benchmark",
+            creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+        )
+        expediente.save()
+        return expediente
+
+    def _filas_historial(self, tablas):
+        total = 0
+        with connection.cursor() as cursor:
+            for tabla in tablas:
+                cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(tabla)}")
+                total += cursor.fetchone()[0]
+        return total
+
+    # ----------------------------
+    # Salida
+    # ----------------------------
+    def _imprimir(self, etiqueta, resultados, repeticiones):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nModo: {etiqueta}"))
+        self.stdout.write(f"{'llamada':<20}{'negocio':>10}{'historial':>12}{'filas hist.':>14}")
+        totales = defaultdict(float)
+        for nombre, conteo in resultados.items():
+            fila = {clave: conteo[clave] / repeticiones for clave in ("negocio", "historial", "filas")}
+            for clave, valor in fila.items():
+                totales[clave] += valor
+            self.stdout.write(
+                f"{nombre:<20}{fila['negocio']:>10.1f}{fila['historial']:>12.1f}{fila['filas']:>14.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':<20}{totales['negocio']:>10.1f}{totales['historial']:>12.1f}{totales['filas']:>14.1f}"
+        ))
@@ -0,0 +1,23 @@
+from .lotes import agrupar_historial
+from .registros import config_historial
+
+
+class HistorialAgrupadoMiddleware:
+    """
+    Abre un lote de historial por petición: todas las filas históricas
+    confirmadas durante la vista se escriben juntas al final. Un fallo al
+    escribirlas se registra en el log y no cambia la respuesta (los datos ya
+    se confirmaron; ver historial.lotes.escribir_tras_commit).
+    Debe ir después de simple_history.middleware.HistoryRequestMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        modo = config_historial()["modo"]
+        if modo == "sincrono":
+            return self.get_response(request)
+
+        with agrupar_historial(en_segundo_plano=(modo == "cola")):
+            return self.get_response(request)
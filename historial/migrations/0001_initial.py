@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:35
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionCompacta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('numero', models.PositiveIntegerField()),
+                ('tipo', models.CharField(choices=[('+', 'Creado'), ('~', 'Modificado'), ('-', 'Eliminado')], max_length=1)),
+                ('fecha', models.DateTimeField()),
+                ('motivo', models.CharField(blank=True, max_length=100, null=True)),
+                ('checkpoint', models.BooleanField(default=False)),
+                ('datos', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='contenttypes.contenttype')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'objeto_id', 'checkpoint', 'numero'], name='historial_v_content_0e4954_idx'), models.Index(fields=['content_type', 'objeto_id', 'fecha'], name='historial_v_content_9b5a80_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'objeto_id', 'numero'), name='version_compacta_unica')],
+            },
+        ),
+    ]
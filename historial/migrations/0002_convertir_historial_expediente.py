@@ -0,0 +1,98 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:40
+
+from django.db import migrations
+
+from historial.compacto import calcular_delta, estado_json
+
+# Debe coincidir con Expediente.history (HistorialCompacto)
+CHECKPOINT_CADA = 10
+LOTE = 2000
+
+
+def convertir_a_compacto(apps, schema_editor):
+    """HistoricalExpediente (filas completas) -> VersionCompacta (deltas + checkpoints)."""
+    Expediente = apps.get_model("expedientes", "Expediente")
+    HistoricalExpediente = apps.get_model("expedientes", "HistoricalExpediente")
+    VersionCompacta = apps.get_model("historial", "VersionCompacta")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    content_type, _ = ContentType.objects.get_or_create(app_label="expedientes", model="expediente")
+    campos = Expediente._meta.concrete_fields
+
+    nuevas = []
+    objeto_id = None
+    filas = HistoricalExpediente.objects.order_by("id", "history_date", "history_id")
+    for historica in filas.iterator(chunk_size=LOTE):
+        if historica.id != objeto_id:
+            objeto_id, numero, numero_checkpoint, previo = historica.id, 0, None, None
+
+        numero += 1
+        estado = estado_json(historica, campos)
+        checkpoint = previo is None or numero - numero_checkpoint >= CHECKPOINT_CADA
+        if checkpoint:
+            numero_checkpoint = numero
+
+        nuevas.append(VersionCompacta(
+            content_type=content_type,
+            objeto_id=objeto_id,
+            numero=numero,
+            tipo=historica.history_type,
+            fecha=historica.history_date,
+            usuario_id=historica.history_user_id,
+            motivo=historica.history_change_reason,
+            checkpoint=checkpoint,
+            datos=estado if checkpoint else calcular_delta(previo, estado),
+        ))
+        previo = estado
+
+        if len(nuevas) >= LOTE:
+            VersionCompacta.objects.bulk_create(nuevas)
+            nuevas = []
+
+    VersionCompacta.objects.bulk_create(nuevas)
+
+
+def restaurar_filas_completas(apps, schema_editor):
+    """Inverso: reconstruye cada versión y vuelve a escribir HistoricalExpediente."""
+    HistoricalExpediente = apps.get_model("expedientes", "HistoricalExpediente")
+    VersionCompacta = apps.get_model("historial", "VersionCompacta")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    content_type = ContentType.objects.filter(app_label="expedientes", model="expediente").first()
+    if content_type is None:
+        return
+
+    versiones = VersionCompacta.objects.filter(content_type=content_type)
+    nuevas = []
+    objeto_id, estado = None, {}
+    for version in versiones.order_by("objeto_id", "numero").iterator(chunk_size=LOTE):
+        if version.objeto_id != objeto_id:
+            objeto_id, estado = version.objeto_id, {}
+        estado = dict(version.datos) if version.checkpoint else {**estado, **version.datos}
+
+        nuevas.append(HistoricalExpediente(
+            history_date=version.fecha,
+            history_type=version.tipo,
+            history_user_id=version.usuario_id,
+            history_change_reason=version.motivo,
+            **estado,
+        ))
+        if len(nuevas) >= LOTE:
+            HistoricalExpediente.objects.bulk_create(nuevas)
+            nuevas = []
+
+    HistoricalExpediente.objects.bulk_create(nuevas)
+    versiones.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('expedientes', '0003_loteimportacion'),
+        ('historial', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(convertir_a_compacto, restaurar_filas_completas),
+    ]
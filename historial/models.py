@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class VersionCompacta(models.Model):
+    """
+    Una versión de un objeto con historial compacto.
+    Los checkpoints guardan el estado completo; el resto solo los campos
+    que cambiaron respecto a la versión anterior.
+    """
+
+    TIPO_CHOICES = [
+        ("+", "Creado"),
+        ("~", "Modificado"),
+        ("-", "Eliminado"),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT, related_name="+")
+    objeto_id = models.PositiveBigIntegerField()
+    numero = models.PositiveIntegerField()
+    tipo = models.CharField(max_length=1, choices=TIPO_CHOICES)
+    fecha = models.DateTimeField()
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
+    )
+    motivo = models.CharField(max_length=100, null=True, blank=True)
+    checkpoint = models.BooleanField(default=False)
+    datos = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "objeto_id", "numero"],
+                name="version_compacta_unica",
+            ),
+        ]
+        indexes = [
+            # Último checkpoint anterior a una versión: base de la reconstrucción
+            models.Index(fields=["content_type", "objeto_id", "checkpoint", "numero"]),
+            models.Index(fields=["content_type", "objeto_id", "fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.objeto_id} v{self.numero}"
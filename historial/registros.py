@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+from simple_history.models import HistoricalRecords
+from simple_history.signals import pre_create_historical_record
+
+from .compacto import FilaCompacta, escribir_versiones, estado_json, registrar_modelo
+from .lotes import FilaHistorial, registrar
+
+CONFIG_DEFECTO = {
+    "modo": "agrupado",  # "sincrono" | "agrupado" | "cola"
+    "omitir_sin_cambios": True,
+}
+
+
+def config_historial():
+    return {**CONFIG_DEFECTO, **getattr(settings, "HISTORIAL", {})}
+
+
+class HistorialOptimizado(HistoricalRecords):
+    """
+    HistoricalRecords con menos escrituras:
+    - No guarda snapshot si ningún campo seguido cambió desde la carga / último save
+    - En modo "agrupado" / "cola" la fila no se inserta en el save: se acumula
+      y se vuelca al confirmar (ver historial.lotes y HistorialAgrupadoMiddleware)
+
+    `campos_ignorados`: campos que por sí solos no justifican una versión
+    (p. ej. fecha_actualizacion con auto_now). Sí se guardan en el snapshot.
+    """
+
+    def __init__(self, *args, campos_ignorados=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.campos_ignorados = set(campos_ignorados)
+        self.campos_seguidos = ()
+
+    def finalize(self, sender, **kwargs):
+        super().finalize(sender, **kwargs)
+        if self.cls is not sender:
+            return
+        self.campos_seguidos = tuple(
+            field.attname
+            for field in self.fields_included(sender)
+            if field.name not in self.campos_ignorados
+        )
+        post_init.connect(self._tomar_estado, sender=sender, weak=False)
+
+    # ----------------------------
+    # Detección de cambios
+    # ----------------------------
+    def _estado(self, instance):
+        valores = instance.__dict__
+        # Los campos diferidos (only/defer) no están en __dict__: no se comparan
+        return {campo: valores[campo] for campo in self.campos_seguidos if campo in valores}
+
+    def _tomar_estado(self, instance, **kwargs):
+        instance._historial_estado = self._estado(instance)
+
+    def sin_cambios(self, instance):
+        previo = getattr(instance, "_historial_estado", None)
+        if previo is None:
+            return False
+        return all(
+            campo in previo and previo[campo] == valor
+            for campo, valor in self._estado(instance).items()
+        )
+
+    def post_save(self, instance, created, using=None, **kwargs):
+        try:
+            if not created and config_historial()["omitir_sin_cambios"] and self.sin_cambios(instance):
+                return
+            super().post_save(instance, created, using=using, **kwargs)
+        finally:
+            instance._historial_estado = self._estado(instance)
+
+    # ----------------------------
+    # Escritura diferida
+    # ----------------------------
+    def create_historical_record(self, instance, history_type, using=None):
+        if config_historial()["modo"] == "sincrono" or self.m2m_fields:
+            return super().create_historical_record(instance, history_type, using=using)
+
+        using = using if self.use_base_model_db else None
+        history_date = getattr(instance, "_history_date", timezone.now())
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(instance, history_type, using)
+        manager = getattr(instance, self.manager_name)
+
+        attrs = {field.attname: getattr(instance, field.attname) for field in self.fields_included(instance)}
+        if getattr(manager.model, "history_relation", None) is not None:
+            attrs["history_relation"] = instance
+
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+
+        pre_create_historical_record.send(
+            sender=manager.model,
+            instance=instance,
+            history_date=history_date,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            history_instance=history_instance,
+            using=using,
+        )
+
+        registrar(FilaHistorial(instance, history_instance, using))
+
+
+class HistorialCompacto(HistorialOptimizado):
+    """
+    Variante para modelos anchos: en lugar de una tabla Historical<Modelo>
+    con filas completas, guarda VersionCompacta (deltas + checkpoint cada
+    `checkpoint_cada` versiones). Ver historial.compacto para leerlas.
+    """
+
+    def __init__(self, *args, checkpoint_cada=10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpoint_cada = checkpoint_cada
+
+    def finalize(self, sender, **kwargs):
+        # Sin modelo histórico: solo señales y registro
+        if self.cls is not sender:
+            return
+        self.campos_seguidos = tuple(
+            field.attname
+            for field in self.fields_included(sender)
+            if field.name not in self.campos_ignorados
+        )
+        post_init.connect(self._tomar_estado, sender=sender, weak=False)
+        post_save.connect(self.post_save, sender=sender, weak=False)
+        post_delete.connect(self.post_delete, sender=sender, weak=False)
+        registrar_modelo(sender, self)
+
+    def fila(self, instance, history_type, usuario=None, fecha=None, using=None):
+        return FilaCompacta(
+            modelo=type(instance),
+            objeto_id=instance.pk,
+            tipo=history_type,
+            fecha=fecha or getattr(instance, "_history_date", None) or timezone.now(),
+            usuario_id=getattr(usuario, "pk", None),
+            motivo=getattr(instance, "_change_reason", None),
+            estado=estado_json(instance, self.fields_included(instance)),
+            using=using,
+        )
+
+    def create_historical_record(self, instance, history_type, using=None):
+        fila = self.fila(instance, history_type, self.get_history_user(instance), using=using)
+        if config_historial()["modo"] == "sincrono":
+            escribir_versiones([fila])
+        else:
+            registrar(fila)
@@ -0,0 +1,171 @@
+"""
+Retención del historial: archiva (JSONL comprimido) y borra por lotes las
+versiones que ya no hace falta conservar completas.
+
+Siempre se conserva la última versión de cada objeto. Cada lote se exporta,
+se sincroniza a disco y recién entonces se borra en su propia transacción
+corta, con una pausa entre lotes para no acaparar el bloqueo de escritura.
+"""
+import gzip
+import json
+import os
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .compacto import normalizar
+from .models import VersionCompacta
+
+
+class Archivador:
+    """Un archivo .jsonl.gz por etiqueta y ejecución; escribe y sincroniza por lote."""
+
+    def __init__(self, directorio, etiqueta):
+        os.makedirs(directorio, exist_ok=True)
+        marca = timezone.now().strftime("%Y%m%dT%H%M%S")
+        self.ruta = os.path.join(directorio, f"{etiqueta}_{marca}.jsonl.gz")
+        self._archivo = None
+
+    def escribir(self, filas):
+        if self._archivo is None:
+            self._archivo = gzip.open(self.ruta, "at", encoding="utf-8")
+        for fila in filas:
+            self._archivo.write(json.dumps({k: normalizar(v) for k, v in fila.items()}, ensure_ascii=False))
+            self._archivo.write("\n")
+        # Lo archivado debe estar en disco antes de borrarlo de la BD
+        self._archivo.flush()
+        os.fsync(self._archivo.buffer.fileobj.fileno())
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+class Podador:
+    """
+    - `podar_historico`: tablas Historical* de simple_history (filas completas)
+    - `podar_compacto`: VersionCompacta; la versión que queda pasa a checkpoint
+    """
+
+    def __init__(self, directorio, lote=500, pausa=0.05, dry_run=False):
+        self.directorio = directorio
+        self.lote = lote
+        self.pausa = pausa
+        self.dry_run = dry_run
+
+    def podar_historico(self, modelo_historico, filtro, etiqueta):
+        """Archiva y borra las filas de `filtro` salvo la más reciente de cada objeto."""
+        mas_reciente = modelo_historico.objects.filter(id=OuterRef("id")).filter(
+            Q(history_date__gt=OuterRef("history_date"))
+            | Q(history_date=OuterRef("history_date"), history_id__gt=OuterRef("history_id"))
+        )
+        candidatas = modelo_historico.objects.filter(filtro).filter(Exists(mas_reciente))
+        if self.dry_run:
+            return candidatas.count()
+
+        archivador = Archivador(self.directorio, etiqueta)
+        total = 0
+        ultimo = 0
+        try:
+            while True:
+                filas = list(
+                    candidatas.filter(history_id__gt=ultimo).order_by("history_id").values()[:self.lote]
+                )
+                if not filas:
+                    break
+                archivador.escribir(filas)
+                ids = [fila["history_id"] for fila in filas]
+                with transaction.atomic():
+                    modelo_historico.objects.filter(history_id__in=ids).delete()
+                total += len(ids)
+                ultimo = ids[-1]
+                time.sleep(self.pausa)
+        finally:
+            archivador.cerrar()
+        return total
+
+    def podar_compacto(self, modelo, filtro, etiqueta):
+        """
+        Igual que podar_historico sobre VersionCompacta: archiva las versiones
+        de `filtro` salvo la última de cada objeto; la primera que sobrevive a
+        un hueco se reescribe como checkpoint (estado completo).
+        """
+        content_type = ContentType.objects.get_for_model(modelo)
+        versiones = VersionCompacta.objects.filter(filtro, content_type=content_type)
+        mas_reciente = VersionCompacta.objects.filter(
+            content_type=content_type,
+            objeto_id=OuterRef("objeto_id"),
+            numero__gt=OuterRef("numero"),
+        )
+        objetos = (
+            versiones.filter(Exists(mas_reciente))
+            .order_by("objeto_id")
+            .values_list("objeto_id", flat=True)
+            .distinct()
+        )
+        if self.dry_run:
+            return versiones.filter(Exists(mas_reciente)).count()
+
+        archivador = Archivador(self.directorio, etiqueta)
+        total = 0
+        ultimo = -1
+        try:
+            while True:
+                # Pocos objetos por lote: se leen todas sus versiones para rehacer el checkpoint
+                ids = list(objetos.filter(objeto_id__gt=ultimo)[:max(self.lote // 20, 1)])
+                if not ids:
+                    break
+                total += self._colapsar_objetos(content_type, ids, filtro, archivador)
+                ultimo = ids[-1]
+                time.sleep(self.pausa)
+        finally:
+            archivador.cerrar()
+        return total
+
+    def _colapsar_objetos(self, content_type, ids, filtro, archivador):
+        """
+        Archiva las versiones de `ids` que cumplen `filtro` y tienen una más
+        reciente. La primera versión que queda tras un hueco pasa a checkpoint
+        (estado completo), así reconstruir() sigue funcionando desde ella.
+        """
+        candidatas = set(
+            VersionCompacta.objects.filter(filtro, content_type=content_type, objeto_id__in=ids)
+            .values_list("id", flat=True)
+        )
+        # Todas las versiones de cada objeto: el estado se arma desde el principio
+        filas = list(
+            VersionCompacta.objects.filter(content_type=content_type, objeto_id__in=ids)
+            .order_by("objeto_id", "numero")
+            .values()
+        )
+        archivar, checkpoints = [], []
+        estado, objeto_id, hueco = {}, None, False
+        for i, fila in enumerate(filas):
+            if fila["objeto_id"] != objeto_id:
+                estado, objeto_id, hueco = {}, fila["objeto_id"], False
+            estado = dict(fila["datos"]) if fila["checkpoint"] else {**estado, **fila["datos"]}
+            es_ultima = i + 1 == len(filas) or filas[i + 1]["objeto_id"] != objeto_id
+            if fila["id"] in candidatas and not es_ultima:
+                archivar.append(fila)
+                hueco = True
+                continue
+            if hueco and not fila["checkpoint"]:
+                checkpoints.append(VersionCompacta(id=fila["id"], datos=dict(estado), checkpoint=True))
+            hueco = False
+
+        archivador.escribir(archivar)
+        with transaction.atomic():
+            VersionCompacta.objects.filter(id__in=[fila["id"] for fila in archivar]).delete()
+            VersionCompacta.objects.bulk_update(checkpoints, ["datos", "checkpoint"])
+        return len(archivar)
+
+
+def leer_archivo(ruta):
+    """Itera las filas de un archivo exportado por el Archivador."""
+    with gzip.open(ruta, "rt", encoding="utf-8") as archivo:
+        for linea in archivo:
+            yield json.loads(linea)
+
@@ -0,0 +1,229 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from expedientes.models import Expediente
+from solicitudes.models import Solicitud
+
+from . import lotes
+from .compacto import reconstruir, versiones
+from .models import VersionCompacta
+from .retencion import Podador, leer_archivo
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(HISTORIAL={"modo": "sincrono"}, MEDIA_ROOT=MEDIA_TEMPORAL)
+class HistorialCompactoBase(TestCase):
+    """Un expediente con `cantidad` versiones, una por día (la v1 hace `cantidad` días)."""
+
+    cantidad = 6
+
+    def setUp(self):
+        usuario = User.objects.create_user(username="historial")
+        self.expediente = Expediente(
+            tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Historial",
+            telefono="999999999", correo="historial@example.com",
+            departamento="LIMA", provincia="LIMA", distrito="LIMA",
+            tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="v1",
+            creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+        )
+        self.expediente.save()
+        for numero in range(2, self.cantidad + 1):
+            self.expediente.asunto = f"v{numero}"
+            self.expediente.save()
+
+        self.inicio = timezone.now() - timedelta(days=self.cantidad)
+        for numero in range(1, self.cantidad + 1):
+            self.version(numero).update(fecha=self.inicio + timedelta(days=numero))
+
+    def version(self, numero):
+        return VersionCompacta.objects.filter(
+            content_type=ContentType.objects.get_for_model(Expediente),
+            objeto_id=self.expediente.pk,
+            numero=numero,
+        )
+
+    def numeros(self):
+        return list(
+            VersionCompacta.objects.filter(objeto_id=self.expediente.pk)
+            .order_by("numero")
+            .values_list("numero", flat=True)
+        )
+
+
+class ReconstruirTests(HistorialCompactoBase):
+    cantidad = 12  # pasa un checkpoint (checkpoint_cada=10)
+
+    def test_checkpoint_cada_diez_versiones(self):
+        checkpoints = VersionCompacta.objects.filter(
+            objeto_id=self.expediente.pk, checkpoint=True
+        ).values_list("numero", flat=True)
+        self.assertEqual(sorted(checkpoints), [1, 11])
+
+    def test_reconstruye_cada_version(self):
+        for numero in range(1, self.cantidad + 1):
+            version = reconstruir(Expediente, self.expediente.pk, numero=numero)
+            self.assertEqual(version.numero, numero)
+            self.assertEqual(version.campos["asunto"], f"v{numero}")
+
+    def test_coincide_con_versiones(self):
+        for version in versiones(Expediente, self.expediente.pk):
+            self.assertEqual(
+                reconstruir(Expediente, self.expediente.pk, numero=version.numero).campos,
+                version.campos,
+            )
+
+    def test_por_fecha_y_ultima(self):
+        vigente = reconstruir(Expediente, self.expediente.pk, fecha=self.inicio + timedelta(days=4, hours=12))
+        self.assertEqual(vigente.numero, 4)
+        self.assertEqual(reconstruir(Expediente, self.expediente.pk).numero, self.cantidad)
+
+    def test_inexistente(self):
+        self.assertIsNone(reconstruir(Expediente, self.expediente.pk, numero=self.cantidad + 1))
+        self.assertIsNone(reconstruir(Expediente, self.expediente.pk, fecha=self.inicio))
+
+
+class PodarCompactoTests(HistorialCompactoBase):
+    def setUp(self):
+        super().setUp()
+        self.directorio = tempfile.mkdtemp()
+        # Antes del corte: v1, v2 y v3
+        self.corte = self.inicio + timedelta(days=3, hours=12)
+
+    def podar(self, filtro, dry_run=False):
+        podador = Podador(self.directorio, pausa=0, dry_run=dry_run)
+        return podador.podar_compacto(Expediente, filtro, "expedientes")
+
+    def test_dry_run_cuenta_solo_lo_filtrado(self):
+        self.assertEqual(self.podar(Q(fecha__lt=self.corte), dry_run=True), 3)
+        self.assertEqual(self.numeros(), [1, 2, 3, 4, 5, 6])
+
+    def test_conserva_versiones_posteriores_al_corte(self):
+        posteriores = {
+            fila["numero"]: fila
+            for fila in VersionCompacta.objects.filter(objeto_id=self.expediente.pk, numero__gt=4).values()
+        }
+        estados = {numero: reconstruir(Expediente, self.expediente.pk, numero=numero).campos for numero in range(4, 7)}
+
+        self.assertEqual(self.podar(Q(fecha__lt=self.corte)), 3)
+
+        self.assertEqual(self.numeros(), [4, 5, 6])
+        for numero, fila in posteriores.items():
+            self.assertEqual(self.version(numero).values().get(), fila)
+        # La primera que queda pasa a checkpoint; desde ahí se reconstruye igual
+        self.assertTrue(self.version(4).get().checkpoint)
+        for numero, campos in estados.items():
+            self.assertEqual(reconstruir(Expediente, self.expediente.pk, numero=numero).campos, campos)
+
+    def test_archiva_lo_borrado(self):
+        self.podar(Q(fecha__lt=self.corte))
+        (archivo,) = [entrada.path for entrada in os.scandir(self.directorio)]
+        self.assertEqual([fila["numero"] for fila in leer_archivo(archivo)], [1, 2, 3])
+
+    def test_conserva_la_ultima_version(self):
+        self.assertEqual(self.podar(Q()), 5)
+        self.assertEqual(self.numeros(), [6])
+        self.assertTrue(self.version(6).get().checkpoint)
+        self.assertEqual(reconstruir(Expediente, self.expediente.pk).campos["asunto"], "v6")
+
+    def test_hueco_intermedio(self):
+        # Solo v2 y v3: v1 queda como estaba y v4 pasa a checkpoint
+        self.assertEqual(self.podar(Q(numero__in=[2, 3])), 2)
+        self.assertEqual(self.numeros(), [1, 4, 5, 6])
+        self.assertEqual(reconstruir(Expediente, self.expediente.pk, numero=1).campos["asunto"], "v1")
+        self.assertEqual(reconstruir(Expediente, self.expediente.pk, numero=5).campos["asunto"], "v5")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class HistorialOptimizadoBase(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="optimizado")
+        expediente = Expediente(
+            tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Optimizado",
+            telefono="999999999", correo="optimizado@example.com",
+            departamento="LIMA", provincia="LIMA", distrito="LIMA",
+            tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="Optimizado",
+            creado_por=self.usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+        )
+        expediente.save()
+        self.solicitud = Solicitud.objects.create(
+            expediente=expediente, usuario_asignado=self.usuario, modificado_por=self.usuario
+        )
+
+    def filas(self):
+        return Solicitud.history.filter(id=self.solicitud.id).count()
+
+
+@override_settings(HISTORIAL={"modo": "sincrono"})
+class OmitirSinCambiosTests(HistorialOptimizadoBase):
+    def test_guardar_sin_cambios_no_crea_version(self):
+        antes = self.filas()
+        self.solicitud.save()
+        # fecha_actualizacion (auto_now) está en campos_ignorados
+        Solicitud.objects.get(pk=self.solicitud.pk).save()
+        self.assertEqual(self.filas(), antes)
+
+        self.solicitud.estado = "ENVIADO_A_AREA"
+        self.solicitud.save()
+        self.assertEqual(self.filas(), antes + 1)
+
+    @override_settings(HISTORIAL={"modo": "sincrono", "omitir_sin_cambios": False})
+    def test_desactivado_guarda_siempre(self):
+        antes = self.filas()
+        self.solicitud.save()
+        self.assertEqual(self.filas(), antes + 1)
+
+
+@override_settings(HISTORIAL={"modo": "agrupado"})
+class AgruparHistorialTests(HistorialOptimizadoBase):
+    def cambiar(self, *estados):
+        for estado in estados:
+            self.solicitud.estado = estado
+            self.solicitud.save()
+
+    def test_se_escribe_al_salir_del_bloque(self):
+        antes = self.filas()
+        with lotes.agrupar_historial() as lote:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cambiar("ENVIADO_A_AREA", "EN_TRAMITE_AREA", "REENVIO_MP")
+            self.assertEqual(len(lote.filas), 3)
+            self.assertEqual(self.filas(), antes)
+        self.assertEqual(self.filas(), antes + 3)
+
+    def test_un_insert_por_modelo(self):
+        with lotes.agrupar_historial() as lote:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cambiar("ENVIADO_A_AREA", "EN_TRAMITE_AREA", "REENVIO_MP")
+            filas, lote.filas = lote.filas, []
+        # SAVEPOINT + INSERT + RELEASE
+        with self.assertNumQueries(3):
+            lotes.escribir_tras_commit(filas)
+
+    def test_rollback_descarta_las_filas(self):
+        antes = self.filas()
+        with lotes.agrupar_historial() as lote:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    self.cambiar("ENVIADO_A_AREA")
+                    raise RuntimeError
+            self.assertEqual(lote.filas, [])
+        self.assertEqual(self.filas(), antes)
+
+    def test_un_fallo_al_escribir_no_se_propaga(self):
+        with mock.patch.object(lotes, "escribir", side_effect=IntegrityError("duplicado")):
+            with self.assertLogs("historial.lotes", "ERROR"):
+                with lotes.agrupar_historial():
+                    with self.captureOnCommitCallbacks(execute=True):
+                        self.cambiar("ENVIADO_A_AREA")
+        # La transacción exterior sigue usable
+        self.assertEqual(Solicitud.objects.get(pk=self.solicitud.pk).estado, "ENVIADO_A_AREA")
@@ -0,0 +1,166 @@
+"""
+Línea de tiempo de una solicitud: fusiona (k-way merge) el historial de la
+solicitud, de sus comentarios, de los anexos de comentarios y de los
+usuarios adjuntados en un solo flujo ordenado por fecha.
+
+Paginación por cursor (keyset) sobre (history_date, fuente, history_id):
+cada página hace como mucho 2 consultas por fuente + 1 de usuarios,
+sin importar el largo del historial.
+"""
+import base64
+import heapq
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db.models import OuterRef, Q, Subquery
+
+from historial.compacto import normalizar
+from .models import (
+    ComentarioSolicitud,
+    ComentarioSolicitudArchivoAnexo,
+    Solicitud,
+    UsuarioSolicitudAdjuntado,
+)
+
+# Campos que no se muestran como cambio (se actualizan solos)
+CAMPOS_IGNORADOS = {"id", "fecha_actualizacion"}
+
+
+def _fuentes(solicitud_id):
+    """(nombre, modelo histórico, filtro) en el orden que desempata eventos simultáneos."""
+    HistoricalComentario = ComentarioSolicitud.history.model
+    return [
+        ("solicitud", Solicitud.history.model, Q(id=solicitud_id)),
+        ("comentario", HistoricalComentario, Q(solicitud_id=solicitud_id)),
+        (
+            "anexo_comentario",
+            ComentarioSolicitudArchivoAnexo.history.model,
+            # Incluye comentarios ya borrados: se buscan en su historial
+            Q(comentario_id__in=HistoricalComentario.objects.filter(solicitud_id=solicitud_id).values("id")),
+        ),
+        ("usuario_adjuntado", UsuarioSolicitudAdjuntado.history.model, Q(solicitud_id=solicitud_id)),
+    ]
+
+
+# ----------------------------
+# Cursor
+# ----------------------------
+def codificar_cursor(clave):
+    fecha, fuente, history_id = clave
+    texto = f"{fecha.isoformat()}|{fuente}|{history_id}"
+    return base64.urlsafe_b64encode(texto.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha, fuente, history_id) o None. ValueError si el cursor no es válido."""
+    if not cursor:
+        return None
+    try:
+        fecha, fuente, history_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha), int(fuente), int(history_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Cursor inválido.") from exc
+
+
+def _despues_del_cursor(indice, cursor, descendente):
+    """Filtro keyset para la fuente `indice`: filas con clave posterior al cursor."""
+    if cursor is None:
+        return Q()
+    fecha, fuente, history_id = cursor
+    op = "lt" if descendente else "gt"
+    if indice == fuente:
+        return Q(**{f"history_date__{op}": fecha}) | Q(history_date=fecha, **{f"history_id__{op}": history_id})
+    # En la misma fecha, las fuentes "posteriores" entran completas
+    posterior = indice < fuente if descendente else indice > fuente
+    return Q(**{f"history_date__{op}{'e' if posterior else ''}": fecha})
+
+
+# ----------------------------
+# Diferencias por evento
+# ----------------------------
+def _campos(modelo):
+    return [campo.attname for campo in modelo.tracked_fields if campo.attname not in CAMPOS_IGNORADOS]
+
+
+def _cambios(campos, fila, previa):
+    if fila.history_type == "-":
+        return {}
+    if fila.history_type == "+" or previa is None:
+        return {
+            campo: [None, normalizar(getattr(fila, campo))]
+            for campo in campos
+            if getattr(fila, campo) not in (None, "")
+        }
+    cambios = {}
+    for campo in campos:
+        antes, despues = normalizar(getattr(previa, campo)), normalizar(getattr(fila, campo))
+        if antes != despues:
+            cambios[campo] = [antes, despues]
+    return cambios
+
+
+def _leer_fuente(indice, modelo, filtro, cursor, limite, descendente):
+    """Página de una fuente + versión anterior de cada objeto (para el diff)."""
+    signo = "-" if descendente else ""
+    anterior = (
+        modelo.objects.filter(id=OuterRef("id"))
+        .filter(
+            Q(history_date__lt=OuterRef("history_date"))
+            | Q(history_date=OuterRef("history_date"), history_id__lt=OuterRef("history_id"))
+        )
+        .order_by("-history_date", "-history_id")
+        .values("history_id")[:1]
+    )
+    filas = list(
+        modelo.objects.filter(filtro, _despues_del_cursor(indice, cursor, descendente))
+        .annotate(anterior_id=Subquery(anterior))
+        .order_by(f"{signo}history_date", f"{signo}history_id")[:limite + 1]
+    )
+
+    en_pagina = {fila.history_id: fila for fila in filas}
+    faltantes = {
+        fila.anterior_id
+        for fila in filas
+        if fila.history_type == "~" and fila.anterior_id and fila.anterior_id not in en_pagina
+    }
+    previas = {**en_pagina, **(modelo.objects.in_bulk(faltantes) if faltantes else {})}
+    return [((fila.history_date, indice, fila.history_id), fila, previas.get(fila.anterior_id)) for fila in filas]
+
+
+def linea_de_tiempo(solicitud_id, cursor=None, limite=50, descendente=True):
+    """
+    Devuelve (eventos, cursor_siguiente). cursor_siguiente es None en la última página.
+    """
+    flujos = []
+    campos = {}
+    for indice, (nombre, modelo, filtro) in enumerate(_fuentes(solicitud_id)):
+        campos[indice] = (nombre, _campos(modelo))
+        flujos.append(_leer_fuente(indice, modelo, filtro, cursor, limite, descendente))
+
+    fusionados = list(heapq.merge(*flujos, key=lambda item: item[0], reverse=descendente))
+    pagina = fusionados[:limite]
+
+    usuarios = dict(
+        User.objects.filter(
+            id__in={fila.history_user_id for _, fila, _ in pagina if fila.history_user_id}
+        ).values_list("id", "username")
+    ) if pagina else {}
+
+    eventos = []
+    for clave, fila, previa in pagina:
+        nombre, campos_fuente = campos[clave[1]]
+        eventos.append({
+            "fuente": nombre,
+            "objeto_id": fila.id,
+            "tipo": fila.history_type,
+            "fecha": fila.history_date,
+            "usuario": (
+                {"id": fila.history_user_id, "username": usuarios.get(fila.history_user_id)}
+                if fila.history_user_id else None
+            ),
+            "motivo": fila.history_change_reason,
+            "cambios": _cambios(campos_fuente, fila, previa),
+        })
+
+    siguiente = codificar_cursor(pagina[-1][0]) if len(fusionados) > limite else None
+    return eventos, siguiente
@@ -4,3 +4,54 @@ from django.apps import AppConfig
 class SolicitudesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'solicitudes'
+
+    def ready(self):
+        from operator import attrgetter
+
+        from django.db.models.signals import post_delete, post_save, pre_delete
+
+        from common.utils.media.normalizacion import conectar_normalizacion
+        from common.utils.media.uso import conectar_uso
+        from expedientes.models import Expediente
+        from . import cache, eventos, sla
+        from .models import (
+            ComentarioSolicitud,
+            ComentarioSolicitudArchivoAnexo,
+            Feriado,
+            PlazoSLA,
+            Solicitud,
+            SolicitudArchivoAnexo,
+            UsuarioSolicitudAdjuntado,
+        )
+
+        conectar_normalizacion(SolicitudArchivoAnexo, "archivo_anexo")
+        conectar_normalizacion(ComentarioSolicitudArchivoAnexo, "archivo_anexo")
+
+        # Cuotas de almacenamiento (usuarios.UsoAlmacenamiento)
+        conectar_uso(SolicitudArchivoAnexo, attrgetter("solicitud.expediente_id"), "archivo_anexo")
+        conectar_uso(
+            ComentarioSolicitudArchivoAnexo, attrgetter("comentario.solicitud.expediente_id"), "archivo_anexo"
+        )
+
+        # Calendario y plazos en caché: se recargan si cambian
+        for modelo in (Feriado, PlazoSLA):
+            post_save.connect(sla.invalidar, sender=modelo)
+            post_delete.connect(sla.invalidar, sender=modelo)
+
+        # Caché de listados por usuario / área (solicitudes.cache)
+        post_save.connect(cache.solicitud_guardada, sender=Solicitud)
+        pre_delete.connect(cache.solicitud_borrada, sender=Solicitud)
+        for modelo in (
+            ComentarioSolicitud,
+            ComentarioSolicitudArchivoAnexo,
+            SolicitudArchivoAnexo,
+            UsuarioSolicitudAdjuntado,
+        ):
+            post_save.connect(cache.relacionado_guardado, sender=modelo)
+            post_delete.connect(cache.relacionado_guardado, sender=modelo)
+        post_save.connect(cache.expediente_guardado, sender=Expediente)
+
+        # Avisos en vivo por usuario (solicitudes.eventos, stream SSE)
+        post_save.connect(eventos.solicitud_guardada, sender=Solicitud)
+        post_save.connect(eventos.adjuntado_creado, sender=UsuarioSolicitudAdjuntado)
+        post_save.connect(eventos.comentario_creado, sender=ComentarioSolicitud)
@@ -0,0 +1,90 @@
+"""
+Versiones (generaciones) por usuario y por área para la caché de los listados
+asignadas / creadas / adjuntadas (espacio del usuario) y mi-area (espacio del
+área del asignado). Ver common.utils.cache.
+
+Toda escritura que cambia lo que ve un listado incrementa los espacios
+afectados: los de antes del cambio (p. ej. el asignado anterior) y los de
+después. El incremento corre tras el commit para que ninguna petición
+concurrente guarde en caché datos sin confirmar con la versión nueva.
+"""
+from django.db import transaction
+
+from common.utils.cache.versiones import incrementar
+from usuarios.models import PerfilUsuario
+from .models import ComentarioSolicitud, Solicitud, UsuarioSolicitudAdjuntado
+
+
+def espacio_usuario(usuario_id):
+    return f"solicitudes:usuario:{usuario_id}"
+
+
+def espacio_area(area_id):
+    return f"solicitudes:area:{area_id}"
+
+
+def espacios_de(solicitud_ids, usuarios=(), asignados=()):
+    """Espacios que dependen de `solicitud_ids` según su estado actual en la BD."""
+    usuarios, asignados = set(usuarios), set(asignados)
+    if solicitud_ids:
+        for asignado_id, creador_id in Solicitud.objects.filter(id__in=solicitud_ids).values_list(
+            "usuario_asignado_id", "expediente__creado_por_id"
+        ):
+            asignados.add(asignado_id)
+            usuarios.add(creador_id)
+        usuarios.update(
+            UsuarioSolicitudAdjuntado.objects.filter(solicitud_id__in=solicitud_ids)
+            .values_list("usuario_id", flat=True)
+        )
+    asignados.discard(None)
+    usuarios |= asignados
+    areas = set(
+        PerfilUsuario.objects.filter(user_id__in=asignados, area__isnull=False).values_list("area_id", flat=True)
+    ) if asignados else set()
+    return [espacio_usuario(uid) for uid in usuarios if uid] + [espacio_area(aid) for aid in areas]
+
+
+def tocar_solicitudes(solicitud_ids, usuarios=(), asignados=()):
+    """
+    Invalida los listados de `solicitud_ids`: los espacios de ahora y, tras el
+    commit, los del estado final (cubre reasignaciones hechas en la transacción).
+    """
+    solicitud_ids = [sid for sid in solicitud_ids if sid]
+    previos = espacios_de(solicitud_ids, usuarios, asignados)
+    transaction.on_commit(lambda: incrementar(*previos, *espacios_de(solicitud_ids)))
+
+
+# ----------------------------
+# Receptores (conectados en SolicitudesConfig.ready)
+# ----------------------------
+def solicitud_guardada(sender, instance, **kwargs):
+    tocar_solicitudes(
+        [instance.pk],
+        asignados=[instance.usuario_asignado_id, getattr(instance, "_asignado_guardado", None)],
+    )
+
+
+def solicitud_borrada(sender, instance, **kwargs):
+    # pre_delete: la fila todavía existe para resolver creador y adjuntados
+    previos = espacios_de([instance.pk], asignados=[instance.usuario_asignado_id])
+    transaction.on_commit(lambda: incrementar(*previos))
+
+
+def relacionado_guardado(sender, instance, **kwargs):
+    """Comentario, anexo o usuario adjuntado: se invalida su solicitud."""
+    if isinstance(instance, UsuarioSolicitudAdjuntado):
+        tocar_solicitudes([instance.solicitud_id], usuarios=[instance.usuario_id])
+    elif hasattr(instance, "solicitud_id"):
+        tocar_solicitudes([instance.solicitud_id])
+    else:  # anexo de comentario
+        tocar_solicitudes(
+            ComentarioSolicitud.objects.filter(id=instance.comentario_id).values_list("solicitud_id", flat=True)
+        )
+
+
+def expediente_guardado(sender, instance, **kwargs):
+    # El listado anida el expediente (ExpedienteMiniSerializer)
+    tocar_solicitudes(
+        Solicitud.objects.filter(expediente_id=instance.pk).values_list("id", flat=True),
+        usuarios=[instance.creado_por_id],
+    )
@@ -0,0 +1,73 @@
+"""
+Avisos en vivo por usuario (stream SSE /api/async/eventos/), para que el
+cliente deje de hacer polling de pendientes/ y de los comentarios:
+
+- "asignacion" / "desasignacion": cambió Solicitud.usuario_asignado
+- "adjuntado": se creó un UsuarioSolicitudAdjuntado
+- "comentario": nuevo ComentarioSolicitud en una solicitud del usuario
+  (asignado, creador del expediente o adjuntado; no se avisa al autor)
+
+Los caminos en bloque (operaciones-masivas) no emiten post_save y llaman a
+estas funciones directamente. Ver common.utils.asincrono.eventos.
+"""
+from common.utils.asincrono.eventos import publicar
+
+from .models import Solicitud, UsuarioSolicitudAdjuntado
+
+
+def canal_usuario(usuario_id):
+    return f"usuario:{usuario_id}"
+
+
+def avisar_reasignaciones(solicitudes):
+    """Solicitudes guardadas cuyo asignado difiere de `_asignado_guardado`."""
+    for solicitud in solicitudes:
+        anterior = getattr(solicitud, "_asignado_guardado", None)
+        if solicitud.usuario_asignado_id == anterior:
+            continue
+        datos = {"solicitud": solicitud.pk, "estado": solicitud.estado}
+        if solicitud.usuario_asignado_id:
+            publicar(canal_usuario(solicitud.usuario_asignado_id), "asignacion", **datos)
+        if anterior:
+            publicar(canal_usuario(anterior), "desasignacion", **datos)
+
+
+def avisar_adjuntados(adjuntados):
+    for adjuntado in adjuntados:
+        publicar(canal_usuario(adjuntado.usuario_id), "adjuntado", solicitud=adjuntado.solicitud_id)
+
+
+def avisar_comentario(comentario):
+    asignado, creador = Solicitud.objects.filter(pk=comentario.solicitud_id).values_list(
+        "usuario_asignado_id", "expediente__creado_por_id"
+    ).first() or (None, None)
+    destinatarios = {asignado, creador, *UsuarioSolicitudAdjuntado.objects.filter(
+        solicitud_id=comentario.solicitud_id
+    ).values_list("usuario_id", flat=True)}
+    destinatarios -= {None, comentario.usuario_id}
+    for usuario_id in destinatarios:
+        publicar(
+            canal_usuario(usuario_id), "comentario",
+            solicitud=comentario.solicitud_id,
+            comentario=comentario.pk,
+            parent=comentario.parent_id,
+            autor=comentario.usuario_id,
+        )
+
+
+# ----------------------------
+# Receptores (conectados en SolicitudesConfig.ready)
+# ----------------------------
+def solicitud_guardada(sender, instance, **kwargs):
+    # post_save corre antes de que save() actualice _asignado_guardado
+    avisar_reasignaciones([instance])
+
+
+def adjuntado_creado(sender, instance, created, **kwargs):
+    if created:
+        avisar_adjuntados([instance])
+
+
+def comentario_creado(sender, instance, created, **kwargs):
+    if created:
+        avisar_comentario(instance)
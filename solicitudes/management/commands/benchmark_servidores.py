@@ -0,0 +1,204 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from expedientes.models import Expediente
+from solicitudes.models import Solicitud, UsuarioSolicitudAdjuntado
+
+# (etiqueta, módulo de aplicación, argumentos extra de gunicorn, ruta consultada)
+PERFILES = [
+    ("wsgi (sync)", "app.wsgi:application", [], "/api/pendientes/"),
+    (
+        "asgi (uvicorn)", "app.asgi:application",
+        ["--worker-class", "uvicorn.workers.UvicornWorker"], "/api/async/pendientes/",
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el perfil WSGI (gunicorn sync) con el ASGI (gunicorn + uvicorn) sirviendo "
+        "el poll de /pendientes/ con muchos clientes concurrentes: peticiones/s, latencias "
+        "y errores. Usa una base de datos de prueba temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrencia", type=int, default=500, help="Clientes haciendo poll a la vez.")
+        parser.add_argument("--duracion", type=float, default=15, help="Segundos de carga por perfil.")
+        parser.add_argument("--solicitudes", type=int, default=50, help="Solicitudes pendientes del usuario.")
+        parser.add_argument("--workers-wsgi", type=int, default=4)
+        parser.add_argument("--workers-asgi", type=int, default=1)
+        parser.add_argument("--puerto", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        nombre_original = connection.settings_dict["NAME"]
+        with tempfile.TemporaryDirectory() as directorio:
+            if connection.vendor == "sqlite":
+                # Base en archivo (no en memoria) para que los servidores la compartan
+                connection.settings_dict["TEST"]["NAME"] = os.path.join(directorio, "benchmark.sqlite3")
+            nombre_prueba = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            # Los servidores apuntan a la base de prueba por entorno (ver DATABASES en settings)
+            entorno = {"SQLITE_PATH" if connection.vendor == "sqlite" else "POSTGRES_DB": nombre_prueba}
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Motor: {connection.vendor}"))
+            try:
+                with override_settings(MEDIA_ROOT=directorio):
+                    token = self._preparar(options["solicitudes"])
+                connection.close()
+                for etiqueta, aplicacion, extra, ruta_url in PERFILES:
+                    workers = options["workers_asgi"] if "asgi" in aplicacion else options["workers_wsgi"]
+                    with _servidor(aplicacion, extra, workers, options["puerto"], entorno):
+                        resultado = asyncio.run(_cargar(
+                            options["puerto"], ruta_url, token,
+                            options["concurrencia"], options["duracion"],
+                        ))
+                    self._imprimir(f"{etiqueta}, {workers} worker(s)", resultado, options["duracion"])
+            finally:
+                connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    # ----------------------------
+    # Datos
+    # ----------------------------
+    def _preparar(self, cantidad):
+        usuario = User.objects.create_user(username="benchmark", password="benchmark")
+        for i in range(cantidad):
+            expediente = Expediente(
+                tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Benchmark",
+                telefono="999999999", correo="benchmark@example.com",
+                departamento="LIMA", provincia="LIMA", distrito="LIMA",
+                tipo_documento="CARTA", numero_documento=str(i), numero_folios=1, asunto="Benchmark",
+                creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+            )
+            expediente.save()
+            solicitud = Solicitud.objects.create(
+                expediente=expediente, usuario_asignado=usuario, modificado_por=usuario
+            )
+            if i % 2:
+                UsuarioSolicitudAdjuntado.objects.create(solicitud=solicitud, usuario=usuario)
+        return str(RefreshToken.for_user(usuario).access_token)
+
+    # ----------------------------
+    # Salida
+    # ----------------------------
+    def _imprimir(self, etiqueta, resultado, duracion):
+        latencias, errores = resultado
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{etiqueta}"))
+        if not latencias:
+            self.stdout.write(self.style.ERROR(f"sin respuestas correctas (errores: {errores})"))
+            return
+        latencias.sort()
+        p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+        self.stdout.write(f"{'peticiones':<14}{len(latencias):>10}")
+        self.stdout.write(f"{'peticiones/s':<14}{len(latencias) / duracion:>10.1f}")
+        self.stdout.write(f"{'p50 (ms)':<14}{statistics.median(latencias) * 1000:>10.1f}")
+        self.stdout.write(f"{'p95 (ms)':<14}{p95 * 1000:>10.1f}")
+        estilo = self.style.ERROR if errores else self.style.SUCCESS
+        self.stdout.write(estilo(f"{'errores':<14}{errores:>10}"))
+
+
+class _servidor:
+    """gunicorn en un subproceso apuntando a la base temporal (SQLITE_PATH / POSTGRES_DB)."""
+
+    def __init__(self, aplicacion, extra, workers, puerto, entorno):
+        self.comando = [
+            sys.executable, "-m", "gunicorn", aplicacion,
+            "--bind", f"127.0.0.1:{puerto}", "--workers", str(workers),
+            "--backlog", "4096", "--log-level", "warning", *extra,
+        ]
+        self.entorno = {**os.environ, **entorno, "DJANGO_SETTINGS_MODULE": "app.settings"}
+        self.puerto = puerto
+
+    def __enter__(self):
+        self.proceso = subprocess.Popen(self.comando, env=self.entorno, cwd=settings.BASE_DIR)
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if self.proceso.poll() is not None:
+                raise CommandError(f"gunicorn terminó al arrancar: {' '.join(self.comando)}")
+            try:
+                socket.create_connection(("127.0.0.1", self.puerto), timeout=1).close()
+                time.sleep(1)  # que todos los workers terminen de importar Django
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.proceso.terminate()
+        raise CommandError("gunicorn no respondió a tiempo.")
+
+    def __exit__(self, *exc):
+        self.proceso.terminate()
+        try:
+            self.proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.proceso.kill()
+
+
+# ----------------------------
+# Carga: clientes HTTP/1.1 mínimos sobre asyncio (reutilizan la conexión si el servidor lo permite)
+# ----------------------------
+async def _leer_respuesta(lector):
+    estado = int((await lector.readline()).split()[1])
+    cabeceras = {}
+    while True:
+        linea = (await lector.readline()).strip()
+        if not linea:
+            break
+        clave, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[clave.strip().lower()] = valor.strip().lower()
+    if "content-length" in cabeceras:
+        await lector.readexactly(int(cabeceras["content-length"]))
+    elif cabeceras.get("transfer-encoding") == "chunked":
+        while True:
+            tamano = int((await lector.readline()).strip(), 16)
+            await lector.readexactly(tamano + 2)
+            if not tamano:
+                break
+    else:
+        await lector.read()
+    return estado, cabeceras.get("connection") != "close"
+
+
+async def _cliente(puerto, peticion, fin, latencias, errores):
+    lector = escritor = None
+    while time.monotonic() < fin:
+        inicio = time.monotonic()
+        try:
+            if escritor is None:
+                lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            escritor.write(peticion)
+            estado, reutilizable = await asyncio.wait_for(_leer_respuesta(lector), timeout=60)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, IndexError):
+            errores[0] += 1
+            reutilizable, estado = False, None
+        if estado == 200:
+            latencias.append(time.monotonic() - inicio)
+        elif estado is not None:
+            errores[0] += 1
+        if not reutilizable and escritor is not None:
+            escritor.close()
+            lector = escritor = None
+    if escritor is not None:
+        escritor.close()
+
+
+async def _cargar(puerto, ruta, token, concurrencia, duracion):
+    peticion = (
+        f"GET {ruta} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Authorization: Bearer {token}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    latencias, errores = [], [0]
+    fin = time.monotonic() + duracion
+    await asyncio.gather(*(
+        _cliente(puerto, peticion, fin, latencias, errores) for _ in range(concurrencia)
+    ))
+    return latencias, errores[0]
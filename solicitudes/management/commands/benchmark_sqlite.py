@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from expedientes.models import Expediente
+from solicitudes.models import ComentarioSolicitud, Solicitud
+
+# (etiqueta, ENGINE, OPTIONS); None = las OPTIONS de settings.DATABASES["default"]
+PERFILES = [
+    ("por defecto (DELETE, DEFERRED)", "django.db.backends.sqlite3", {}),
+    (
+        "WAL + PRAGMAs, DEFERRED", "common.db.sqlite3",
+        {"transaction_mode": None, "reintentos": {"intentos": 1}},
+    ),
+    ("WAL + PRAGMAs, IMMEDIATE + reintento", "common.db.sqlite3", None),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la contención de escritura en SQLite con varios procesos a la vez (como los "
+        "workers de gunicorn): transacciones que leen y luego escriben, igual que una subida "
+        "(validar cuota -> insertar -> tocar la solicitud). Compara la configuración por "
+        "defecto con la de producción. Usa una base de datos de prueba temporal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=8, help="Procesos escribiendo a la vez.")
+        parser.add_argument("--transacciones", type=int, default=200, help="Transacciones por proceso.")
+        parser.add_argument("--solicitudes", type=int, default=20, help="Solicitudes sobre las que se escribe.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Este benchmark es solo para SQLite.")
+
+        nombre_original = connection.settings_dict["NAME"]
+        opciones_produccion = connection.settings_dict["OPTIONS"]
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "benchmark.sqlite3")
+            connection.settings_dict["TEST"]["NAME"] = ruta
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                with override_settings(MEDIA_ROOT=directorio):
+                    ids = self._preparar(options["solicitudes"])
+                for numero, (etiqueta, motor, opciones) in enumerate(PERFILES):
+                    alias = f"benchmark_{numero}"
+                    connections.settings[alias] = {
+                        **connection.settings_dict,
+                        "ENGINE": motor,
+                        "OPTIONS": opciones_produccion if opciones is None else opciones,
+                    }
+                    connections.close_all()
+                    _reiniciar_journal(ruta)
+                    resultado = self._medir(alias, ids, options["procesos"], options["transacciones"])
+                    self._imprimir(etiqueta, resultado)
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    # ----------------------------
+    # Escenario
+    # ----------------------------
+    def _preparar(self, cantidad):
+        usuario = User.objects.create_user(username="benchmark")
+        ids = []
+        for i in range(cantidad):
+            expediente = Expediente(
+                tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Benchmark",
+                telefono="999999999", correo="benchmark@example.com",
+                departamento="LIMA", provincia="LIMA", distrito="LIMA",
+                tipo_documento="CARTA", numero_documento=str(i), numero_folios=1, asunto="Benchmark",
+                creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+            )
+            expediente.save()
+            ids.append(Solicitud.objects.create(
+                expediente=expediente, usuario_asignado=usuario, modificado_por=usuario
+            ).id)
+        self.usuario_id = usuario.id
+        return ids
+
+    def _medir(self, alias, ids, procesos, transacciones):
+        contexto = multiprocessing.get_context("fork")
+        salida, inicio = contexto.Queue(), contexto.Event()
+        hijos = [
+            contexto.Process(
+                target=_trabajador, args=(alias, ids, self.usuario_id, transacciones, inicio, salida)
+            )
+            for _ in range(procesos)
+        ]
+        for hijo in hijos:
+            hijo.start()
+        comienzo = time.monotonic()
+        inicio.set()
+        resultados = [salida.get() for _ in hijos]
+        duracion = time.monotonic() - comienzo
+        for hijo in hijos:
+            hijo.join()
+
+        latencias = sorted(latencia for ok, _ in resultados for latencia in ok)
+        return latencias, sum(errores for _, errores in resultados), duracion
+
+    # ----------------------------
+    # Salida
+    # ----------------------------
+    def _imprimir(self, etiqueta, resultado):
+        latencias, errores, duracion = resultado
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{etiqueta}"))
+        self.stdout.write(f"{'confirmadas':<16}{len(latencias):>10}")
+        self.stdout.write(f"{'por segundo':<16}{len(latencias) / duracion:>10.1f}")
+        if latencias:
+            p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+            self.stdout.write(f"{'p50 (ms)':<16}{statistics.median(latencias) * 1000:>10.1f}")
+            self.stdout.write(f"{'p95 (ms)':<16}{p95 * 1000:>10.1f}")
+        estilo = self.style.ERROR if errores else self.style.SUCCESS
+        self.stdout.write(estilo(f"{'bloqueos':<16}{errores:>10}"))
+
+
+def _reiniciar_journal(ruta):
+    # journal_mode=WAL persiste en el archivo: cada perfil parte del modo por defecto
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("PRAGMA journal_mode = DELETE")
+    conexion.close()
+
+
+def _trabajador(alias, ids, usuario_id, transacciones, inicio, salida):
+    """Proceso hijo: `transacciones` escrituras leer -> insertar -> actualizar."""
+    random.seed(os.getpid())
+    latencias, errores = [], 0
+    inicio.wait()
+    for _ in range(transacciones):
+        solicitud_id = random.choice(ids)
+        comienzo = time.monotonic()
+        try:
+            with transaction.atomic(using=alias):
+                # Lectura primero (como la validación de cuotas de una subida)
+                ComentarioSolicitud.objects.using(alias).filter(solicitud_id=solicitud_id).count()
+                ahora = timezone.now()
+                ComentarioSolicitud.objects.using(alias).bulk_create([ComentarioSolicitud(
+                    solicitud_id=solicitud_id, usuario_id=usuario_id, texto="benchmark",
+                    fecha_creacion=ahora, fecha_actualizacion=ahora,
+                )])
+                Solicitud.objects.using(alias).filter(id=solicitud_id).update(fecha_actualizacion=ahora)
+        except OperationalError:
+            errores += 1
+            continue
+        latencias.append(time.monotonic() - comienzo)
+    connections.close_all()
+    salida.put((latencias, errores))
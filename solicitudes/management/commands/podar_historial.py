@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from historial.compacto import registro_de
+from historial.retencion import Podador
+from solicitudes.retencion import ALCANCES, filtro_retencion
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica HISTORIAL_RETENCION: exporta a JSONL comprimido y borra por lotes "
+        "el historial que ya no hace falta conservar completo."
+    )
+
+    def add_arguments(self, parser):
+        config = settings.HISTORIAL_RETENCION
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las versiones a archivar.")
+        parser.add_argument("--modelo", action="append", help="Etiqueta app.Modelo (repetible). Por defecto, todas.")
+        parser.add_argument("--lote", type=int, default=config.get("lote", 500), help="Filas por lote.")
+        parser.add_argument(
+            "--pausa",
+            type=float,
+            default=config.get("pausa", 0.05),
+            help="Segundos de pausa entre lotes (libera el bloqueo de escritura).",
+        )
+        parser.add_argument("--vacuum", action="store_true", help="Compacta la BD al terminar.")
+
+    def handle(self, *args, **options):
+        config = settings.HISTORIAL_RETENCION
+        politicas = config.get("politicas", {})
+        etiquetas = options["modelo"] or list(politicas)
+        desconocidas = [etiqueta for etiqueta in etiquetas if etiqueta not in ALCANCES]
+        if desconocidas:
+            raise CommandError(f"Modelos sin política de retención: {', '.join(desconocidas)}")
+
+        podador = Podador(
+            config["directorio"],
+            lote=options["lote"],
+            pausa=options["pausa"],
+            dry_run=options["dry_run"],
+        )
+
+        total = 0
+        for etiqueta in etiquetas:
+            filtro = filtro_retencion(etiqueta, politicas.get(etiqueta, {}))
+            if filtro is None:
+                continue
+            modelo = ALCANCES[etiqueta][0]
+            if registro_de(modelo) is not None:
+                cantidad = podador.podar_compacto(modelo, filtro, etiqueta)
+            else:
+                cantidad = podador.podar_historico(modelo.history.model, filtro, etiqueta)
+            total += cantidad
+            verbo = "a archivar" if options["dry_run"] else "archivadas"
+            self.stdout.write(f"{etiqueta}: {cantidad} versiones {verbo}.")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {total} versiones en total."))
+            return
+
+        if options["vacuum"] and total:
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+        self.stdout.write(self.style.SUCCESS(f"Archivadas {total} versiones en {config['directorio']}."))
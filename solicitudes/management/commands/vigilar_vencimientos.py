@@ -0,0 +1,52 @@
+import time
+from datetime import datetime
+
+from croniter import croniter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from solicitudes.vencimientos import config_vencimientos, escanear
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca las solicitudes vencidas y encola un aviso por usuario. "
+        "Corre según VENCIMIENTOS['cron'] hasta ser detenido, o una sola vez con --una-vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--una-vez", action="store_true", help="Ejecuta una pasada y termina.")
+        parser.add_argument(
+            "--cron",
+            default=config_vencimientos()["cron"],
+            help="Expresión cron (por defecto VENCIMIENTOS['cron']).",
+        )
+
+    def handle(self, *args, **options):
+        if options["una_vez"]:
+            self._pasada()
+            return
+
+        if not croniter.is_valid(options["cron"]):
+            raise CommandError(f"Expresión cron inválida: {options['cron']}")
+
+        agenda = croniter(options["cron"], timezone.localtime())
+        self.stdout.write(f"Vigilando vencimientos ({options['cron']}).")
+        while True:
+            siguiente = agenda.get_next(datetime)
+            time.sleep(max((siguiente - timezone.localtime()).total_seconds(), 0))
+            # Proceso de larga vida: no reutilizar conexiones caídas o vencidas
+            close_old_connections()
+            try:
+                self._pasada()
+            except Exception as exc:  # una pasada fallida no detiene el vigilante
+                self.stderr.write(f"Error al escanear vencimientos: {exc}")
+            finally:
+                close_old_connections()
+
+    def _pasada(self):
+        marcadas, avisos = escanear()
+        self.stdout.write(
+            f"[{timezone.localtime():%Y-%m-%d %H:%M}] {marcadas} solicitudes vencidas, {avisos} avisos."
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:10
+
+from django.db import migrations
+
+# (índice, tabla histórica, columna del objeto padre): lecturas de la línea de tiempo
+# por (padre, history_date). Los modelos históricos los genera simple_history,
+# así que los índices solo existen en la BD, no en el estado de migraciones.
+INDICES = [
+    ("hist_solicitud_fecha_idx", "solicitudes_historicalsolicitud", "id"),
+    ("hist_comentario_fecha_idx", "solicitudes_historicalcomentariosolicitud", "solicitud_id"),
+    ("hist_anexo_coment_fecha_idx", "solicitudes_historicalcomentariosolicitudarchivoanexo", "comentario_id"),
+    ("hist_usuario_adj_fecha_idx", "solicitudes_historicalusuariosolicitudadjuntado", "solicitud_id"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX IF NOT EXISTS "{nombre}" ON "{tabla}" ("{columna}", "history_date", "history_id")',
+            reverse_sql=f'DROP INDEX IF EXISTS "{nombre}"',
+        )
+        for nombre, tabla, columna in INDICES
+    ]
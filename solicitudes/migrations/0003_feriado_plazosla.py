@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0002_indices_historial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True)),
+                ('descripcion', models.CharField(blank=True, max_length=150)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlazoSLA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(blank=True, choices=[('EN_GESTION_MP', 'En Gestión (Mesa de Partes)'), ('REENVIO_MP', 'Reenvío a Mesa de Partes'), ('ENVIADO_A_AREA', 'Enviado a Área Encargada'), ('EN_TRAMITE_AREA', 'En Trámite (Área)'), ('CERRADO', 'Cerrado')], default='', max_length=20)),
+                ('tipo_documento', models.CharField(blank=True, choices=[('ACTA_SESION_ORDINARIA', 'Acta de Sesión Ordinaria'), ('CARTA', 'Carta'), ('CARTA_MULTIPLE', 'Carta Múltiple'), ('CARTA_NOTARIAL', 'Carta Notarial'), ('CEDULA_NOTIFICACION', 'Cédula de Notificación'), ('DISPOSICION_FISCAL', 'Disposición Fiscal'), ('FACTURA', 'Factura'), ('INFORME_VALORACION', 'Informe de Valoración'), ('INFORME_PERICIAL_PARTE', 'Informe Pericial de Parte'), ('OFICIO', 'Oficio'), ('OFICIO_CIRCULAR', 'Oficio Circular'), ('OFICIO_MULTIPLE', 'Oficio Múltiple'), ('OPINION', 'Opinión'), ('SOLICITUD', 'Solicitud')], default='', max_length=50)),
+                ('dias_habiles', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('estado', 'tipo_documento'), name='plazo_sla_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0004_delete_historicalexpediente'),
+        ('solicitudes', '0003_feriado_plazosla'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvisoVencimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asignadas', models.JSONField(default=list)),
+                ('de_subordinados', models.JSONField(default=list)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='vencida',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(condition=models.Q(('fecha_limite__isnull', False), ('finalizado', False), ('vencida', False)), fields=['fecha_limite'], name='solicitud_por_vencer_idx'),
+        ),
+        migrations.AddField(
+            model_name='avisovencimiento',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avisos_vencimiento', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='avisovencimiento',
+            index=models.Index(fields=['usuario', '-fecha_creacion'], name='solicitudes_usuario_137621_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expedientes', '0005_indice_fecha_actualizacion'),
+        ('solicitudes', '0004_vencimientos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['fecha_actualizacion'], name='solicitudes_fecha_a_aa52e3_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0005_indice_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comentariosolicitud',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='historicalcomentariosolicitud',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, editable=False),
+            preserve_default=False,
+        ),
+    ]
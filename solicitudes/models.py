@@ -1,11 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
-from datetime import timedelta
 from django.utils import timezone
 from expedientes.models import Expediente
 from common.utils.constants.solicitudes.estados import EstadosSolicitud
+from common.utils.constants.expediente.datafields.choices import TIPO_DOCUMENTO_CHOICES
 
-from simple_history.models import HistoricalRecords
+from historial.registros import HistorialOptimizado
+from common.utils.media.rutas import ruta_media
+from .sla import calcular_fecha_limite, estados_sin_plazo
 
 
     
@@ -33,19 +35,55 @@ class Solicitud(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_limite = models.DateTimeField(null=True, blank=True)
     fecha_cierre = models.DateTimeField(null=True, blank=True)
+    # La marca el job de vencimientos (solicitudes.vencimientos); se limpia al recalcular el plazo
+    vencida = models.BooleanField(default=False)
 
-    history = HistoricalRecords()
+    history = HistorialOptimizado(campos_ignorados=["fecha_actualizacion"], excluded_fields=["vencida"])
 
-    def save(self, *args, **kwargs):
-        if not self.fecha_limite:
-            self.fecha_limite = timezone.now() + timedelta(days=2)
-            
-        if self.estado == "REENVIO_MP":
+    class Meta:
+        indexes = [
+            # Índice parcial: solo las que aún pueden vencer. El escaneo lee
+            # únicamente las recién vencidas, no toda la tabla.
+            models.Index(
+                fields=["fecha_limite"],
+                name="solicitud_por_vencer_idx",
+                condition=models.Q(finalizado=False, vencida=False, fecha_limite__isnull=False),
+            ),
+            # Lectura incremental por marca de agua (analitica.resumen)
+            models.Index(fields=["fecha_actualizacion"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Estado guardado: si cambia, el plazo se recalcula desde la transición
+        instancia._estado_guardado = instancia.__dict__.get("estado")
+        # Asignado guardado: al reasignar también se invalida la caché del anterior
+        instancia._asignado_guardado = instancia.__dict__.get("usuario_asignado_id")
+        return instancia
+
+    def aplicar_reglas_fechas(self):
+        """Reglas de fecha_limite / fecha_cierre (también para bulk_update)."""
+        cambio_estado = (
+            not self._state.adding
+            and self.estado != getattr(self, "_estado_guardado", self.estado)
+        )
+        if self.estado in estados_sin_plazo():
             self.fecha_limite = None
+            self.vencida = False
+        elif not self.fecha_limite or cambio_estado:
+            # Días hábiles según estado / tipo de documento (ver solicitudes.sla)
+            self.fecha_limite = calcular_fecha_limite(self.estado, self.expediente.tipo_documento)
+            self.vencida = False
+
         if self.finalizado and not self.fecha_cierre:
             self.fecha_cierre = timezone.now()
 
+    def save(self, *args, **kwargs):
+        self.aplicar_reglas_fechas()
         super().save(*args, **kwargs)
+        self._estado_guardado = self.estado
+        self._asignado_guardado = self.usuario_asignado_id
     def __str__(self):
         return f"{self.usuario_asignado.username}"
 
@@ -53,7 +91,7 @@ class SolicitudArchivoAnexo(models.Model):
     
     def solicitud_anexo_path(instance, filename):
         solicitud = instance.solicitud
-        return f"solicitudes/{solicitud.id}/anexos/{filename}"
+        return ruta_media("solicitudes", solicitud.id, "anexos", filename)
     
     solicitud = models.ForeignKey(
         Solicitud,
@@ -82,7 +120,9 @@ class ComentarioSolicitud(models.Model):
     )
     texto = models.TextField()
     fecha_creacion = models.DateTimeField(auto_now_add=True)
-    history = HistoricalRecords()
+    # Para el validador (ETag) de la solicitud: editar un comentario cambia la respuesta
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    history = HistorialOptimizado(campos_ignorados=["fecha_actualizacion"])
     def __str__(self):
         return f"{self.usuario.username}: {self.texto[:30]}"
 
@@ -91,7 +131,7 @@ class ComentarioSolicitudArchivoAnexo(models.Model):
     def comentario_anexo_path(instance, filename):
         comentario = instance.comentario
         solicitud = comentario.solicitud
-        return f"solicitudes/{solicitud.id}/comentarios/{comentario.id}/{filename}"
+        return ruta_media("solicitudes", solicitud.id, "comentarios", comentario.id, filename)
 
     comentario = models.ForeignKey(
         ComentarioSolicitud,
@@ -102,7 +142,7 @@ class ComentarioSolicitudArchivoAnexo(models.Model):
     descripcion = models.CharField(max_length=200, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
-    history = HistoricalRecords()
+    history = HistorialOptimizado()
 
     def __str__(self):
         return f"{self.descripcion}"
@@ -117,7 +157,56 @@ class UsuarioSolicitudAdjuntado(models.Model):
         User,
         on_delete=models.CASCADE  # ya no SET_NULL
     )
-    history = HistoricalRecords()
+    history = HistorialOptimizado()
     def __str__(self):
         return f"{self.usuario.username}: {self.solicitud}"
 
+
+
+class Feriado(models.Model):
+    """Días no laborables para el cálculo de plazos (además de sábados y domingos)."""
+    fecha = models.DateField(unique=True)
+    descripcion = models.CharField(max_length=150, blank=True)
+
+    def __str__(self):
+        return f"{self.fecha} {self.descripcion}"
+
+
+class PlazoSLA(models.Model):
+    """
+    Días hábiles para atender una solicitud en un estado y/o tipo de documento.
+    Se usa la regla más específica: estado + tipo, solo estado, solo tipo.
+    dias_habiles vacío = sin plazo en ese caso.
+    """
+    # Vacío = cualquiera
+    estado = models.CharField(max_length=20, choices=EstadosSolicitud.CHOICES, blank=True, default="")
+    tipo_documento = models.CharField(max_length=50, choices=TIPO_DOCUMENTO_CHOICES, blank=True, default="")
+    dias_habiles = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["estado", "tipo_documento"], name="plazo_sla_unico"),
+        ]
+
+    def __str__(self):
+        return f"{self.estado or '*'} / {self.tipo_documento or '*'}: {self.dias_habiles}"
+
+
+class AvisoVencimiento(models.Model):
+    """
+    Escalamiento por usuario de una pasada del job de vencimientos:
+    sus solicitudes asignadas que vencieron y las de sus subordinados (como jefe).
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name="avisos_vencimiento")
+    asignadas = models.JSONField(default=list)
+    de_subordinados = models.JSONField(default=list)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "-fecha_creacion"]),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario.username}: {len(self.asignadas) + len(self.de_subordinados)} vencidas"
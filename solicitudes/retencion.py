@@ -0,0 +1,75 @@
+"""
+Políticas de retención del historial ligado a solicitudes.
+
+Las solicitudes abiertas conservan todo su historial. Las cerradas hace más
+de `colapsar_cerradas_meses` se colapsan a su estado final (la solicitud,
+sus comentarios, anexos de comentarios, usuarios adjuntados y su expediente).
+`conservar_meses` (opcional) recorta además cualquier versión más antigua,
+sin tocar nunca la última de cada objeto.
+"""
+import operator
+from functools import reduce
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Q
+from django.utils import timezone
+
+from expedientes.models import Expediente
+from .models import (
+    ComentarioSolicitud,
+    ComentarioSolicitudArchivoAnexo,
+    Solicitud,
+    UsuarioSolicitudAdjuntado,
+)
+
+
+def _solicitudes_cerradas(meses):
+    limite = timezone.now() - relativedelta(months=meses)
+    return Solicitud.objects.filter(finalizado=True, fecha_cierre__lt=limite)
+
+
+# etiqueta -> (modelo, función(cerradas) -> Q sobre sus filas de historial, campo de fecha)
+ALCANCES = {
+    "solicitudes.Solicitud": (
+        Solicitud,
+        lambda cerradas: Q(id__in=cerradas.values("id")),
+        "history_date",
+    ),
+    "solicitudes.ComentarioSolicitud": (
+        ComentarioSolicitud,
+        lambda cerradas: Q(solicitud_id__in=cerradas.values("id")),
+        "history_date",
+    ),
+    "solicitudes.ComentarioSolicitudArchivoAnexo": (
+        ComentarioSolicitudArchivoAnexo,
+        lambda cerradas: Q(
+            comentario_id__in=ComentarioSolicitud.history.filter(
+                solicitud_id__in=cerradas.values("id")
+            ).values("id")
+        ),
+        "history_date",
+    ),
+    "solicitudes.UsuarioSolicitudAdjuntado": (
+        UsuarioSolicitudAdjuntado,
+        lambda cerradas: Q(solicitud_id__in=cerradas.values("id")),
+        "history_date",
+    ),
+    # Historial compacto (VersionCompacta)
+    "expedientes.Expediente": (
+        Expediente,
+        lambda cerradas: Q(objeto_id__in=cerradas.values("expediente_id")),
+        "fecha",
+    ),
+}
+
+
+def filtro_retencion(etiqueta, politica):
+    """Q de las versiones candidatas a archivar según la política, o None si no aplica."""
+    _, alcance, campo_fecha = ALCANCES[etiqueta]
+    filtros = []
+    if politica.get("colapsar_cerradas_meses") is not None:
+        filtros.append(alcance(_solicitudes_cerradas(politica["colapsar_cerradas_meses"])))
+    if politica.get("conservar_meses") is not None:
+        limite = timezone.now() - relativedelta(months=politica["conservar_meses"])
+        filtros.append(Q(**{f"{campo_fecha}__lt": limite}))
+    return reduce(operator.or_, filtros) if filtros else None
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from usuarios.serializers import UsuarioSerializer
 from expedientes.serializers import ExpedienteMiniSerializer
-from .models import Expediente, Solicitud, ComentarioSolicitud,SolicitudArchivoAnexo,ComentarioSolicitudArchivoAnexo,UsuarioSolicitudAdjuntado
+from .models import Expediente, Solicitud, ComentarioSolicitud,SolicitudArchivoAnexo,ComentarioSolicitudArchivoAnexo,UsuarioSolicitudAdjuntado, Feriado, PlazoSLA
 from django.contrib.auth.models import User
+from common.utils.constants.solicitudes.estados import EstadosSolicitud
 
 
 class SolicitudArchivoAnexoSerializer(serializers.ModelSerializer):
@@ -121,6 +122,68 @@ class SolicitudWriteSerializer(serializers.ModelSerializer):
 
         return attrs
 
+class OperacionMasivaSerializer(serializers.Serializer):
+    """
+    Entrada de /solicitudes/operaciones-masivas/:
+    - reasignar:          requiere `usuario_asignado`
+    - cambiar_estado:     requiere `estado`
+    - adjuntar_usuarios:  requiere `usuarios_adjuntados`
+    """
+    OPERACIONES = ["reasignar", "cambiar_estado", "adjuntar_usuarios"]
+    MAX_IDS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=MAX_IDS
+    )
+    operacion = serializers.ChoiceField(choices=OPERACIONES)
+    usuario_asignado = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(),
+        required=False
+    )
+    estado = serializers.ChoiceField(
+        choices=EstadosSolicitud.TODOS,
+        required=False
+    )
+    usuarios_adjuntados = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False
+    )
+
+    CAMPO_POR_OPERACION = {
+        "reasignar": "usuario_asignado",
+        "cambiar_estado": "estado",
+        "adjuntar_usuarios": "usuarios_adjuntados",
+    }
+
+    def validate(self, attrs):
+        campo = self.CAMPO_POR_OPERACION[attrs["operacion"]]
+        if attrs.get(campo) in (None, []):
+            raise serializers.ValidationError(
+                {campo: f"Este campo es obligatorio para la operación '{attrs['operacion']}'."}
+            )
+
+        if campo == "usuarios_adjuntados":
+            uids = set(attrs[campo])
+            existentes = set(User.objects.filter(id__in=uids).values_list("id", flat=True))
+            if uids - existentes:
+                raise serializers.ValidationError(
+                    {campo: f"Usuarios inexistentes: {sorted(uids - existentes)}"}
+                )
+
+        # Un mismo id repetido se procesa una sola vez
+        attrs["ids"] = list(dict.fromkeys(attrs["ids"]))
+        return attrs
+
+    def datos_equivalentes(self):
+        """Payload de PATCH equivalente, para evaluar las políticas de rol."""
+        campo = self.CAMPO_POR_OPERACION[self.validated_data["operacion"]]
+        valor = self.initial_data.get(campo)
+        return {campo: valor}
+
+
 class SolicitudReadSerializer(serializers.ModelSerializer):
     
     usuarios_adjuntados = UsuarioSolicitudAdjuntadoSerializer(
@@ -170,4 +233,19 @@ class ResumenSolicitudSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Solicitud
-        fields = ['expediente_id_publico', 'id_solicitud', 'id_expediente']
\ No newline at end of file
+        fields = ['expediente_id_publico', 'id_solicitud', 'id_expediente']
+
+
+# ================================================
+# 📅 CALENDARIO Y PLAZOS (SLA)
+# ================================================
+class FeriadoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Feriado
+        fields = ["id", "fecha", "descripcion"]
+
+
+class PlazoSLASerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlazoSLA
+        fields = ["id", "estado", "tipo_documento", "dias_habiles"]
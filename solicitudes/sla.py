@@ -0,0 +1,118 @@
+"""
+Plazos (SLA) en días hábiles.
+
+Los feriados y los PlazoSLA se cargan una vez en memoria: el calendario se
+precalcula como un arreglo ordenado de días hábiles (CalendarioLaboral) y
+sumar N días es un bisect. La caché se invalida al guardar/borrar un Feriado
+o PlazoSLA en este proceso y, en los demás, al vencer su TTL.
+"""
+import threading
+import time
+from datetime import date, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from common.utils.calendario.laboral import CalendarioLaboral
+
+CONFIG_DEFECTO = {
+    "zona_horaria": "America/Lima",
+    "dias_defecto": 2,
+    "estados_sin_plazo": ["REENVIO_MP"],
+    "laborables": [0, 1, 2, 3, 4],
+    "anios_atras": 1,
+    "anios_adelante": 3,
+    "ttl": 300,
+}
+
+# Tope de la ventana del calendario puntual (~100 años): solo se alcanza si
+# la configuración deja casi sin días hábiles
+MAX_VENTANA_DIAS = 36500
+
+_cache = {"calendario": None, "plazos": None, "vence": 0}
+_lock = threading.Lock()
+
+
+def config_sla():
+    return {**CONFIG_DEFECTO, **getattr(settings, "SLA", {})}
+
+
+def invalidar(**kwargs):
+    """Receptor de post_save / post_delete de Feriado y PlazoSLA."""
+    with _lock:
+        _cache["vence"] = 0
+
+
+def _construir_calendario(desde, hasta, config):
+    from .models import Feriado
+
+    feriados = Feriado.objects.filter(fecha__range=(desde, hasta)).values_list("fecha", flat=True)
+    return CalendarioLaboral(desde, hasta, feriados, config["laborables"])
+
+
+def _vigente(config):
+    with _lock:
+        if _cache["vence"] < time.monotonic():
+            from .models import PlazoSLA
+
+            hoy = timezone.localdate(timezone=ZoneInfo(config["zona_horaria"]))
+            _cache["calendario"] = _construir_calendario(
+                date(hoy.year - config["anios_atras"], 1, 1),
+                date(hoy.year + config["anios_adelante"], 12, 31),
+                config,
+            )
+            _cache["plazos"] = {
+                (plazo.estado, plazo.tipo_documento): plazo.dias_habiles
+                for plazo in PlazoSLA.objects.all()
+            }
+            _cache["vence"] = time.monotonic() + config["ttl"]
+        return _cache["calendario"], _cache["plazos"]
+
+
+def estados_sin_plazo():
+    return config_sla()["estados_sin_plazo"]
+
+
+def dias_de_plazo(estado, tipo_documento):
+    """Regla más específica: (estado, tipo), (estado, *), (*, tipo); si no, dias_defecto."""
+    config = config_sla()
+    if estado in config["estados_sin_plazo"]:
+        return None
+    _, plazos = _vigente(config)
+    for clave in ((estado, tipo_documento), (estado, ""), ("", tipo_documento)):
+        if clave in plazos:
+            return plazos[clave]
+    return config["dias_defecto"]
+
+
+def calcular_fecha_limite(estado, tipo_documento, desde=None):
+    """Fecha límite al entrar en `estado` en el momento `desde` (ahora por defecto)."""
+    dias = dias_de_plazo(estado, tipo_documento)
+    if dias is None:
+        return None
+
+    config = config_sla()
+    calendario, _ = _vigente(config)
+    inicio = timezone.localtime(desde or timezone.now(), ZoneInfo(config["zona_horaria"]))
+    if calendario.cubre(inicio.date()):
+        try:
+            return calendario.sumar_dias_habiles(inicio, dias)
+        except ValueError:
+            pass
+
+    # Fuera del rango precalculado (fechas muy antiguas o lejanas): calendario
+    # puntual. La ventana parte de las semanas que hacen falta con los días
+    # laborables configurados y se duplica mientras los feriados no dejen sitio
+    if not config["laborables"]:
+        raise ImproperlyConfigured("SLA['laborables'] debe incluir al menos un día de la semana.")
+    ventana = -(-dias * 7 // len(set(config["laborables"]))) + 60
+    while True:
+        calendario = _construir_calendario(inicio.date(), inicio.date() + timedelta(days=ventana), config)
+        try:
+            return calendario.sumar_dias_habiles(inicio, dias)
+        except ValueError:
+            if ventana > MAX_VENTANA_DIAS:
+                raise
+            ventana *= 2
@@ -1,3 +1,311 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.utils.calendario.laboral import CalendarioLaboral
+from common.utils.media.preparacion import ArchivosPreparados
+from expedientes.models import Expediente
+
+from .actividad import codificar_cursor, decodificar_cursor, linea_de_tiempo
+from . import sla
+from .eventos import avisar_reasignaciones
+from .models import ComentarioSolicitud, Solicitud, SolicitudArchivoAnexo, UsuarioSolicitudAdjuntado
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def crear_solicitud(usuario, **kwargs):
+    expediente = Expediente(
+        tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Solicitud",
+        telefono="999999999", correo="solicitud@example.com",
+        departamento="LIMA", provincia="LIMA", distrito="LIMA",
+        tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="Prueba",
+        creado_por=usuario, archivo_principal=ContentFile(b"%PDF-1.4", name="principal.pdf"),
+    )
+    expediente.save()
+    return Solicitud.objects.create(
+        expediente=expediente, usuario_asignado=usuario, modificado_por=usuario, **kwargs
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class CacheListadosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username="asignado")
+        crear_solicitud(self.usuario)
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def test_sin_cache_compartida_no_se_cachea(self):
+        for _ in range(2):
+            response = self.client.get("/api/solicitudes/asignadas/")
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Cache", response)
+
+    @mock.patch("common.utils.cache.respuestas.cache_compartida", return_value=True)
+    def test_con_cache_compartida_se_cachea(self, _):
+        primera = self.client.get("/api/solicitudes/asignadas/")
+        segunda = self.client.get("/api/solicitudes/asignadas/")
+        self.assertEqual(primera["X-Cache"], "MISS")
+        self.assertEqual(segunda["X-Cache"], "HIT")
+        self.assertEqual(primera.json(), segunda.json())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_superuser(username="admin")
+        self.solicitudes = [crear_solicitud(self.usuario) for _ in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def get(self, url, etag=None):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag) if etag else self.client.get(url)
+
+    def test_304_mientras_la_pagina_no_cambie(self):
+        url = "/api/solicitudes/?limit=2"
+        primera = self.get(url)
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(self.get(url, primera["ETag"]).status_code, 304)
+
+        # Un comentario en una solicitud de la página cambia el validador
+        pagina = [fila["id"] for fila in primera.json()["results"]]
+        ComentarioSolicitud.objects.create(solicitud_id=pagina[0], usuario=self.usuario, texto="nuevo")
+        segunda = self.get(url, primera["ETag"])
+        self.assertEqual(segunda.status_code, 200)
+        self.assertNotEqual(segunda["ETag"], primera["ETag"])
+
+    def test_cambios_fuera_de_la_pagina(self):
+        url = "/api/solicitudes/?limit=1"
+        primera = self.get(url)
+        (visible,) = [fila["id"] for fila in primera.json()["results"]]
+        fuera = next(s for s in self.solicitudes if s.id != visible)
+        ComentarioSolicitud.objects.create(solicitud=fuera, usuario=self.usuario, texto="otra página")
+        self.assertEqual(self.get(url, primera["ETag"]).status_code, 304)
+
+        # Una solicitud nueva cambia el total (count / next) aunque no entre en la página
+        crear_solicitud(self.usuario)
+        self.assertEqual(self.get(url, primera["ETag"]).status_code, 200)
+
+    def test_if_modified_since_no_basta(self):
+        # Un borrado o una fila que sale de la página no mueven ninguna fecha:
+        # sin ETag se responde completo y no se envía Last-Modified
+        url = "/api/solicitudes/?limit=2"
+        primera = self.get(url)
+        self.assertNotIn("Last-Modified", primera)
+        comentario = ComentarioSolicitud.objects.create(
+            solicitud=self.solicitudes[0], usuario=self.usuario, texto="se borrará"
+        )
+        despues = "Tue, 01 Jan 2999 00:00:00 GMT"
+        detalle = f"/api/solicitudes/{self.solicitudes[0].id}/"
+        self.assertNotIn("Last-Modified", self.get(detalle))
+        comentario.delete()
+        for ruta in (url, detalle):
+            response = self.client.get(ruta, HTTP_IF_MODIFIED_SINCE=despues)
+            self.assertEqual(response.status_code, 200, ruta)
+
+
+class CalendarioLaboralTests(SimpleTestCase):
+    def setUp(self):
+        # Enero 2024: el 1 es lunes; feriados el 1 y el lunes 8
+        self.calendario = CalendarioLaboral(
+            date(2024, 1, 1), date(2024, 1, 31), feriados=[date(2024, 1, 1), date(2024, 1, 8)]
+        )
+
+    def test_es_habil(self):
+        self.assertFalse(self.calendario.es_habil(date(2024, 1, 1)))  # feriado
+        self.assertTrue(self.calendario.es_habil(date(2024, 1, 2)))
+        self.assertFalse(self.calendario.es_habil(date(2024, 1, 6)))  # sábado
+        self.assertTrue(self.calendario.cubre(date(2024, 1, 31)))
+        self.assertFalse(self.calendario.cubre(date(2024, 2, 1)))
+
+    def test_sumar_salta_fin_de_semana_y_feriados(self):
+        viernes = datetime(2024, 1, 5, 10, 30)
+        self.assertEqual(self.calendario.sumar_dias_habiles(viernes, 1), datetime(2024, 1, 9, 10, 30))
+        self.assertEqual(self.calendario.sumar_dias_habiles(date(2024, 1, 6), 1), date(2024, 1, 9))
+        self.assertEqual(self.calendario.sumar_dias_habiles(date(2024, 1, 2), 3), date(2024, 1, 5))
+        self.assertEqual(self.calendario.sumar_dias_habiles(viernes, 0), viernes)
+
+    def test_fuera_del_rango(self):
+        with self.assertRaises(ValueError):
+            self.calendario.sumar_dias_habiles(date(2024, 1, 30), 5)
+
+    def test_dias_habiles_entre(self):
+        # (1, 12]: del 2 al 5 y del 9 al 12
+        self.assertEqual(self.calendario.dias_habiles_entre(date(2024, 1, 1), date(2024, 1, 12)), 8)
+        self.assertEqual(self.calendario.dias_habiles_entre(date(2024, 1, 12), date(2024, 1, 1)), 0)
+
+
+class CursorActividadTests(SimpleTestCase):
+    def test_ida_y_vuelta(self):
+        clave = (timezone.now(), 2, 15)
+        self.assertEqual(decodificar_cursor(codificar_cursor(clave)), clave)
+        self.assertIsNone(decodificar_cursor(""))
+
+    def test_cursor_invalido(self):
+        for cursor in ("no-es-base64", codificar_cursor((timezone.now(), 1, 1))[:-4] + "AAAA", "YQ=="):
+            with self.assertRaises(ValueError):
+                decodificar_cursor(cursor)
+
+
+@override_settings(HISTORIAL={"modo": "sincrono"}, MEDIA_ROOT=MEDIA_TEMPORAL)
+class LineaDeTiempoTests(TestCase):
+    def setUp(self):
+        usuario = User.objects.create_user(username="autor")
+        self.solicitud = crear_solicitud(usuario)
+        # Eventos de varias fuentes en el mismo instante: el cursor debe desempatarlos
+        momento = timezone.now()
+        for i in range(3):
+            comentario = ComentarioSolicitud(solicitud=self.solicitud, usuario=usuario, texto=f"c{i}")
+            comentario._history_date = momento
+            comentario.save()
+        for estado in ("ENVIADO_A_AREA", "EN_TRAMITE_AREA"):
+            self.solicitud.estado = estado
+            self.solicitud._history_date = momento
+            self.solicitud.save()
+        adjuntado = UsuarioSolicitudAdjuntado(
+            solicitud=self.solicitud, usuario=User.objects.create_user(username="adjuntado")
+        )
+        adjuntado._history_date = momento
+        adjuntado.save()
+
+    def claves(self, eventos):
+        return [(e["fuente"], e["objeto_id"], e["fecha"], e["tipo"], repr(e["cambios"])) for e in eventos]
+
+    def recorrer(self, limite, descendente):
+        eventos, siguiente = [], None
+        while True:
+            pagina, siguiente = linea_de_tiempo(
+                self.solicitud.id, cursor=decodificar_cursor(siguiente), limite=limite, descendente=descendente
+            )
+            eventos.extend(pagina)
+            if siguiente is None:
+                return self.claves(eventos)
+
+    def test_paginas_sin_huecos_ni_repetidos(self):
+        completo = self.claves(linea_de_tiempo(self.solicitud.id, limite=100, descendente=False)[0])
+        self.assertEqual(len(completo), 7)  # 3 de la solicitud, 3 comentarios, 1 adjuntado
+        for limite in (1, 2, 3):
+            self.assertEqual(self.recorrer(limite, descendente=False), completo)
+            self.assertEqual(self.recorrer(limite, descendente=True), completo[::-1])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class ArchivosPreparadosTests(TestCase):
+    def test_un_fallo_al_preparar_elimina_lo_ya_escrito(self):
+        preparados = ArchivosPreparados()
+        guardar = default_storage.save
+        nombres = []
+
+        def falla_en_el_segundo(nombre, *args, **kwargs):
+            if nombres:
+                raise OSError("disco lleno")
+            nombres.append(guardar(nombre, *args, **kwargs))
+            return nombres[-1]
+
+        with mock.patch.object(default_storage, "save", side_effect=falla_en_el_segundo):
+            with self.assertRaises(OSError), preparados.preparando():
+                for numero in range(2):
+                    preparados.guardar(
+                        SolicitudArchivoAnexo(descripcion=""),
+                        "archivo_anexo",
+                        ContentFile(b"%PDF-1.4"),
+                        ruta=f"pruebas/anexo{numero}.pdf",
+                    )
+        self.assertEqual(len(nombres), 1)
+        self.assertFalse(default_storage.exists(nombres[0]))
+
+    def test_actualizar_guarda_la_solicitud_una_vez(self):
+        usuario = User.objects.create_superuser(username="admin")
+        solicitud = crear_solicitud(usuario)
+        cliente = APIClient()
+        cliente.force_authenticate(usuario)
+        guardadas = []
+
+        def receptor(sender, instance, **kwargs):
+            guardadas.append(instance.pk)
+
+        post_save.connect(receptor, sender=Solicitud)
+        self.addCleanup(post_save.disconnect, receptor, sender=Solicitud)
+        response = cliente.patch(f"/api/solicitudes/{solicitud.id}/", {"estado": "ENVIADO_A_AREA"})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(guardadas, [solicitud.id])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class OperacionesMasivasTests(TestCase):
+    def setUp(self):
+        grupo = Group.objects.create(name="Encargado de Área")
+        grupo.permissions.set(Permission.objects.filter(codename__in=["view_solicitud", "change_solicitud"]))
+        self.encargado = User.objects.create_user(username="encargado")
+        self.encargado.groups.add(grupo)
+        self.propia = crear_solicitud(self.encargado, estado="ENVIADO_A_AREA")
+        self.ajena = crear_solicitud(User.objects.create_user(username="otro"), estado="ENVIADO_A_AREA")
+        self.client = APIClient()
+        self.client.force_authenticate(self.encargado)
+
+    def test_resultado_por_fila(self):
+        inexistente = self.ajena.id + 1000
+        response = self.client.post("/api/solicitudes/operaciones-masivas/", {
+            "operacion": "cambiar_estado",
+            "estado": "EN_TRAMITE_AREA",
+            "ids": [self.propia.id, self.ajena.id, inexistente],
+        }, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        datos = response.json()
+        self.assertEqual((datos["aplicadas"], datos["rechazadas"]), (1, 2))
+        resultados = {fila["id"]: fila for fila in datos["resultados"]}
+        self.assertTrue(resultados[self.propia.id]["ok"])
+        self.assertFalse(resultados[self.ajena.id]["ok"])
+        self.assertIn("usuario asignado", resultados[self.ajena.id]["detalle"])
+        self.assertEqual(resultados[inexistente], {"id": inexistente, "ok": False, "detalle": "La solicitud no existe."})
+
+        self.propia.refresh_from_db()
+        self.ajena.refresh_from_db()
+        self.assertEqual((self.propia.estado, self.ajena.estado), ("EN_TRAMITE_AREA", "ENVIADO_A_AREA"))
+
+
+class AvisarReasignacionesTests(SimpleTestCase):
+    def avisos(self, asignado, anterior):
+        solicitud = SimpleNamespace(pk=1, estado="EN_GESTION_MP", usuario_asignado_id=asignado, _asignado_guardado=anterior)
+        with mock.patch("solicitudes.eventos.publicar") as publicar:
+            avisar_reasignaciones([solicitud])
+        return [(llamada.args[0], llamada.args[1]) for llamada in publicar.call_args_list]
+
+    def test_reasignar(self):
+        self.assertEqual(self.avisos(7, 5), [("usuario:7", "asignacion"), ("usuario:5", "desasignacion")])
+
+    def test_desasignar_no_publica_a_nadie_mas(self):
+        self.assertEqual(self.avisos(None, 5), [("usuario:5", "desasignacion")])
+        self.assertEqual(self.avisos(5, 5), [])
+
+
+class FechaLimiteFueraDeRangoTests(TestCase):
+    def setUp(self):
+        sla.invalidar()
+        self.addCleanup(sla.invalidar)
+
+    @override_settings(SLA={"laborables": [6], "dias_defecto": 20})
+    def test_laborables_escasos(self):
+        # Solo domingos y fuera del rango precalculado: 20 domingos caen ~140 días después
+        desde = timezone.make_aware(datetime(2100, 1, 4, 9, 0))  # lunes
+        limite = sla.calcular_fecha_limite("EN_GESTION_MP", "CARTA", desde=desde)
+        self.assertEqual(limite.weekday(), 6)
+        self.assertEqual((limite.date() - desde.date()).days, 6 + 19 * 7)
+
+    @override_settings(SLA={"laborables": [], "dias_defecto": 2})
+    def test_sin_laborables(self):
+        with self.assertRaises(ImproperlyConfigured):
+            sla.calcular_fecha_limite("EN_GESTION_MP", "CARTA", desde=timezone.now())
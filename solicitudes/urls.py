@@ -4,16 +4,28 @@ from django.urls import path, include
 from .views import (
     SolicitudViewSet, 
     ComentarioSolicitudViewSet, 
+    FeriadoViewSet,
+    PlazoSLAViewSet,
 )
+from . import views_async
 
 router = DefaultRouter()
 
 router.register(r"solicitudes", SolicitudViewSet, basename="solicitudes")
 router.register(r"comentarios-solicitud", ComentarioSolicitudViewSet, basename="comentarios-solicitud")
+router.register(r"feriados", FeriadoViewSet, basename="feriados")
+router.register(r"plazos-sla", PlazoSLAViewSet, basename="plazos-sla")
 
 # --- ERROR ANTERIOR ---
 # router.register(r"pendientes", MisSolicitudesView.as_view(), basename="pendientes")  <-- ESTO ESTABA MAL
 
 urlpatterns = [
+    # ⚡ Lectura async (perfil ASGI): mismos listados que las acciones del ViewSet
+    path("async/solicitudes/asignadas/", views_async.asignadas, name="solicitudes-asignadas-async"),
+    path("async/solicitudes/creadas/", views_async.creadas, name="solicitudes-creadas-async"),
+    path("async/solicitudes/mi-area/", views_async.mi_area, name="solicitudes-mi-area-async"),
+    path("async/solicitudes/adjuntadas/", views_async.adjuntadas, name="solicitudes-adjuntadas-async"),
+    # 📡 Avisos en vivo (SSE) del usuario autenticado
+    path("async/eventos/", views_async.eventos, name="eventos"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
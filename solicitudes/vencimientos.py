@@ -0,0 +1,135 @@
+"""
+Vencimientos: marca las solicitudes no finalizadas cuya fecha_limite ya pasó
+y encola un aviso agrupado por usuario (el asignado y su jefe).
+
+El escaneo va por el índice parcial `solicitud_por_vencer_idx` (finalizado=False,
+vencida=False): como las ya marcadas salen del índice, cada pasada solo lee las
+recién vencidas y su costo no depende del tamaño de la tabla.
+"""
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mass_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AvisoVencimiento, Solicitud
+
+CONFIG_DEFECTO = {
+    "cron": "*/15 * * * *",
+    "lote": 500,
+    "pausa": 0.0,
+    "enviar_correo": False,
+}
+
+
+def config_vencimientos():
+    return {**CONFIG_DEFECTO, **getattr(settings, "VENCIMIENTOS", {})}
+
+
+def _por_vencer(ahora):
+    # Mismo predicado que el índice parcial, para que el planificador lo use
+    return Solicitud.objects.filter(
+        finalizado=False,
+        vencida=False,
+        fecha_limite__isnull=False,
+        fecha_limite__lt=ahora,
+    )
+
+
+def marcar_vencidas(ahora=None, lote=None, pausa=None):
+    """
+    Marca por lotes. Devuelve (marcadas, avisos) con
+    avisos = {usuario_id: {"asignadas": [...], "de_subordinados": [...]}}.
+    Cada lote es una transacción corta; entre lotes no se retiene el bloqueo.
+    """
+    config = config_vencimientos()
+    ahora = ahora or timezone.now()
+    lote = lote or config["lote"]
+    pausa = config["pausa"] if pausa is None else pausa
+
+    avisos = defaultdict(lambda: {"asignadas": [], "de_subordinados": []})
+    marcadas = 0
+    siguiente = Q()
+    while True:
+        # Keyset sobre (fecha_limite, id): recorre el índice parcial en orden
+        filas = list(
+            _por_vencer(ahora)
+            .filter(siguiente)
+            .order_by("fecha_limite", "id")
+            .values_list(
+                "id",
+                "fecha_limite",
+                "usuario_asignado_id",
+                "usuario_asignado__perfilusuario__jefe__user_id",
+            )[:lote]
+        )
+        if not filas:
+            break
+
+        ids = [fila[0] for fila in filas]
+        with transaction.atomic():
+            # Se repite el predicado: si la solicitud cambió de estado entretanto, no se marca
+            marcadas += _por_vencer(ahora).filter(id__in=ids).update(vencida=True)
+
+        for solicitud_id, _, asignado_id, jefe_id in filas:
+            if asignado_id:
+                avisos[asignado_id]["asignadas"].append(solicitud_id)
+            if jefe_id and jefe_id != asignado_id:
+                avisos[jefe_id]["de_subordinados"].append(solicitud_id)
+
+        ultimo_id, ultima_fecha = filas[-1][:2]
+        siguiente = Q(fecha_limite__gt=ultima_fecha) | Q(fecha_limite=ultima_fecha, id__gt=ultimo_id)
+        if pausa:
+            time.sleep(pausa)
+    return marcadas, dict(avisos)
+
+
+def encolar_avisos(avisos):
+    """Un AvisoVencimiento por usuario (un solo INSERT)."""
+    return AvisoVencimiento.objects.bulk_create([
+        AvisoVencimiento(usuario_id=usuario_id, **listas)
+        for usuario_id, listas in avisos.items()
+    ])
+
+
+def enviar_avisos(avisos_encolados):
+    """Envía los avisos pendientes por correo (una sola conexión SMTP)."""
+    pendientes = (
+        AvisoVencimiento.objects.filter(
+            id__in=[aviso.id for aviso in avisos_encolados],
+            fecha_envio__isnull=True,
+        )
+        .exclude(usuario__email="")
+        .select_related("usuario")
+    )
+    mensajes, enviados = [], []
+    for aviso in pendientes:
+        lineas = []
+        if aviso.asignadas:
+            lineas.append(f"Solicitudes asignadas vencidas: {', '.join(map(str, aviso.asignadas))}")
+        if aviso.de_subordinados:
+            lineas.append(f"Solicitudes vencidas de su equipo: {', '.join(map(str, aviso.de_subordinados))}")
+        mensajes.append((
+            "Mesa de partes: solicitudes vencidas",
+            "\n".join(lineas),
+            None,  # DEFAULT_FROM_EMAIL
+            [aviso.usuario.email],
+        ))
+        enviados.append(aviso.id)
+
+    if mensajes:
+        send_mass_mail(mensajes, connection=get_connection())
+        AvisoVencimiento.objects.filter(id__in=enviados).update(fecha_envio=timezone.now())
+    return len(enviados)
+
+
+def escanear(ahora=None):
+    """Una pasada completa: marcar, encolar y (opcional) enviar. Devuelve (marcadas, avisos)."""
+    marcadas, avisos = marcar_vencidas(ahora)
+    encolados = encolar_avisos(avisos) if avisos else []
+    if encolados and config_vencimientos()["enviar_correo"]:
+        enviar_avisos(encolados)
+    return marcadas, len(encolados)
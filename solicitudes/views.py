@@ -4,11 +4,13 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from .models import  Solicitud, ComentarioSolicitud, SolicitudArchivoAnexo,ComentarioSolicitudArchivoAnexo,UsuarioSolicitudAdjuntado
+from .models import  Solicitud, ComentarioSolicitud, SolicitudArchivoAnexo,ComentarioSolicitudArchivoAnexo,UsuarioSolicitudAdjuntado, Feriado, PlazoSLA
 from .serializers import (
     
     ComentarioSolicitudSerializer,
-    SolicitudReadSerializer,SolicitudWriteSerializer
+    SolicitudReadSerializer,SolicitudWriteSerializer,
+    OperacionMasivaSerializer,
+    FeriadoSerializer, PlazoSLASerializer,
 )
 from rest_framework.exceptions import ValidationError
 from .permissions.django_permissions_coment import DjangoModelPermissionsConMensaje
@@ -21,10 +23,39 @@ from .permissions.rol.solicitud.supervisor_mesa_de_partes import (
     SupervisorMesaDePartesSolicitudPermission,
 )
 from .permissions.rol.comentario_solicitud.general_permission import (ComentarioSolicitudPermission)
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+from types import SimpleNamespace
 from django.db import transaction
-
-class SolicitudViewSet(viewsets.ModelViewSet):
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.utils.urls import replace_query_param
+from .actividad import decodificar_cursor, linea_de_tiempo
+from uuid import uuid4
+from common.utils.media.preparacion import ArchivosPreparados
+from common.utils.media.normalizacion import programar_normalizacion
+from common.utils.media.rutas import ruta_media
+from common.utils.media.uso import cargar_archivos
+from common.utils.media.validacion import ValidacionAnexosMixin
+from common.utils.streaming.exportacion import ExportacionMixin
+from common.utils.streaming.listado import ListadoStreamingMixin
+from common.utils.cache.condicional import GetCondicionalMixin
+from common.utils.cache.respuestas import CacheRespuestaMixin
+from .cache import espacio_area, espacio_usuario, tocar_solicitudes
+from .eventos import avisar_adjuntados, avisar_reasignaciones
+
+class SolicitudViewSet(
+    GetCondicionalMixin,
+    CacheRespuestaMixin,
+    ListadoStreamingMixin,
+    ExportacionMixin,
+    ValidacionAnexosMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Solicitud.objects.all().order_by("-fecha_creacion")
+    # 📎 Validación de anexos mientras se suben (tamaño, tipo y cuotas)
+    politicas_anexos = {"archivos_anexados": "solicitudes.SolicitudArchivoAnexo"}
+
     # 🔍 Búsqueda
     search_fields = ["expediente__id_publico"]
 
@@ -35,6 +66,55 @@ class SolicitudViewSet(viewsets.ModelViewSet):
     ordering_fields = ["fecha_creacion"]
     ordering = ["-fecha_creacion"]
 
+    # 📤 Exportación CSV / XLSX (GET /api/solicitudes/exportar/?formato=csv|xlsx)
+    nombre_exportacion = "solicitudes"
+    columnas_exportacion = [
+        ("ID", "id"),
+        ("Expediente", "expediente__id_publico"),
+        ("Tipo de documento", "expediente__tipo_documento"),
+        ("Asunto", "expediente__asunto"),
+        ("Estado", "estado"),
+        ("Finalizado", "finalizado"),
+        ("Vencida", "vencida"),
+        ("Asignado a", "usuario_asignado__username"),
+        ("Área", "usuario_asignado__perfilusuario__area__nombre"),
+        ("Modificado por", "modificado_por__username"),
+        ("Fecha de creación", "fecha_creacion"),
+        ("Fecha límite", "fecha_limite"),
+        ("Fecha de cierre", "fecha_cierre"),
+    ]
+
+    # 🏷️ GET condicional (ETag / Last-Modified): lo que cambia SolicitudReadSerializer
+    validador_fechas = [
+        "fecha_actualizacion",
+        "expediente__fecha_actualizacion",
+        "solicitud_archivo_anexo__fecha_creacion",
+        "comentarios_solicitud__fecha_actualizacion",
+        "comentarios_solicitud__comentario_solicitud__fecha_creacion",
+    ]
+    validador_conteos = [
+        "solicitud_archivo_anexo",
+        "comentarios_solicitud",
+        "comentarios_solicitud__comentario_solicitud",
+        "usuario_solicitud_adjuntado",
+    ]
+
+    # 🗄️ Caché de los listados personales (versiones por usuario / área, ver solicitudes.cache)
+    cache_acciones = ("asignadas", "creadas", "mi_area", "adjuntadas")
+    # Cambian con cada asignación / comentario: con LocMem (una caché por worker)
+    # otro worker serviría datos viejos hasta el timeout. Solo con REDIS_URL
+    cache_solo_compartida = True
+
+    def espacios_cache(self):
+        usuario = self.request.user
+        if self.action == "mi_area":
+            perfil = getattr(usuario, "perfilusuario", None)
+            if not perfil or not perfil.area_id:
+                return None
+            # PerfilUsuario: altas / bajas de miembros del área
+            return [espacio_area(perfil.area_id), "usuarios.PerfilUsuario", "auth.User"]
+        return [espacio_usuario(usuario.id), "auth.User"]
+
     def get_permissions(self):
         user = self.request.user
 
@@ -62,9 +142,17 @@ class SolicitudViewSet(viewsets.ModelViewSet):
             DjangoModelPermissionsConMensaje(),
         ]
 
+    def expediente_de_anexos(self):
+        pk = self.kwargs.get("pk")
+        if not pk:
+            return None
+        return Solicitud.objects.filter(pk=pk).values_list("expediente_id", flat=True).first()
+
     def get_serializer_class(self):
-        if self.action in ["list", "retrieve", "asignadas", "creadas", "mi_area","adjuntadas"]:
+        if self.action in ["list", "retrieve", "asignadas", "creadas", "mi_area","adjuntadas", "vencidas"]:
             return SolicitudReadSerializer
+        if self.action == "operaciones_masivas":
+            return OperacionMasivaSerializer
         return SolicitudWriteSerializer
 
     # --------------------------------------------------------------------
@@ -102,7 +190,6 @@ class SolicitudViewSet(viewsets.ModelViewSet):
     # --------------------------------------------------------------------
     # ACTUALIZAR SOLICITUD (AQUÍ SÍ SE AÑADEN ANEXOS)
     # --------------------------------------------------------------------
-    @transaction.atomic
     def update(self, request, *args, **kwargs):
         solicitud = self.get_object()
         
@@ -112,62 +199,227 @@ class SolicitudViewSet(viewsets.ModelViewSet):
             partial=True
         )
         serializer.is_valid(raise_exception=True)
-        
-        solicitud = serializer.save(
-            modificado_por=self.request.user
-        )
+
         # ------------------------------------------
-        # Validación: NO permitir finalizar sin anexos
+        # ANEXOS (YA VALIDADOS POR EL SERIALIZER)
+        # Se escriben en disco ANTES de abrir la transacción
         # ------------------------------------------
-        finalizado_flag = serializer.validated_data.get("finalizado")
+        archivos = serializer.validated_data.pop("archivos_anexados", [])
+        descripciones = serializer.validated_data.pop(
+            "archivos_anexados_descripciones", []
+        )
+
+        preparados = ArchivosPreparados()
+        with preparados.preparando():
+            anexos = [
+                preparados.guardar(
+                    SolicitudArchivoAnexo(solicitud=solicitud, descripcion=descripcion),
+                    "archivo_anexo",
+                    archivo,
+                )
+                for archivo, descripcion in zip(archivos, descripciones)
+            ]
+
+        with preparados.transaccion():
+            solicitud = serializer.save(
+                modificado_por=self.request.user
+            )
+
+            # ------------------------------------
+            # USUARIOS ADJUNTADOS
+            # ------------------------------------
+            usuarios_adjuntados = serializer.validated_data.get(
+                "usuarios_adjuntados", []
+            )
 
-        if finalizado_flag is True:
-            if not solicitud.solicitud_archivo_anexo.exists():
-                raise ValidationError(
-                    "No puedes finalizar una solicitud sin anexos."
+            for uid in usuarios_adjuntados:
+                UsuarioSolicitudAdjuntado.objects.get_or_create(
+                    solicitud=solicitud,
+                    usuario_id=uid
                 )
 
-        # Guardar actualización base
-        self.perform_update(serializer)
+            # Una sola inserción para todos los anexos
+            SolicitudArchivoAnexo.objects.bulk_create(anexos)
 
-        # ------------------------------------
-        # USUARIOS ADJUNTADOS
-        # ------------------------------------
-        usuarios_adjuntados = serializer.validated_data.get(
-            "usuarios_adjuntados", []
+            # ------------------------------------------
+            # Validación: NO permitir finalizar sin anexos
+            # ------------------------------------------
+            finalizado_flag = serializer.validated_data.get("finalizado")
+
+            if finalizado_flag is True:
+                if not solicitud.solicitud_archivo_anexo.exists():
+                    raise ValidationError(
+                        "No puedes finalizar una solicitud sin anexos."
+                    )
+
+            # bulk_create no emite post_save: programar y cargar la cuota aquí
+            programar_normalizacion([anexo.archivo_anexo for anexo in anexos])
+            cargar_archivos(anexos, "archivo_anexo")
+
+        return Response(
+            SolicitudReadSerializer(solicitud).data
         )
 
-        for uid in usuarios_adjuntados:
-            UsuarioSolicitudAdjuntado.objects.get_or_create(
-                solicitud=solicitud,
-                usuario_id=uid
+    # --------------------------------------------------------------------
+    # OPERACIONES MASIVAS (REASIGNAR / CAMBIAR ESTADO / ADJUNTAR USUARIOS)
+    # --------------------------------------------------------------------
+    @action(detail=False, methods=["post"], url_path="operaciones-masivas")
+    def operaciones_masivas(self, request):
+        """
+        Aplica una misma operación a varias solicitudes:
+        - Bloquea las filas y evalúa la política de rol de cada una como si
+          fuera un PATCH, dentro de la misma transacción que la escritura
+        - Aplica todo con bulk_update / bulk_create
+        - Devuelve un resultado por id
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        operacion = datos["operacion"]
+
+        if not request.user.has_perm("solicitudes.change_solicitud"):
+            raise PermissionDenied("No tienes permiso para modificar solicitudes.")
+
+        resultados = {}
+        permitidas = []
+        peticion = SimpleNamespace(
+            user=request.user,
+            data=serializer.datos_equivalentes(),
+            method="PATCH",
+        )
+        vista = SimpleNamespace(action="partial_update", queryset=self.queryset)
+        politicas = self.get_permissions()
+
+        with transaction.atomic():
+            # Filas bloqueadas hasta el commit: nadie las reasigna, finaliza o
+            # cambia de estado entre la evaluación de la política y la escritura
+            solicitudes = (
+                Solicitud.objects.select_related("expediente")
+                .select_for_update(of=("self",))
+                .in_bulk(datos["ids"])
             )
 
-        # ------------------------------------------
-        # ANEXOS (YA VALIDADOS POR EL SERIALIZER)
-        # ------------------------------------------
-        archivos = serializer.validated_data.get(
-            "archivos_anexados", []
+            # 1️⃣ Política de rol por solicitud (mismas reglas que el PATCH)
+            for sid in datos["ids"]:
+                solicitud = solicitudes.get(sid)
+                if solicitud is None:
+                    resultados[sid] = {"id": sid, "ok": False, "detalle": "La solicitud no existe."}
+                    continue
+                try:
+                    permitido = all(
+                        p.has_permission(peticion, vista) and p.has_object_permission(peticion, vista, solicitud)
+                        for p in politicas
+                    )
+                except PermissionDenied as exc:
+                    resultados[sid] = {"id": sid, "ok": False, "detalle": str(exc.detail)}
+                    continue
+                if not permitido:
+                    resultados[sid] = {"id": sid, "ok": False, "detalle": "No tienes permiso para modificar esta solicitud."}
+                    continue
+                permitidas.append(solicitud)
+
+            # 2️⃣ Aplicación en bloque
+            # bulk_update / bulk_create no emiten post_save: invalidar la caché aquí
+            tocar_solicitudes([solicitud.id for solicitud in permitidas])
+            if operacion == "adjuntar_usuarios":
+                self._adjuntar_en_bloque(permitidas, datos["usuarios_adjuntados"])
+            elif permitidas:
+                self._actualizar_en_bloque(permitidas, operacion, datos)
+
+        for solicitud in permitidas:
+            resultados[solicitud.id] = {"id": solicitud.id, "ok": True, "detalle": "Aplicado."}
+
+        return Response({
+            "operacion": operacion,
+            "aplicadas": len(permitidas),
+            "rechazadas": len(datos["ids"]) - len(permitidas),
+            "resultados": [resultados[sid] for sid in datos["ids"]],
+        })
+
+    def _actualizar_en_bloque(self, solicitudes, operacion, datos):
+        ahora = timezone.now()
+        campo = "usuario_asignado" if operacion == "reasignar" else "estado"
+        for solicitud in solicitudes:
+            setattr(solicitud, campo, datos[campo])
+            solicitud.modificado_por = self.request.user
+            solicitud.fecha_actualizacion = ahora
+            solicitud.aplicar_reglas_fechas()
+
+        bulk_update_with_history(
+            solicitudes,
+            Solicitud,
+            fields=[
+                campo, "modificado_por", "fecha_actualizacion", "fecha_limite", "fecha_cierre", "vencida",
+            ],
+            default_user=self.request.user,
         )
-        descripciones = serializer.validated_data.get(
-            "archivos_anexados_descripciones", []
+        if operacion == "reasignar":
+            # bulk_update no emite post_save: avisar aquí a los asignados
+            avisar_reasignaciones(solicitudes)
+
+    def _adjuntar_en_bloque(self, solicitudes, usuarios_ids):
+        existentes = set(
+            UsuarioSolicitudAdjuntado.objects.filter(
+                solicitud__in=solicitudes,
+                usuario_id__in=usuarios_ids
+            ).values_list("solicitud_id", "usuario_id")
         )
-
-        for archivo, descripcion in zip(archivos, descripciones):
-            SolicitudArchivoAnexo.objects.create(
-                solicitud=solicitud,
-                archivo_anexo=archivo,
-                descripcion=descripcion
+        nuevos = [
+            UsuarioSolicitudAdjuntado(solicitud=solicitud, usuario_id=uid)
+            for solicitud in solicitudes
+            for uid in dict.fromkeys(usuarios_ids)
+            if (solicitud.id, uid) not in existentes
+        ]
+        if nuevos:
+            bulk_create_with_history(
+                nuevos,
+                UsuarioSolicitudAdjuntado,
+                default_user=self.request.user,
             )
+            avisar_adjuntados(nuevos)
 
-        return Response(
-            SolicitudReadSerializer(solicitud).data
+    # --------------------------------------------------------------------
+    # ACTIVIDAD (LÍNEA DE TIEMPO UNIFICADA DEL HISTORIAL)
+    # --------------------------------------------------------------------
+    @action(detail=True, methods=["get"], url_path="actividad")
+    def actividad(self, request, pk=None):
+        """
+        Historial de la solicitud, sus comentarios, anexos de comentarios y
+        usuarios adjuntados en un solo flujo, con los cambios de cada evento.
+        - ?limite= (máx. 200), ?orden=asc|desc (desc por defecto)
+        - ?cursor= el valor de `cursor_siguiente` de la página anterior
+        """
+        solicitud = self.get_object()
+        try:
+            cursor = decodificar_cursor(request.query_params.get("cursor"))
+            limite = min(max(int(request.query_params.get("limite", 50)), 1), 200)
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+
+        eventos, siguiente = linea_de_tiempo(
+            solicitud.id,
+            cursor=cursor,
+            limite=limite,
+            descendente=request.query_params.get("orden", "desc") != "asc",
         )
+        return Response({
+            "next": (
+                replace_query_param(request.build_absolute_uri(), "cursor", siguiente)
+                if siguiente else None
+            ),
+            "cursor_siguiente": siguiente,
+            "results": eventos,
+        })
 
     # --------------------------------------------------------------------
     # HELPERS Y ACTIONS (SIN CAMBIOS)
     # --------------------------------------------------------------------
     def _paginar_queryset(self, queryset):
+        return self.con_cache(lambda: self._paginar_sin_cache(queryset))
+
+    def _paginar_sin_cache(self, queryset):
+        if self.usar_streaming():
+            return self.respuesta_streaming(queryset)
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -212,10 +464,22 @@ class SolicitudViewSet(viewsets.ModelViewSet):
         ).distinct() # distinct() es vital para evitar duplicados en relaciones Many-to-Many
         
         return self._paginar_queryset(qs)
-            
+
+    @action(detail=False, methods=["get"], url_path="vencidas")
+    def vencidas(self, request):
+        """
+        Solicitudes marcadas como vencidas por el job de vencimientos:
+        las asignadas al usuario y las de sus subordinados (PerfilUsuario.jefe).
+        """
+        qs = Solicitud.objects.filter(vencida=True, finalizado=False).filter(
+            Q(usuario_asignado=request.user)
+            | Q(usuario_asignado__perfilusuario__jefe__user=request.user)
+        ).order_by("fecha_limite")
+        return self._paginar_queryset(qs)
+
 # 📌 COMENTARIOS
 # ================================================
-class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
+class ComentarioSolicitudViewSet(ListadoStreamingMixin, ValidacionAnexosMixin, viewsets.ModelViewSet):
     """
     - Crear comentarios de solicitudes
     - Adjuntar archivos en la misma creación (igual que expediente)
@@ -227,14 +491,24 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
     # Importante mantener los parsers para manejar multipart/form-data
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     permission_classes = [permissions.IsAuthenticated,ComentarioSolicitudPermission]
+    # 📎 Validación de anexos mientras se suben (tamaño, tipo y cuotas)
+    politicas_anexos = {"archivos_anexados": "solicitudes.ComentarioSolicitudArchivoAnexo"}
+
+    def expediente_de_anexos(self):
+        pk = self.kwargs.get("pk")
+        if not pk:
+            return None
+        return (
+            ComentarioSolicitud.objects.filter(pk=pk)
+            .values_list("solicitud__expediente_id", flat=True)
+            .first()
+        )
 
     # --------------------------------------------------------------------
     # CREAR COMENTARIO (CON ARCHIVOS)
     # --------------------------------------------------------------------
-    @transaction.atomic
     def perform_create(self, serializer):
         request = self.request
-        print(request.data)
         solicitud_id = request.data.get("solicitud")
         if not solicitud_id:
             raise ValidationError("Debe especificar un ID de solicitud.")
@@ -245,12 +519,6 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
         except Solicitud.DoesNotExist:
             raise ValidationError("La solicitud no existe.")
 
-        # Crear comentario
-        comentario = serializer.save(
-            solicitud=solicitud,
-            usuario=request.user
-        )
-
         # ---------------------------
         # Manejo de anexos
         # ---------------------------
@@ -259,17 +527,44 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
         # ✅ CORRECCIÓN: Usar request.POST.getlist() para campos de formulario
         descripciones = request.POST.getlist("archivos_anexados_descripciones") 
 
-        for archivo, descripcion in zip(anexos, descripciones):
-            ComentarioSolicitudArchivoAnexo.objects.create(
-                comentario=comentario,
-                archivo_anexo=archivo,
-                descripcion=descripcion
+        # El comentario aún no tiene id: los anexos se preparan en una carpeta de lote
+        lote = ruta_media("solicitudes", solicitud.id, "comentarios", f"lote-{uuid4().hex[:12]}")
+        preparados = ArchivosPreparados()
+        with preparados.preparando():
+            registros = [
+                preparados.guardar(
+                    ComentarioSolicitudArchivoAnexo(descripcion=descripcion),
+                    "archivo_anexo",
+                    archivo,
+                    ruta=f"{lote}/{archivo.name}",
+                )
+                for archivo, descripcion in zip(anexos, descripciones)
+            ]
+
+        with preparados.transaccion():
+            # Crear comentario
+            comentario = serializer.save(
+                solicitud=solicitud,
+                usuario=request.user
+            )
+            self._insertar_anexos(comentario, registros)
+
+    def _insertar_anexos(self, comentario, registros):
+        """Inserta los anexos preparados (y su historial) en un solo bulk_create."""
+        for registro in registros:
+            registro.comentario = comentario
+        if registros:
+            bulk_create_with_history(
+                registros,
+                ComentarioSolicitudArchivoAnexo,
+                default_user=self.request.user,
             )
+            programar_normalizacion([registro.archivo_anexo for registro in registros])
+            cargar_archivos(registros, "archivo_anexo")
 
     # --------------------------------------------------------------------
     # ACTUALIZAR COMENTARIO (PERMITIR AGREGAR MÁS ARCHIVOS)
     # --------------------------------------------------------------------
-    @transaction.atomic
     def update(self, request, *args, **kwargs):
         comentario = self.get_object()
         
@@ -283,7 +578,6 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
             partial=True
         )
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
 
         # Agregar anexos nuevos
         anexos = request.FILES.getlist("archivos_anexados")
@@ -291,13 +585,20 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
         # ✅ CORRECCIÓN: Usar request.POST.getlist() para campos de formulario
         descripciones = request.POST.getlist("archivos_anexados_descripciones")
 
-        for archivo, descripcion in zip(anexos, descripciones):
-            ComentarioSolicitudArchivoAnexo.objects.create(
-                comentario=comentario,
-                usuario=request.user,
-                archivo_anexo=archivo,
-                descripcion=descripcion
-            )
+        preparados = ArchivosPreparados()
+        with preparados.preparando():
+            registros = [
+                preparados.guardar(
+                    ComentarioSolicitudArchivoAnexo(comentario=comentario, descripcion=descripcion),
+                    "archivo_anexo",
+                    archivo,
+                )
+                for archivo, descripcion in zip(anexos, descripciones)
+            ]
+
+        with preparados.transaccion():
+            self.perform_update(serializer)
+            self._insertar_anexos(comentario, registros)
 
         return Response(ComentarioSolicitudSerializer(comentario).data)
 
@@ -314,6 +615,8 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
         else:
             qs = self.get_queryset()
 
+        if self.usar_streaming():
+            return self.respuesta_streaming(qs)
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -321,3 +624,22 @@ class ComentarioSolicitudViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
+
+
+# ================================================
+# 📅 CALENDARIO LABORAL Y PLAZOS (SLA)
+# ================================================
+class FeriadoViewSet(viewsets.ModelViewSet):
+    """Feriados que no cuentan como días hábiles para fecha_limite."""
+    queryset = Feriado.objects.all().order_by("fecha")
+    serializer_class = FeriadoSerializer
+    permission_classes = [permissions.IsAuthenticated, DjangoModelPermissionsConMensaje]
+    filterset_fields = ["fecha"]
+
+
+class PlazoSLAViewSet(viewsets.ModelViewSet):
+    """Días hábiles por estado y/o tipo de documento (vacío = cualquiera)."""
+    queryset = PlazoSLA.objects.all().order_by("estado", "tipo_documento")
+    serializer_class = PlazoSLASerializer
+    permission_classes = [permissions.IsAuthenticated, DjangoModelPermissionsConMensaje]
+    filterset_fields = ["estado", "tipo_documento"]
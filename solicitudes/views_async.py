@@ -0,0 +1,71 @@
+"""
+Versiones async (ASGI) de los listados de solicitudes que más se consultan
+por polling. Mismo formato y mismos filtros que las acciones de SolicitudViewSet.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+
+from common.utils.asincrono.eventos import respuesta_sse
+from common.utils.asincrono.vistas import autenticada, paginar, respuesta_json
+from usuarios.models import PerfilUsuario
+from .eventos import canal_usuario
+from .models import ComentarioSolicitud, Solicitud
+from .serializers import SolicitudReadSerializer
+
+
+def _con_relaciones(queryset):
+    # Todo lo que anida SolicitudReadSerializer, para serializar sin consultas por fila
+    return queryset.select_related(
+        "expediente", "usuario_asignado", "modificado_por"
+    ).prefetch_related(
+        "solicitud_archivo_anexo",
+        "usuario_solicitud_adjuntado__usuario",
+        Prefetch(
+            "comentarios_solicitud",
+            queryset=ComentarioSolicitud.objects.select_related("usuario").prefetch_related("comentario_solicitud"),
+        ),
+    ).order_by("id")  # orden estable para paginar (las acciones del ViewSet no ordenan)
+
+
+def _serializar(filas):
+    return SolicitudReadSerializer(filas, many=True).data
+
+
+@autenticada
+async def asignadas(request):
+    qs = Solicitud.objects.filter(usuario_asignado=request.user)
+    return await paginar(request, _con_relaciones(qs), _serializar)
+
+
+@autenticada
+async def creadas(request):
+    qs = Solicitud.objects.filter(expediente__creado_por=request.user)
+    return await paginar(request, _con_relaciones(qs), _serializar)
+
+
+@autenticada
+async def mi_area(request):
+    area_id = await PerfilUsuario.objects.filter(user=request.user).values_list("area_id", flat=True).afirst()
+    if not area_id:
+        return respuesta_json([])
+    qs = Solicitud.objects.filter(usuario_asignado__perfilusuario__area_id=area_id)
+    return await paginar(request, _con_relaciones(qs), _serializar)
+
+
+@autenticada
+async def adjuntadas(request):
+    qs = Solicitud.objects.filter(usuario_solicitud_adjuntado__usuario=request.user).distinct()
+    return await paginar(request, _con_relaciones(qs), _serializar)
+
+
+@autenticada(token_en_query=True)
+async def eventos(request):
+    """
+    Stream SSE con los avisos del usuario (ver solicitudes.eventos). El cliente
+    se conecta con EventSource("/api/async/eventos/?token=<access>") y, al
+    (re)conectar, lee pendientes/ una vez en vez de hacer polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI el stream ocuparía un worker completo mientras dure
+        return respuesta_json({"detail": "Los eventos en vivo requieren el perfil ASGI."}, status=501)
+    return respuesta_sse(canal_usuario(request.user.pk))
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UsuariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'usuarios'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+
+        from common.utils.cache.versiones import conectar_invalidacion
+        from .models import Area, PerfilUsuario
+
+        # Catálogos en caché (AreaViewSet, PerfilUsuarioViewSet)
+        conectar_invalidacion(Area, PerfilUsuario, User)
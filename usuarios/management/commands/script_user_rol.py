@@ -5,6 +5,7 @@ from django.contrib.contenttypes.models import ContentType
 from expedientes.models import Expediente, ExpedienteArchivoAnexo
 from solicitudes.models import Solicitud, ComentarioSolicitud
 from usuarios.models import PerfilUsuario, Area
+from analitica.models import AgregadoTiempo, ResumenDiario
 
 
 
@@ -28,6 +29,8 @@ class Command(BaseCommand):
         ct_solicitud = ContentType.objects.get_for_model(Solicitud)
         ct_comentario = ContentType.objects.get_for_model(ComentarioSolicitud)
         ct_archivo = ContentType.objects.get_for_model(ExpedienteArchivoAnexo)
+        ct_resumen = ContentType.objects.get_for_model(ResumenDiario)
+        ct_tiempos = ContentType.objects.get_for_model(AgregadoTiempo)
 
         # -----------------------------
         # 3. PERMISOS NATIVOS DJANGO
@@ -60,6 +63,12 @@ class Command(BaseCommand):
             "delete": Permission.objects.get(codename="delete_expedientearchivoanexo", content_type=ct_archivo),
         }
 
+        # Tableros de analítica (/api/analitica/): solo lectura
+        permisos_analitica = [
+            Permission.objects.get(codename="view_resumendiario", content_type=ct_resumen),
+            Permission.objects.get(codename="view_agregadotiempo", content_type=ct_tiempos),
+        ]
+
         # -----------------------------
         # 4. ASIGNAR PERMISOS A GRUPOS
         # -----------------------------
@@ -77,6 +86,7 @@ class Command(BaseCommand):
             permisos_solicitud["view"], permisos_solicitud["change"],
             permisos_comentario["view"], permisos_comentario["add"],
             permisos_archivo["view"],
+            *permisos_analitica,
         ])
 
         supervisor_group.permissions.set([
@@ -85,6 +95,7 @@ class Command(BaseCommand):
             permisos_solicitud["view"], permisos_solicitud["change"],
             permisos_comentario["view"], permisos_comentario["add"],
             permisos_archivo["view"],
+            *permisos_analitica,
         ])
 
         # -----------------------------
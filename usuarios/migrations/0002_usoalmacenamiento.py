@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsoAlmacenamiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ambito', models.CharField(choices=[('usuario', 'Usuario'), ('expediente', 'Expediente')], max_length=20)),
+                ('clave', models.PositiveBigIntegerField()),
+                ('bytes_usados', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ambito', 'clave'), name='uso_almacenamiento_unico')],
+            },
+        ),
+    ]
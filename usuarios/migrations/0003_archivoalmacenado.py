@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('usuarios', '0002_usoalmacenamiento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivoAlmacenado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('campo', models.CharField(max_length=100)),
+                ('expediente_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('bytes', models.PositiveBigIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'objeto_id', 'campo'), name='archivo_almacenado_unico')],
+            },
+        ),
+    ]
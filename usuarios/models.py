@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 
@@ -42,4 +44,75 @@ class PerfilUsuario(models.Model):
             raise ValidationError("No puedes ser tu propio jefe.")
     def __str__(self):
         return f"{self.user.username} - {self.cargo} ({self.area})"
-    
\ No newline at end of file
+    
+class UsoAlmacenamiento(models.Model):
+    """
+    Bytes de anexos subidos por ámbito (usuario o expediente).
+    Se usa para aplicar cuotas sin recorrer el disco en cada subida.
+    """
+    AMBITO_CHOICES = [
+        ("usuario", "Usuario"),
+        ("expediente", "Expediente"),
+    ]
+
+    ambito = models.CharField(max_length=20, choices=AMBITO_CHOICES)
+    clave = models.PositiveBigIntegerField()
+    bytes_usados = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ambito", "clave"], name="uso_almacenamiento_unico"),
+        ]
+
+    @classmethod
+    def usados(cls, ambito, clave):
+        return (
+            cls.objects.filter(ambito=ambito, clave=clave)
+            .values_list("bytes_usados", flat=True)
+            .first()
+        ) or 0
+
+    @classmethod
+    def sumar(cls, ambito, clave, cantidad):
+        """Suma `cantidad` bytes (negativa para liberar); nunca baja de cero."""
+        uso, creado = cls.objects.get_or_create(
+            ambito=ambito, clave=clave, defaults={"bytes_usados": max(cantidad, 0)}
+        )
+        if not creado:
+            cls.objects.filter(pk=uso.pk).update(
+                bytes_usados=Greatest(models.F("bytes_usados") + cantidad, 0)
+            )
+
+    def __str__(self):
+        return f"{self.ambito}:{self.clave} ({self.bytes_usados} bytes)"
+
+
+class ArchivoAlmacenado(models.Model):
+    """
+    Lo cargado a UsoAlmacenamiento por cada archivo subido (FileField de un
+    objeto): al reemplazarlo o borrarlo se descuenta exactamente lo mismo.
+    Ver common.utils.media.uso.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    objeto_id = models.PositiveBigIntegerField()
+    campo = models.CharField(max_length=100)
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
+    )
+    expediente_id = models.PositiveBigIntegerField(null=True, blank=True)
+    bytes = models.PositiveBigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "objeto_id", "campo"], name="archivo_almacenado_unico"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.objeto_id}.{self.campo} ({self.bytes} bytes)"
@@ -1,3 +1,104 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from common.utils.media.uso import soltar_usuario, usar_usuario
+from expedientes.models import Expediente, ExpedienteArchivoAnexo
+
+from .models import ArchivoAlmacenado, Area, UsoAlmacenamiento
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def pdf(nombre, tamano):
+    return ContentFile(b"%PDF-1.4" + b"x" * (tamano - 8), name=nombre)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class UsoAlmacenamientoTests(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="mesa")
+        token = usar_usuario(lambda: self.usuario)
+        self.addCleanup(soltar_usuario, token)
+        self.expediente = Expediente(
+            tipo_persona="NATURAL", dni="12345678", apellidos="Prueba", nombres="Cuota",
+            telefono="999999999", correo="cuota@example.com",
+            departamento="LIMA", provincia="LIMA", distrito="LIMA",
+            tipo_documento="CARTA", numero_documento="1", numero_folios=1, asunto="Cuota",
+            creado_por=self.usuario, archivo_principal=pdf("principal.pdf", 100),
+        )
+        self.expediente.save()
+
+    def usados(self):
+        return (
+            UsoAlmacenamiento.usados("usuario", self.usuario.id),
+            UsoAlmacenamiento.usados("expediente", self.expediente.id),
+        )
+
+    def test_la_creacion_carga_al_expediente(self):
+        self.assertEqual(self.usados(), (100, 100))
+
+    def test_borrar_un_anexo_libera_su_cuota(self):
+        anexo = ExpedienteArchivoAnexo.objects.create(
+            expediente=self.expediente, archivo_anexo=pdf("anexo.pdf", 50)
+        )
+        self.assertEqual(self.usados(), (150, 150))
+        anexo.delete()
+        self.assertEqual(self.usados(), (100, 100))
+
+    def test_reemplazar_el_archivo_descuenta_el_anterior(self):
+        self.expediente.archivo_principal = pdf("nuevo.pdf", 40)
+        self.expediente.save()
+        self.assertEqual(self.usados(), (40, 40))
+
+    def test_guardar_sin_archivo_nuevo_no_carga(self):
+        self.expediente.asunto = "Otro"
+        self.expediente.save()
+        self.assertEqual(self.usados(), (100, 100))
+
+    def test_borrar_el_expediente_libera_todo(self):
+        ExpedienteArchivoAnexo.objects.create(expediente=self.expediente, archivo_anexo=pdf("anexo.pdf", 50))
+        self.expediente.delete()
+        self.assertEqual(UsoAlmacenamiento.usados("usuario", self.usuario.id), 0)
+        self.assertFalse(ArchivoAlmacenado.objects.exists())
+
+    def test_nunca_baja_de_cero(self):
+        UsoAlmacenamiento.sumar("usuario", self.usuario.id, -1000)
+        self.assertEqual(UsoAlmacenamiento.usados("usuario", self.usuario.id), 0)
+
+
+class CacheCatalogosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Area.objects.create(nombre="Mesa de Partes")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(username="admin"))
+
+    def nombres(self, response):
+        return [area["nombre"] for area in response.json()["results"]]
+
+    def test_sin_cache_compartida_no_se_cachea(self):
+        for _ in range(2):
+            self.assertNotIn("X-Cache", self.client.get("/api/area/"))
+            self.assertNotIn("X-Cache", self.client.get("/api/perfil-usuario/"))
+
+    @mock.patch("common.utils.cache.respuestas.cache_compartida", return_value=True)
+    def test_se_invalida_tras_el_commit(self, _):
+        self.assertEqual(self.client.get("/api/area/")["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/api/area/")["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Area.objects.create(nombre="Contabilidad")
+        # Sin commit la generación no cambia: nadie guarda datos sin confirmar como vigentes
+        self.assertEqual(self.client.get("/api/area/")["X-Cache"], "HIT")
+
+        for callback in callbacks:
+            callback()
+        response = self.client.get("/api/area/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(self.nombres(response), ["Contabilidad", "Mesa de Partes"])
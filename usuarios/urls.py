@@ -8,6 +8,7 @@ from .views import (
     MisSolicitudesView, 
     LoginView
 )
+from . import views_async
 
 router = DefaultRouter()
 router.register(r"perfil-usuario", PerfilUsuarioViewSet, basename="perfil-usuario")
@@ -21,6 +22,8 @@ urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
     path('me/', MeView.as_view(), name='me'),
     path("pendientes/", MisSolicitudesView.as_view(), name="pendientes"),
+    # ⚡ Lectura async (perfil ASGI)
+    path("async/pendientes/", views_async.mis_solicitudes, name="pendientes-async"),
 
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -19,8 +19,9 @@ from solicitudes.serializers import ResumenSolicitudSerializer
 
 from .models import PerfilUsuario
 from .serializers import PerfilUsuarioSerializer
+from common.utils.cache.respuestas import CacheRespuestaMixin
 
-class AreaViewSet(viewsets.ReadOnlyModelViewSet):
+class AreaViewSet(CacheRespuestaMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PerfilUsuario.area.field.related_model.objects.all()
     serializer_class = AreaSerializer
     permission_classes = [
@@ -28,13 +29,18 @@ class AreaViewSet(viewsets.ReadOnlyModelViewSet):
         DjangoModelPermissionsConMensaje,
     ]
 
+    # 🗄️ Caché de list / retrieve (se invalida al guardar o borrar un Área).
+    # Solo con caché compartida: en memoria local los demás workers no verían el cambio
+    cache_espacios = ["usuarios.Area"]
+    cache_solo_compartida = True
+
     filterset_fields = ["nombre"]   # 👈 Esto te faltaba
 
     search_fields = ["nombre", "descripcion"]
     ordering_fields = ["nombre"]
     ordering = ["nombre"]
 
-class PerfilUsuarioViewSet(viewsets.ReadOnlyModelViewSet):
+class PerfilUsuarioViewSet(CacheRespuestaMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PerfilUsuario.objects.all()
     serializer_class = PerfilUsuarioSerializer
     permission_classes = [
@@ -42,6 +48,10 @@ class PerfilUsuarioViewSet(viewsets.ReadOnlyModelViewSet):
         DjangoModelPermissionsConMensaje,
     ]
 
+    # 🗄️ Caché de list / retrieve: el serializer anida User y Area
+    cache_espacios = ["usuarios.PerfilUsuario", "usuarios.Area", "auth.User"]
+    cache_solo_compartida = True
+
     search_fields = ["user__username", "cargo"]
 
     # 🔧 Filtros
@@ -0,0 +1,27 @@
+"""
+Versión async (ASGI) de MisSolicitudesView (/api/pendientes/): las dos
+consultas son independientes y corren en paralelo, cada una en su conexión.
+"""
+from common.utils.asincrono.vistas import autenticada, en_paralelo, respuesta_json
+from solicitudes.models import Solicitud
+from solicitudes.serializers import ResumenSolicitudSerializer
+
+
+def _resumen(queryset):
+    datos = ResumenSolicitudSerializer(queryset.select_related("expediente"), many=True).data
+    return {"cantidad": len(datos), "detalle": datos}
+
+
+@autenticada
+async def mis_solicitudes(request):
+    user = request.user
+    adjuntadas, asignadas = await en_paralelo(
+        lambda: _resumen(
+            Solicitud.objects.filter(usuario_solicitud_adjuntado__usuario=user, finalizado=False).distinct()
+        ),
+        lambda: _resumen(Solicitud.objects.filter(usuario_asignado=user, finalizado=False)),
+    )
+    return respuesta_json({
+        "solicitudes_adjuntadas": adjuntadas,
+        "solicitud_asignado": asignadas,
+    })